@@ -0,0 +1,291 @@
+"""
+This module offers an asyncio counterpart of the CompanyData class. It follows
+the same two-step procedure (references first, filings second) but issues the
+calls on the event loop, so thousands of requests can be in flight without a
+thread per request.
+
+The HTTP client is aiohttp, which has to be installed separately:
+    pip install aiohttp
+
+Example:
+    import asyncio
+    import AsyncCompanyData as acd
+
+    async def main():
+        async for result in acd.fetch_many_async(ids, year=2, limit=200):
+            print(result.company_id, result.ok)
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import json
+import time
+import uuid
+
+import CompanyData as cd
+import cache as cch
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def open_session(limit=100, timeout=60) -> 'aiohttp.ClientSession':
+    """
+    Return an aiohttp session with a connection pool of 'limit' connections.
+
+    The session has to be closed by the caller, preferably with 'async with'.
+    """
+    if aiohttp is None:
+        raise ImportError(
+            "AsyncCompanyData requires aiohttp: 'pip install aiohttp'")
+    connector = aiohttp.TCPConnector(limit=limit)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout))
+
+
+class AsyncCompanyData(cd.CompanyData):
+    """Represent the data requested and available from the NBB, async."""
+    def __init__(self, company_id: str, session, semaphore=None, cache=None,
+                 rate_limiter=None, database='authentic', compact=False,
+                 client=None):
+        """
+        Initialise the class' attributes. No API calls are made, await
+        'load()' to retrieve the references and filings. With compact=True,
+        filings are CompactFiling objects. The retries follow the settings
+        of client, a client.CBSOClient (the shared one if None); its session
+        is not used.
+        """
+        super().__init__(company_id, client=client, cache=cache,
+                         database=database, compact=compact)
+        self.session = session
+        self.semaphore = semaphore or asyncio.Semaphore(100)
+        self.rate_limiter = rate_limiter
+        self.reference_table = None
+        self.data = {}
+
+    async def load(self, year=1, accept_type=None):
+        """
+        Fetch the reference table and the last 'year' filings.
+
+        Raise an error if the company is not found, unlike 'CompanyData'.
+        """
+        self.reference_table = await self._fetch_references()
+        self._set_company_info()
+        self.data = await self._fetch_data(accept_type=accept_type, year=year)
+        return self
+
+    async def _api_call(self, url: str, accept_form: str,
+                        cache_status=None) -> bytes:
+        """
+        Return API response (bytes object) or HTTP Error Code.
+
+        Same conventions as 'CompanyData._api_call': a 404 is returned as a
+        ValueError, a 429 that outlasts the retries is raised. Every call is
+        recorded in 'metrics'.
+        """
+        request_id = str(uuid.uuid4())
+        hdr = {
+            'X-Request-Id': request_id,
+            cd.KEY_HEADER: cd.get_api_key(),
+            'Accept': accept_form,
+            'User-Agent': 'PostmanRuntime/7.37.3',
+        }
+        # aiohttp refuses empty headers, requests drops them silently.
+        hdr = {k: v for k, v in hdr.items() if v is not None}
+
+        event = cd.instrumentation.RequestEvent(url, request_id,
+                                                cache=cache_status)
+        started = time.monotonic()
+        try:
+            response, api_answer = await self._get(url, hdr, event)
+            if response.status == 404:
+                event.error = 'Not found'
+                return ValueError(
+                    f'No match found for {self.id} in NBB database')
+            elif response.status == 429:
+                event.error = 'Too many requests'
+                raise ValueError(
+                    f'Try again later, too many requests!')
+            response.raise_for_status()
+            event.size = len(api_answer)
+            return api_answer
+        except Exception as e:
+            if event.error is None:
+                event.error = e
+            event.retries = getattr(e, 'retries', event.retries)
+            raise
+        finally:
+            event.latency = time.monotonic() - started
+            self.metrics.record(event)
+
+    async def _get(self, url: str, headers: dict, event) -> tuple:
+        """
+        Return (response, body) of a GET request, retrying like
+        'client.CBSOClient.get' with the settings of 'self.client': 429 and
+        5xx responses with backoff honouring 'Retry-After', connection
+        errors and timeouts until 'max_retries' run out.
+        """
+        client = self.client
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+            try:
+                async with self.semaphore:
+                    async with self.session.get(url,
+                                                headers=headers) as response:
+                        event.status = response.status
+                        api_answer = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= client.max_retries:
+                    e.retries = attempt
+                    raise
+                delay = client._backoff(attempt)
+            else:
+                if (response.status not in client.retry_statuses
+                        or attempt >= client.max_retries):
+                    event.retries = attempt
+                    return response, api_answer
+                delay = client._backoff(attempt, response)
+            # The semaphore is released while waiting.
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _fetch_references(
+            self,
+            accept_reference="application/json"):
+        """
+        Return DataFrame.
+        """
+        api_answer = await self._cached_call(
+            self._reference_uri_creation(),
+            accept_reference,
+            cch.REFERENCES, self._references_cache_key())
+
+        if isinstance(api_answer, ValueError):
+            # The failed request itself is logged and counted by metrics.
+            cd.instrumentation.logger.info('%s', api_answer)
+        else:
+            df_of_references = cd.pd.json_normalize(json.loads(api_answer))
+            return self._handle_df_of_references(df_of_references)
+
+    async def _cached_call(self, url: str, accept_form: str,
+                           namespace: str, key: str) -> bytes:
+        """
+        Return response from the cache or make the API call and cache it.
+        """
+        if self.cache is None:
+            return await self._api_call(url, accept_form)
+
+        cached = self.cache.get(namespace, key)
+        if cached is not None:
+            self.metrics.record(cd.instrumentation.RequestEvent(
+                url, cache=cd.instrumentation.HIT, size=len(cached)))
+            return cached
+
+        api_answer = await self._api_call(
+            url, accept_form, cache_status=cd.instrumentation.MISS)
+        if isinstance(api_answer, bytes):
+            self.cache.set(namespace, key, api_answer)
+        return api_answer
+
+    async def _fetch_filing(
+            self,
+            reference: str,
+            data_url: str,
+            add_info_dict: dict,
+            accept_type=None) -> 'cd.Filing':
+        """
+        Make API call for one filing and return a Filing object.
+        """
+        accept_type = accept_type or self.accept_type
+        data = await self._cached_call(
+            data_url, accept_type, cch.FILINGS,
+            self._filing_cache_key(reference, accept_type))
+        if isinstance(data, Exception):
+            raise data
+        response_dict = cd.normalize_filing(json.loads(data), reference)
+        if response_dict.get('EnterpriseName') is None:
+            response_dict['EnterpriseName'] = self.enterpriseName
+        uniq_id = response_dict.get('ReferenceNumber')
+        response_dict['Additional Info'] = add_info_dict[uniq_id]
+        if self.compact:
+            return cd.CompactFiling(response_dict)
+        return cd.Filing(response_dict)
+
+    async def _fetch_data(
+            self,
+            accept_type=None,
+            year=1) -> dict:
+        """
+        Fetch the last 'year' filings concurrently and return dictionary.
+
+        Filings that fail are left out and kept in 'self.errors'.
+        """
+        filing_requests, add_info_dict = self._filing_requests(year)
+        responses = await asyncio.gather(
+            *[self._fetch_filing(reference, url, add_info_dict, accept_type)
+              for reference, url in filing_requests],
+            return_exceptions=True)
+
+        data_dictionary = {}
+        self.errors = []
+        for response in responses:
+            if isinstance(response, Exception):
+                self.errors.append(response)
+            else:
+                data_dictionary[response.filing_reference] = response
+        return data_dictionary
+
+
+async def fetch_many_async(company_ids, year=1, limit=100, session=None,
+                           accept_type=None, cache=None, rate_limiter=None,
+                           database='authentic', compact=False, client=None):
+    """
+    Fetch many companies on the event loop and yield PortfolioResult objects.
+
+    At most 'limit' requests are in flight at the same time, and with a
+    ratelimit.RateLimiter at most its rate per second. Results are yielded
+    as they complete, failures are kept in 'result.errors'. The database is
+    one of CompanyData.DATABASES. With compact=True, filings are
+    CompactFiling objects. Throttling, server errors and timeouts are
+    retried with the settings of client, see AsyncCompanyData.
+    """
+    own_session = session is None
+    if own_session:
+        session = open_session(limit=limit)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _load(result):
+        try:
+            await result.company.load(year=year, accept_type=accept_type)
+            result.errors += result.company.errors
+        except Exception as e:
+            result.errors.append(e)
+            result.company = None
+        return result
+
+    try:
+        tasks = []
+        for company_id in company_ids:
+            result = cd.PortfolioResult(company_id)
+            try:
+                result.company = AsyncCompanyData(
+                    company_id, session, semaphore, cache=cache,
+                    rate_limiter=rate_limiter, database=database,
+                    compact=compact, client=client)
+            except ValueError as e:
+                result.errors.append(e)
+                yield result
+                continue
+            tasks.append(asyncio.ensure_future(_load(result)))
+
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        if own_session:
+            await session.close()
@@ -23,98 +23,275 @@ Data that can be retrieved:
     - Shareholders, if provided.
 """
 
+from __future__ import annotations
+
 import uuid
 import re
 import json
 import os
-from dotenv import load_dotenv
-import pandas as pd
-import requests
-import fnmatch
-from datetime import datetime
+import sys
+import threading
+import time
+from collections.abc import Mapping
+
+from lazy import LazyModule
+from client import CBSOClient, get_default_client, KEY_HEADER
+import cache as cch
+import streaming
+
+# Imported on first use, see lazy.py.
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+requests = LazyModule('requests')
+futures = LazyModule('concurrent.futures')
+cds = LazyModule('codes')
+ratios = LazyModule('ratios')
+instrumentation = LazyModule('instrumentation')
+xbrl = LazyModule('xbrl')
+
+_UNSET = object()
+
+ENVIRONMENT = 'https://ws.cbso.nbb.be/'
+# The CBSO databases and the format their filings are requested in:
+#   authentic: the filings as deposited.
+#   improved: the filings after the corrections of the NBB.
+#   extracts: pre-structured extracts, much smaller per filing.
+DATABASES = {
+    'authentic': 'application/x.jsonxbrl',
+    'improved': 'application/x.jsonxbrl',
+    'extracts': 'application/json',
+    }
+
+
+def clean_company_id(user_input: str) -> str:
+    """
+    Return only-numeric string or raise a ValueError.
+    Remove non-numeric characters.
 
-import dictionaries as dct
+    Important: function checks the numeric correct input, not whether the
+    company ID is in the databank.
+    """
+    user_input = user_input.strip()
+    cleaned_input = re.sub(r"\D", '', user_input)
+    if len(cleaned_input) in [10, 11]:
+        return cleaned_input
+    else:
+        raise ValueError("Wrong input - Length mismatch")
 
-load_dotenv()
-api_key = os.getenv('NBB_CBSO_sub_key')
+
+def get_api_key():
+    """
+    Return the subscription key of the CBSO webservice.
+
+    It is read from the environment variable 'NBB_CBSO_sub_key', after
+    loading a .env file, on the first network call rather than at import.
+    Assigning 'CompanyData.api_key' overrides it.
+    """
+    key = globals().get('api_key', _UNSET)
+    if key is _UNSET:
+        from dotenv import load_dotenv
+        load_dotenv()
+        key = os.getenv('NBB_CBSO_sub_key')
+        globals()['api_key'] = key
+    return key
+
+
+def __getattr__(name):
+    if name == 'api_key':
+        return get_api_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class CompanyData:
     """Represent the data requested and available from the NBB."""
-    def __init__(self, company_id: str, year=1):
+    def __init__(self, company_id: str, year=1, lazy=True, client=None,
+                 cache=None, sections=None, compact=False, concepts=None,
+                 database='authentic'):
         """
         Initialise the class' attributes.
+
+        No API calls are made here unless lazy=False. The reference table is
+        requested when it, or an attribute derived from it (enterpriseName,
+        address, ...), is first used. Each filing in 'data' is requested when
+        it is first accessed, or all at once with 'prefetch()'.
+        Without a client, the pooled client shared by all objects is used.
+        With a cache (see cache.py), responses are read from and written to
+        it, so filings are only downloaded once.
+        With sections, e.g. ['Rubrics', 'Administrators'], a filing only
+        keeps those sections of the JSONXBRL (see streaming.py).
+        With compact=True, filings are CompactFiling objects holding only
+        the rubrics, in arrays.
+        With concepts, {XBRL concept: rubric code} (see xbrl.py), a filing
+        that is not available as JSONXBRL is requested as XBRL and its
+        rubrics are read from that.
+        database: 'authentic', 'improved' or 'extracts', see DATABASES.
         """
+        if database not in DATABASES:
+            raise ValueError(f'Unknown database {database!r}, expected one '
+                             f'of {", ".join(DATABASES)}')
         self.id = self._clean_input(company_id)
-        self.reference_table = self._fetch_references()
-        try:
-            self.latest_filing_info = self.reference_table.tail(1)\
-                .to_dict(orient='records')[0]
-            self.last_reference = self.latest_filing_info.get('ReferenceNumber')
-            self.enterpriseName = self.latest_filing_info.get('EnterpriseName')
-            self.legalForm = self.latest_filing_info.get('LegalForm')
-            self.address = {
-                'Street': self.latest_filing_info.get('Address.Street'),
-                'Number': self.latest_filing_info.get('Address.Number'),
-                'Box': self.latest_filing_info.get('Address.Box'),
-                'PostalCode': self.latest_filing_info.get('Address.PostalCode'),
-                'City': self.latest_filing_info.get('Address.City'),
-                'Country': self.latest_filing_info.get('Address.CountryCode')
-                }
-            self.data = self._fetch_data(year=year)
-        except:
-            pass
+        self.database = database
+        self.year = year
+        self.client = client or get_default_client()
+        self.cache = cache
+        self.sections = sections
+        self.compact = compact
+        self.concepts = concepts
+        self._reference_table = _UNSET
+        self._latest_filing_info = _UNSET
+        self._data = _UNSET
+        if not lazy:
+            self.prefetch()
 
-    def _clean_input(self, user_input: str) -> str:
+    @property
+    def reference_table(self) -> pd.DataFrame:
+        """Return the reference table, requested on first use."""
+        if self._reference_table is _UNSET:
+            self._reference_table = self._fetch_references()
+        return self._reference_table
+
+    @reference_table.setter
+    def reference_table(self, reference_table: pd.DataFrame):
+        self._reference_table = reference_table
+        self._latest_filing_info = _UNSET
+        self._data = _UNSET
+
+    @property
+    def data(self) -> 'LazyFilings':
         """
-        Return only-numeric string or raise a ValueError.
-        Remove non-numeric characters.
-        
-        Important: function checks the numeric correct input, not whether the 
-        company ID is in the databank.
+        Return dictionary-like {ReferenceNumber: Filing} of the last 'year'
+        filings. A filing is only requested when it is first accessed.
         """
-        user_input = user_input.strip()
-        cleaned_input = re.sub(r"\D", '', user_input)
-        if len(cleaned_input) in [10, 11]:
-            return cleaned_input
-        else:
-            raise ValueError("Wrong input - Length mismatch")
+        if self._data is _UNSET:
+            filing_requests, add_info_dict = self._filing_requests(self.year)
+            self._data = LazyFilings(self, filing_requests, add_info_dict,
+                                     self.accept_type)
+        return self._data
+
+    @data.setter
+    def data(self, data: dict):
+        self._data = data
+
+    def prefetch(self, max_workers=4) -> 'CompanyData':
+        """
+        Request the reference table and all filings in 'data' now, the
+        filings over 'max_workers' threads. Return the object itself.
+
+        Raise an error if the company is not found. Filings that fail are
+        left out of 'data' and kept in 'data.errors'. A 'data' that is a
+        plain dictionary, e.g. of fetch_many(), is loaded already.
+        """
+        self._set_company_info()
+        if isinstance(self.data, LazyFilings):
+            self.data.prefetch(max_workers=max_workers)
+        return self
+
+    def _set_company_info(self):
+        """
+        Set the company attributes based on the latest filing in the reference
+        table. Raise a ValueError if there are no filings.
+        """
+        reference_table = self.reference_table
+        if reference_table is None or reference_table.empty:
+            raise ValueError(f'No filings found for {self.id} in NBB database')
+        self._latest_filing_info = reference_table.tail(1)\
+            .to_dict(orient='records')[0]
+
+    @property
+    def accept_type(self) -> str:
+        """Return the format filings are requested in, see DATABASES."""
+        return DATABASES[self.database]
+
+    @property
+    def latest_filing_info(self) -> dict:
+        if self._latest_filing_info is _UNSET:
+            self._set_company_info()
+        return self._latest_filing_info
+
+    @property
+    def last_reference(self) -> str:
+        return self.latest_filing_info.get('ReferenceNumber')
+
+    @property
+    def enterpriseName(self) -> str:
+        return self.latest_filing_info.get('EnterpriseName')
+
+    @property
+    def legalForm(self) -> str:
+        return self.latest_filing_info.get('LegalForm')
+
+    @property
+    def address(self) -> dict:
+        return {
+            'Street': self.latest_filing_info.get('Address.Street'),
+            'Number': self.latest_filing_info.get('Address.Number'),
+            'Box': self.latest_filing_info.get('Address.Box'),
+            'PostalCode': self.latest_filing_info.get('Address.PostalCode'),
+            'City': self.latest_filing_info.get('Address.City'),
+            'Country': self.latest_filing_info.get('Address.CountryCode')
+            }
+
+    def _clean_input(self, user_input: str) -> str:
+        """Return only-numeric string or raise a ValueError."""
+        return clean_company_id(user_input)
                
-    def _reference_uri_creation(self) -> str:
+    def _reference_uri_creation(self, database=None) -> str:
         """
         Return an API compatible URL based on input.
 
-        Default database is 'authentic'. Other options are 'extracts' and 
-        'improved' but the function is not yet adjusted to process this.
+        The database is that of the object unless given, 'authentic',
+        'improved' or 'extracts'. The filing URLs in the reference table
+        point to the same database.
         """
-        environment = "https://ws.cbso.nbb.be/"
-        database = "authentic/"
+        database = (database or self.database) + "/"
         action = "legalEntity/"
         company_id = self.id + "/"
         type_action = "references"
 
-        url = environment + database + action + company_id + type_action
+        url = ENVIRONMENT + database + action + company_id + type_action
         return url
     
-    def _api_call(self, url: str, accept_form: str) -> bytes:
+    @property
+    def metrics(self) -> 'instrumentation.Metrics':
+        """Return the Metrics the requests are recorded in."""
+        return (getattr(self.client, 'metrics', None)
+                or instrumentation.metrics)
+
+    def _api_call(self, url: str, accept_form: str, stream=False,
+                  cache_status=None) -> bytes:
         """ 
         Return API response (bytes object) or HTTP Error Code.
+
+        With stream=True an iterator over chunks of the body is returned
+        instead, the connection is released once it is exhausted.
+        Every call is recorded in 'metrics' (see instrumentation.py), a
+        streamed one once its body is read. cache_status is 'miss' when
+        the call is made because the cache did not have the response.
         """
         uuid_code = str(uuid.uuid4())
         hdr = {
             'X-Request-Id': uuid_code,
-            'NBB-CBSO-Subscription-Key': api_key,
+            KEY_HEADER: get_api_key(),
             'Accept': accept_form,
             'User-Agent': 'PostmanRuntime/7.37.3',
         }
+        event = instrumentation.RequestEvent(url, uuid_code,
+                                             cache=cache_status)
+        started = time.monotonic()
 
         try:
-            response = requests.get(url, headers=hdr)
+            response = self.client.get(url, headers=hdr, stream=stream)
+            event.status = response.status_code
+            event.retries = getattr(response, 'retries', 0)
             response.raise_for_status()
-            print(response.status_code)
+            if stream:
+                return self._iter_response(response, event, started)
             api_answer = response.content
+            event.size = len(api_answer)
             return api_answer
         
         except requests.exceptions.HTTPError as e:
+            event.error = e
+            e.response.close()
             if e.response.status_code == 404:
                 return ValueError(
                     f'No match found for {self.id} in NBB database')
@@ -126,12 +303,76 @@ class CompanyData:
             
         # For future errors
         except requests.exceptions.RequestException as req_err:
-            print(f"This is a Request Error: {req_err}")
+            event.error = req_err
+            event.retries = getattr(req_err, 'retries', 0)
             raise req_err
         except Exception as err:
-            print(f"This is a regular Error: {err}")
+            event.error = err
             raise err
+        finally:
+            if not stream or event.error is not None:
+                event.latency = time.monotonic() - started
+                self.metrics.record(event)
     
+    def _iter_response(self, response, event=None, started=None,
+                       chunk_size=64 * 1024):
+        """
+        Yield chunks of the body and close the response afterwards. The
+        event is recorded then, with the bytes received.
+        """
+        size = 0
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                size += len(chunk)
+                yield chunk
+        except Exception as e:
+            if event is not None:
+                event.error = e
+            raise
+        finally:
+            response.close()
+            if event is not None:
+                event.size = size
+                event.latency = time.monotonic() - started
+                self.metrics.record(event)
+
+    def _cached_call(self, url: str, accept_form: str,
+                     namespace: str, key: str) -> bytes:
+        """
+        Return response from the cache or make the API call and cache it.
+
+        Errors returned by '_api_call' are passed on and never cached.
+        """
+        if self.cache is None:
+            return self._api_call(url, accept_form)
+
+        cached = self.cache.get(namespace, key)
+        if cached is not None:
+            self.metrics.record(instrumentation.RequestEvent(
+                url, cache=instrumentation.HIT, size=len(cached)))
+            return cached
+
+        api_answer = self._api_call(url, accept_form,
+                                    cache_status=instrumentation.MISS)
+        if isinstance(api_answer, bytes):
+            self.cache.set(namespace, key, api_answer)
+        return api_answer
+
+    def _filing_cache_key(self, reference: str, accept_type: str) -> str:
+        """
+        Return cache key of a filing, e.g. '2023-00012345.x.jsonxbrl', or
+        '2023-00012345.improved.x.jsonxbrl' outside the authentic database.
+        """
+        if self.database != 'authentic':
+            reference = f'{reference}.{self.database}'
+        return f"{reference}.{accept_type.split('/')[-1]}"
+
+    def _references_cache_key(self) -> str:
+        """Return cache key of the references, e.g. '0403170701.extracts'."""
+        if self.database != 'authentic':
+            return f'{self.id}.{self.database}'
+        return self.id
+
     def _handle_df_of_references(
             self, 
             df_of_references: pd.DataFrame) -> pd.DataFrame:
@@ -170,12 +411,17 @@ class CompanyData:
         """
         Return DataFrame. 
         """
-        api_answer = self._api_call(
+        api_answer = self._cached_call(
             self._reference_uri_creation(), 
-            accept_reference)
+            accept_reference,
+            cch.REFERENCES, self._references_cache_key())
         
         if isinstance(api_answer, ValueError):
-            print(api_answer)
+            # The failed request itself is logged and counted by metrics.
+            instrumentation.logger.info('%s', api_answer)
+        elif isinstance(api_answer, Exception):
+            # Any other HTTP error, e.g. a 401 for a refused key.
+            raise api_answer
         else:
             df_of_references = pd.json_normalize(json.loads(api_answer))
             df_of_references = self._handle_df_of_references(df_of_references)
@@ -183,42 +429,114 @@ class CompanyData:
 
     def _fetch_data(
             self, 
-            accept_type='application/x.jsonxbrl',
+            accept_type=None,
             year=1) -> dict:
         """
         Make API call based on requested years and return dictionary. 
 
         The amount of keys in the dictionary is equal to the amount of years 
-        requested in 'fetch_references()'. Currently, it does not accept XBRL 
-        format.
+        requested in 'fetch_references()'. XBRL filings are only read with
+        'concepts' set. Filings that fail are left out and kept in
+        'self.errors'.
         """
         data_dictionary = {}
+        filing_requests, add_info_dict = self._filing_requests(year)
+
+        self.errors = []
+        for reference, data_url in filing_requests:
+            try:
+                filing = self._fetch_filing(
+                    reference, data_url, add_info_dict, accept_type)
+                data_dictionary[filing.filing_reference] = filing
+            except Exception as e:
+                self.errors.append(e)
+                instrumentation.logger.warning(
+                    'Filing %s of %s left out: %s', reference, self.id, e)
+        return data_dictionary
+
+    def _filing_requests(self, year=1) -> tuple:
+        """
+        Return list of (ReferenceNumber, URL) and dictionary with additional
+        info per reference.
+
+        Both are empty if no filings are found, e.g. after a 404 error.
+        """
+        if self.reference_table is None:
+            return [], {} # If 404 error, alternative way?
         reference_df = self.reference_table.tail(year)
-    
-        if not reference_df.empty:
-            reference_URLs = reference_df['AccountingDataURL']
-            add_info_dict = (reference_df.set_index('ReferenceNumber')
-                        [['ExerciseDates.startDate', 'ExerciseDates.endDate',
-                          'ModelType', 'DepositType',
-                          'ActivityCode','LegalForm']]
-                        .to_dict('index'))
-            
-            for data_url in reference_URLs:
-                try:
-                    data = self._api_call(
-                                    url=data_url, 
-                                    accept_form=accept_type)
-                    response_dict = json.loads(data)
-                    uniq_id = response_dict.get('ReferenceNumber')
-                    response_dict['Additional Info'] = add_info_dict[uniq_id]
-                    data_dictionary[uniq_id] = Filing(response_dict)
-                except Exception as e:
-                    print(e)
-                    e = 'Not a JSONXBRL'
-                    print(e)
+        if reference_df.empty:
+            return [], {}
+
+        filing_requests = list(zip(reference_df['ReferenceNumber'],
+                                   reference_df['AccountingDataURL']))
+        add_info_dict = (reference_df.set_index('ReferenceNumber')
+                    [['ExerciseDates.startDate', 'ExerciseDates.endDate',
+                      'ModelType', 'DepositType',
+                      'ActivityCode','LegalForm']]
+                    .to_dict('index'))
+        return filing_requests, add_info_dict
+
+    def _fetch_filing(
+            self,
+            reference: str,
+            data_url: str,
+            add_info_dict: dict,
+            accept_type=None) -> 'Filing':
+        """
+        Make API call for one filing and return a Filing object.
+
+        The format is that of the database unless 'accept_type' is given.
+        Raises an error if the response can not be read as a JSONXBRL.
+        With 'sections' set, only those sections of the JSONXBRL are kept.
+        Without a cache the response is then parsed while it streams in.
+        With 'concepts' set, a filing that fails as JSONXBRL is requested
+        again as XBRL, which is always parsed while it streams in.
+        """
+        accept_type = accept_type or self.accept_type
+        data = self._filing_data(reference, data_url, accept_type,
+                                 stream=self.sections is not None)
+        if (isinstance(data, Exception) and self.concepts is not None
+                and accept_type != xbrl.XBRL_TYPE):
+            accept_type = xbrl.XBRL_TYPE
+            data = self._filing_data(reference, data_url, accept_type,
+                                     stream=True)
+        if isinstance(data, Exception):
+            raise data
+
+        if accept_type == xbrl.XBRL_TYPE:
+            if self.concepts is None:
+                raise ValueError('Reading an XBRL filing needs concepts, '
+                                 'see xbrl.py')
+            response_dict = xbrl.load_instance(
+                data, self.concepts, reference=reference,
+                enterprise_name=self.latest_filing_info.get('EnterpriseName'))
+        elif self.sections is None:
+            response_dict = json.loads(data)
         else:
-            pass # If 404 error, alternative way?
-        return data_dictionary
+            if isinstance(data, bytes):
+                data = [data]
+            response_dict = streaming.load_sections(data, self.sections)
+        response_dict = normalize_filing(response_dict, reference)
+        if response_dict.get('EnterpriseName') is None:
+            response_dict['EnterpriseName'] = self.latest_filing_info.get(
+                'EnterpriseName')
+        uniq_id = response_dict.get('ReferenceNumber')
+        response_dict['Additional Info'] = add_info_dict[uniq_id]
+        if self.compact:
+            return CompactFiling(response_dict)
+        return Filing(response_dict)
+
+    def _filing_data(self, reference: str, data_url: str, accept_type: str,
+                     stream=False):
+        """
+        Return the body of a filing, as chunks if 'stream' and there is no
+        cache, or the error returned by '_api_call'.
+        """
+        if stream and self.cache is None:
+            return self._api_call(data_url, accept_type, stream=True)
+        return self._cached_call(
+            data_url, accept_type, cch.FILINGS,
+            self._filing_cache_key(reference, accept_type))
 
     def _fetch_address(self, address_dict: dict) -> str:
         """
@@ -417,6 +735,41 @@ class CompanyData:
         # return write to excel? add parameter
         return company_df, admin_df, pi_df, shareholders_df, failed
 
+def normalize_filing(payload, reference=None) -> dict:
+    """
+    Return a filing payload as a JSONXBRL dictionary, the shape Filing reads.
+
+    The databases deliver filings in different shapes:
+        - JSONXBRL, 'Rubrics' is a list of {'Code', 'Period', 'Value'};
+        - pre-structured, 'Rubrics' is {period: {code: value}};
+        - flat, 'Rubrics' is {code: value} of period 'N';
+        - either of these as the only item of a list.
+    A missing 'ReferenceNumber' is set to 'reference'.
+    """
+    if isinstance(payload, list):
+        if len(payload) != 1:
+            raise ValueError(f'Expected one filing, got {len(payload)}')
+        payload = payload[0]
+    rubrics = payload.get('Rubrics')
+    if isinstance(rubrics, dict):
+        if all(isinstance(v, dict) for v in rubrics.values()):
+            by_period = rubrics
+        else:
+            by_period = {'N': rubrics}
+        payload['Rubrics'] = [
+            {'Code': code, 'Period': period, 'Value': str(value)}
+            for period, values in by_period.items()
+            for code, value in values.items() if value is not None]
+    if payload.get('ReferenceNumber') is None:
+        payload['ReferenceNumber'] = reference
+    return payload
+
+
+def _missing(value) -> bool:
+    """Return True for None and NaN, the values fillna() replaces."""
+    return value is None or value != value
+
+
 class Filing:
     """Represent an individual filing."""
     def __init__(self, response_dictionary):
@@ -444,236 +797,97 @@ class Filing:
             return self.dictionary[nested].get(key)
     
     def fetch_fin_data(self, period='N', metrics=True):
+        """
+        Return DataFrame with one row per period symbol (N, NM1, ...) and
+        one column per rubric, renamed to its description.
+
+        The rubrics are read in a single pass for all symbols and the
+        DataFrame is built once from the resulting rows. With metrics, the
+        ratios of ratios.filing_ratios are added as float columns, with a
+        flag column per ratio explaining why it is missing.
+        """
+        rows, codes = self._rubrics_by_period(period)
+        rows = [rows[symbol] for symbol in period]
+        ratio_columns = None
+        if metrics:
+            ratio_columns = ratios.filing_ratios(
+                rows, self.startDate, self.endDate,
+                model_type=self.modelType, activity_code=self.activityCode)
+        return self._rows_to_frame(rows, codes, ratio_columns)
+
+    def _rows_to_frame(self, rows: list, rubric_codes: set,
+                       ratio_columns=None) -> pd.DataFrame:
+        """
+        Return DataFrame of the rows indexed on ReferenceNumber, with columns
+        in order of appearance and missing values as 0. The rows are sorted
+        on Symbol, the rows of one filing share their dates.
+
+        It is one concat of a block per dtype: the few other columns
+        (Symbol, dates), the rubric values as one float64 array renamed to
+        their descriptions, then the ratios and their flags if given. A
+        frame of per-column arrays is slower with hundreds of rubrics.
+        """
+        columns = {}
+        for row in rows:
+            columns.update(dict.fromkeys(row))
+        codes = [k for k in columns if k in rubric_codes]
+        others = [k for k in columns
+                  if k not in rubric_codes and k != 'ReferenceNumber']
+        order = sorted(range(len(rows)), key=lambda i: rows[i]['Symbol'])
+        rows = [rows[i] for i in order]
+
+        references = [row.get('ReferenceNumber') for row in rows]
+        index = pd.Index([0 if _missing(r) else r for r in references],
+                         name='ReferenceNumber')
+        info = pd.DataFrame({k: [row.get(k) for row in rows]
+                             for k in others}, index=index)
+        if any(_missing(row.get(k)) for row in rows for k in others):
+            info = info.fillna(0)
 
-        df = pd.DataFrame()
+        values = np.array([[row.get(code, 0.0) for code in codes]
+                           for row in rows], dtype='float64')
+        values = values.reshape(len(rows), len(codes))
+        values[np.isnan(values)] = 0
+        blocks = [info, pd.DataFrame(values, columns=cds.rename(codes),
+                                     index=index)]
 
+        if ratio_columns is not None:
+            blocks += [
+                pd.DataFrame(np.column_stack(
+                    [ratio_columns[name] for name in ratios.RATIOS])[order],
+                    columns=ratios.RATIOS, index=index),
+                pd.DataFrame(np.column_stack(
+                    [ratio_columns[flag] for flag in ratios.FLAGS])[order],
+                    columns=ratios.FLAGS, index=index, dtype=object),
+                ]
+        return pd.concat(blocks, axis=1)
+
+    def _rubrics_by_period(self, period) -> tuple:
+        """
+        Return {symbol: {column: value}} for the requested period symbols,
+        reading the rubrics once, and the set of rubric codes found.
+        """
+        rows = {}
         for symbol in period:
-            temp_dict = {
+            rows[symbol] = {
                 'Symbol': symbol,
                 'ReferenceNumber': self.filing_reference,
                 'EnterpriseName': self.enterpriseName,
                 'StartDate': self.startDate,
                 'EndDate': self.endDate,
                 }
-                
-            for item in self.dictionary['Rubrics']:
-                if item['Period']==symbol:
-                    temp_dict[item.get('Code','0')]=float(item.get('Value', '0'))
-            
-            if metrics:
-                self.days_sales_outstanding(temp_dict)
-                self.days_payables_outstanding(temp_dict)
-                self.inventory_cycle_crude(temp_dict)
-                self.inventory_cycle_finished(temp_dict)
-                self.margin(temp_dict)
-
-            df = pd.concat([
-                df, 
-                pd.DataFrame(data=temp_dict, 
-                            index=[0])
-                            ], ignore_index=True, sort=False)
-        
-        df.rename(mapper=dct.reversed_dict, axis=1, inplace=True)
-        df.sort_values(['StartDate', 'Symbol'], 
-                    ascending=[False, True],
-                    inplace=True)
-        df.set_index('ReferenceNumber', drop=True, inplace=True)
-        df.fillna(0, inplace=True)
-        return df
-
-    def _period_check(self, temp_dict: dict):
-        begin = datetime.strptime(temp_dict.get('StartDate')\
-                                .replace('-','/'), "%Y/%m/%d")
-        end = datetime.strptime(temp_dict.get('EndDate')\
-                                .replace('-','/'), "%Y/%m/%d")
-
-        if (end - begin).days >= 362:
-            return True
-        else:
-            return False
 
-############################# Under review ####################################
-    def _check_appearance(self, code, to_check):
-        """Check string for appearance in list"""
-        check = [fnmatch.fnmatchcase(code, i) for i in to_check]
-        if sum(check) != 0:
-            return True
-        else:
-            return False
-        
-    def _full_schema_check(self, modeltype):
-        if modeltype in ['m02-f', 'm82-f']:
-            return True
-        else:
-            return False
-
-    def days_sales_outstanding(self, temp_dict: dict) -> dict:
-        '''
-        '''
-        if not self._period_check(temp_dict):
-            temp_dict['DSO'] = 'Not 365 days'
-            return temp_dict
-        
-        # numerator
-        handelsvorderingen = temp_dict.get('40', 0)
-        geendoss_handelseff = temp_dict.get('9150', 0)
-
-        # denominator
-        omzet = temp_dict.get('70', 0)
-        if omzet == 0:
-            temp_dict['DSO'] = 'Revenue (70) not given'
-            return temp_dict
-        
-        andere_bedrijfsopbr = temp_dict.get('74', 0)
-        exploit_subs = temp_dict.get('740', 0)
-        btw_door_vennootschap = temp_dict.get('9146', 0)
-        
-        numerator = handelsvorderingen + geendoss_handelseff
-        denominator = (omzet + andere_bedrijfsopbr
-                    - exploit_subs + btw_door_vennootschap)
-        
-        if denominator == 0:
-            dso = 'Zero Division'
-        else:
-            dso = round(numerator/denominator * 365)
-
-        temp_dict['DSO'] = dso
-        return temp_dict
+        codes = set()
+        for item in self.dictionary['Rubrics']:
+            row = rows.get(item['Period'])
+            if row is not None:
+                code = item.get('Code', '0')
+                row[code] = float(item.get('Value', '0'))
+                codes.add(code)
+        return rows, codes
 
-    def days_payables_outstanding(self, temp_dict: dict) -> dict:
-        '''
-        '''
-        if not self._period_check(temp_dict):
-            temp_dict['DPO'] = 'Not 365 days'
-            return temp_dict
-        
-        handelsschulden = temp_dict.get('44', 0)
-        aankopen = temp_dict.get('600/8', 0)
-        diensten_diverse = temp_dict.get('61', 0)
-        btw_aan_vennootschap = temp_dict.get('9145', 0)
-        
-        numerator = handelsschulden
-        denominator = aankopen + diensten_diverse + btw_aan_vennootschap
-        
-        if denominator == 0:
-            dpo = 'Zero Division'
-        else:
-            dpo = round(numerator/denominator * 365)
-        
-        temp_dict['DPO'] = dpo
-        return temp_dict
-
-    def inventory_cycle_finished(self, temp_dict: dict) -> dict:
-        '''
-        '''
-        if not self._period_check(temp_dict):
-            temp_dict['DIO_finished'] = 'Not 365 days'
-            return temp_dict
-        
-        if not self.modelType in ['m02-f', 'm82-f']:
-            temp_dict['DIO_finished'] = 'Not available for Abbr. or Micro model'
-            return temp_dict
-        
-        construction = self._check_appearance(self.activityCode,
-                                           ['41*', '42*','43*'])
-        
-        # Numerator
-        bedrijfskosten = (
-            temp_dict.get('60', 0) + temp_dict.get('61', 0)
-            + temp_dict.get('62', 0) + temp_dict.get('630', 0)
-            + temp_dict.get('631/4', 0) + temp_dict.get('635/80', 0)
-            + temp_dict.get('640/8', 0) + temp_dict.get('649',0)
-        )
-
-        wijziging_voorraad = temp_dict.get('71', 0)
-        geprod_vaste_act = temp_dict.get('72', 0)
-        exploit_subs = temp_dict.get('740', 0)
-        overheid_kapsub = temp_dict.get('9125', 0)
-
-        # Denominator
-        goed_bewerking = temp_dict.get('32', 0)
-        gereed_product = temp_dict.get('33', 0)
-        if construction:
-            onroerend_verkoop = temp_dict.get('35', 0)
-        else:
-            onroerend_verkoop = 0
-        best_in_uitvoering = temp_dict.get('37', 0)
-        
-        numerator = (bedrijfskosten - wijziging_voorraad - geprod_vaste_act
-                    - exploit_subs - overheid_kapsub)
-        denominator = (goed_bewerking + gereed_product 
-                    + onroerend_verkoop + best_in_uitvoering)
-        
-        if denominator == 0:
-            dio = int(0)
-        else:
-            dio = round(numerator/denominator)
-
-        temp_dict['DIO_finished'] = dio
-        return temp_dict
-
-    def inventory_cycle_crude(self, temp_dict: dict) -> dict:
-        '''
-        '''
-        if not self._period_check(temp_dict):
-            temp_dict['DIO_crude'] = 'Not 365 days'
-            return temp_dict
-        
-        if not self.modelType in ['m02-f', 'm82-f']:
-            temp_dict['DIO_crude'] = 'Not available for Abbr. or Micro model'
-            return temp_dict
-        
-        construction = self._check_appearance(self.activityCode,
-                                           ['41*', '42*','43*'])
-        
-        handelsgoederen_toename = temp_dict.get('60', 0)
-        grondstoffen = temp_dict.get('30/31', 0)   
-        handelsgoederen = temp_dict.get('34', 0)
-        if construction:
-            onroerend_verkoop = 0
-        else:
-            onroerend_verkoop = temp_dict.get('35', 0)
-        vooruitbetalingen = temp_dict.get('36', 0)
-
-        numerator = handelsgoederen_toename
-        denominator = (grondstoffen + handelsgoederen 
-                    + onroerend_verkoop + vooruitbetalingen)
-        
-        if denominator == 0:
-            dio = int(0)
-        else:
-            dio = round(numerator/denominator)
-
-        temp_dict['DIO_crude'] = dio
-        return temp_dict
-
-    def margin(self, temp_dict: dict) -> dict:
-        """Calculate gross margin"""
-        revenue = temp_dict.get('70', 0)
-        if int(revenue) == 0:
-            temp_dict['Margin'] = 'No revenue given'
-            return temp_dict
-        
-        profit = (temp_dict.get('9901', 0)
-                  - temp_dict.get('76A', 0)
-                  + temp_dict.get('66A', 0))
-        da = (temp_dict.get('630')
-              + temp_dict.get('631/4')
-              + temp_dict.get('635/8'))
-        other_rev = temp_dict.get('74', 0)
-        code740 = temp_dict.get('740', 0)
-        code9125 = temp_dict.get('9125', 0)
-
-        denominator = revenue + other_rev + code740
-        temp_dict['Gross Margin'] = ((profit + da)*100/denominator)
-        temp_dict['Net Margin'] = ((profit + code9125)*100/denominator)
-        return temp_dict
-        
-    def addedValue_ratio(self, temp_dict: dict) -> dict:
-        if self._full_schema_check(self.modelType):
-            nominator = (temp_dict.get('70', 0) + temp_dict.get('71', 0)
-                         + temp_dict.get('72', 0) + temp_dict.get('74', 0))
 
+############################# Under review ####################################
     # def ebit_da(self, temp_dict: dict) -> pd.DataFrame:
     #     """Calculate EBIT/DA"""
     #     winst_verlies = temp_dict.get('9903', 0)
@@ -699,6 +913,339 @@ class Filing:
     #     temp_dict['ebitda'] = ebitda
     #     return temp_dict
 
+class CompactFiling:
+    """
+    Represent an individual filing in little memory.
+
+    The rubrics are kept per period as two arrays: the integer ids of the
+    codes (int32) and their values (float64), in order of appearance. The decoded JSONXBRL
+    dictionary is dropped unless keep_dictionary=True. It offers the same
+    attributes and 'fetch_fin_data' as Filing.
+    """
+    __slots__ = ('enterpriseName', 'filing_reference', 'startDate',
+                 'endDate', 'modelType', 'activityCode', 'legalForm',
+                 'depositType', 'periods', '_raw')
+
+    def __init__(self, response_dictionary, keep_dictionary=False):
+        """Initialise atrributes."""
+        info = response_dictionary.get('Additional Info', {})
+        self.enterpriseName = response_dictionary['EnterpriseName']
+        self.filing_reference = response_dictionary['ReferenceNumber']
+        self.startDate = info.get('ExerciseDates.startDate')
+        self.endDate = info.get('ExerciseDates.endDate')
+        self.modelType = info.get('ModelType')
+        self.activityCode = info.get('ActivityCode')
+        self.legalForm = info.get('LegalForm')
+        self.depositType = info.get('DepositType')
+        self.periods = self._pack(response_dictionary.get('Rubrics', []))
+        self._raw = response_dictionary if keep_dictionary else None
+
+    @classmethod
+    def from_filing(cls, filing: 'Filing', keep_dictionary=False):
+        """Return a CompactFiling of a Filing."""
+        return cls(filing.dictionary, keep_dictionary=keep_dictionary)
+
+    def _pack(self, rubrics: list) -> dict:
+        """
+        Return {symbol: (code ids, values)}. A code given twice for a period
+        keeps its last value, like Filing.
+        """
+        code_id = cds.code_id
+        by_period = {}
+        for item in rubrics:
+            period = by_period.setdefault(sys.intern(item['Period']), {})
+            period[code_id(item.get('Code', '0'))] = \
+                float(item.get('Value', '0'))
+
+        periods = {}
+        for symbol, values in by_period.items():
+            periods[symbol] = (
+                np.fromiter(values.keys(), dtype='int32', count=len(values)),
+                np.fromiter(values.values(), dtype='float64',
+                            count=len(values)))
+        return periods
+
+    def get(self, code: str, period='N', default=0.0) -> float:
+        """Return the value of a rubric code in a period."""
+        if period not in self.periods or code not in cds.CODE_IDS:
+            return default
+        ids, values = self.periods[period]
+        found = np.flatnonzero(ids == cds.CODE_IDS[code])
+        if len(found):
+            return float(values[found[0]])
+        return default
+
+    def to_dict(self, period='N') -> dict:
+        """Return {code: value} of a period."""
+        if period not in self.periods:
+            return {}
+        ids, values = self.periods[period]
+        return dict(zip(cds.codes_of(ids).tolist(), values.tolist()))
+
+    @property
+    def dictionary(self) -> dict:
+        """
+        Return the JSONXBRL dictionary if it was kept, else a minimal one
+        rebuilt from the arrays (ReferenceNumber, EnterpriseName, Rubrics).
+        """
+        if self._raw is not None:
+            return self._raw
+        rubrics = [{'Code': code, 'Period': symbol, 'Value': value}
+                   for symbol, (ids, values) in self.periods.items()
+                   for code, value in zip(cds.codes_of(ids).tolist(),
+                                          values.tolist())]
+        return {'ReferenceNumber': self.filing_reference,
+                'EnterpriseName': self.enterpriseName,
+                'Rubrics': rubrics}
+
+    def drop_dictionary(self):
+        """Release the JSONXBRL dictionary if it was kept."""
+        self._raw = None
+
+    def _rubrics_by_period(self, period) -> tuple:
+        """Return rows per period symbol and rubric codes, as Filing does."""
+        rows = {}
+        codes = set()
+        for symbol in period:
+            row = {
+                'Symbol': symbol,
+                'ReferenceNumber': self.filing_reference,
+                'EnterpriseName': self.enterpriseName,
+                'StartDate': self.startDate,
+                'EndDate': self.endDate,
+                }
+            period_values = self.to_dict(symbol)
+            row.update(period_values)
+            codes.update(period_values)
+            rows[symbol] = row
+        return rows, codes
+
+    fetch_fin_data = Filing.fetch_fin_data
+    _rows_to_frame = Filing._rows_to_frame
+
+
+class LazyFilings(Mapping):
+    """
+    Represent a dictionary {ReferenceNumber: Filing} that requests each filing
+    on first access.
+    """
+    def __init__(self, company: CompanyData, filing_requests: list,
+                 add_info_dict: dict, accept_type=None):
+        """Initialise atrributes."""
+        self.company = company
+        self.urls = dict(filing_requests)
+        self.add_info_dict = add_info_dict
+        self.accept_type = accept_type
+        self.loaded = {}
+        self.errors = {}
+        self._locks = {reference: threading.Lock() for reference in self.urls}
+
+    def __getitem__(self, reference: str) -> 'Filing':
+        """
+        Return the Filing, request it if needed. Raise the error of the
+        request if it failed.
+        """
+        if reference in self.loaded:
+            return self.loaded[reference]
+        if reference not in self.urls:
+            raise KeyError(reference)
+        with self._locks[reference]:
+            if reference not in self.loaded:
+                self.loaded[reference] = self.company._fetch_filing(
+                    reference, self.urls[reference],
+                    self.add_info_dict, self.accept_type)
+        return self.loaded[reference]
+
+    def __iter__(self):
+        return (reference for reference in list(self.urls)
+                if reference not in self.errors)
+
+    def __len__(self):
+        return len(self.urls) - len(self.errors)
+
+    def __repr__(self):
+        return (f'LazyFilings({list(self)!r}, loaded={len(self.loaded)}, '
+                f'errors={len(self.errors)})')
+
+    def values(self):
+        """
+        Return the filings. All are requested first, like 'prefetch()', so
+        one that fails is left out instead of raising part-way.
+        """
+        return super(LazyFilings, self.prefetch()).values()
+
+    def items(self):
+        """Return (ReferenceNumber, Filing) pairs, see 'values()'."""
+        return super(LazyFilings, self.prefetch()).items()
+
+    def prefetch(self, max_workers=4) -> 'LazyFilings':
+        """
+        Request all filings not loaded yet over 'max_workers' threads.
+
+        Failed filings are left out of the mapping, as '_fetch_data' did, and
+        their errors are kept in 'errors'.
+        """
+        to_load = [reference for reference in self
+                   if reference not in self.loaded]
+        if not to_load:
+            return self
+
+        def load(reference):
+            try:
+                self[reference]
+            except Exception as e:
+                self.errors[reference] = e
+
+        max_workers = _workers(self.company.client, max_workers)
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(load, to_load))
+        return self
+
+
+def _workers(client, max_workers: int) -> int:
+    """
+    Return the amount of threads for a pool of requests. An adaptive
+    concurrency limit on the client needs enough threads to reach its
+    maximum, it holds them back itself.
+    """
+    concurrency = getattr(client, 'concurrency', None)
+    if concurrency is None:
+        return max_workers
+    return max(max_workers, concurrency.maximum)
+
+
+class PortfolioResult:
+    """Represent the outcome of fetching one company in 'fetch_many()'."""
+    def __init__(self, company_id: str, company=None):
+        """Initialise atrributes."""
+        self.company_id = company_id
+        self.company = company
+        self.errors = []
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the company and all its filings were retrieved."""
+        return self.company is not None and not self.errors
+
+    def __repr__(self):
+        return (f'PortfolioResult({self.company_id!r}, ok={self.ok}, '
+                f'errors={len(self.errors)})')
+
+
+def fetch_many(company_ids, year=1, max_workers=8,
+               accept_type=None, client=None, cache=None, sections=None,
+               compact=False, window=None, concepts=None,
+               database='authentic'):
+    """
+    Fetch many companies concurrently and yield PortfolioResult objects.
+
+    The reference call of every company and every individual filing call are
+    spread over one bounded thread pool. A result is yielded as soon as the
+    company and all of its requested filings are done, so the order of the
+    results is not the order of the input.
+
+    Failures are not swallowed: an invalid ID, a missing reference table or a
+    failing filing is added to 'errors' of the result of that company.
+
+    Without a client, one with a connection pool per worker is created.
+    With sections, only those sections of each filing are kept. With
+    compact=True, filings are CompactFiling objects. With concepts, filings
+    only available as XBRL are read too (see CompanyData). The database is
+    'authentic', 'improved' or 'extracts' (see DATABASES); the format of its
+    filings is used unless accept_type is given.
+
+    company_ids is read lazily: at most 'window' companies (default four per
+    worker) are in flight at once, so it can be a long generator, e.g. the
+    lines of a file. Every entry gets its own result, a duplicate ID too.
+
+    With a client that has a concurrency.AdaptiveLimiter, the limiter decides
+    how many requests are in flight and the pool gets enough threads for its
+    maximum.
+    """
+    if database not in DATABASES:
+        raise ValueError(f'Unknown database {database!r}')
+    if client is None:
+        client = CBSOClient(pool_size=max_workers)
+    max_workers = _workers(client, max_workers)
+    if window is None:
+        window = 4 * max_workers
+    # Results are keyed by the position in the input, IDs may repeat.
+    company_ids = enumerate(company_ids)
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        open_filings = {}
+        results = {}
+
+        while True:
+            while len(results) < window:
+                item = next(company_ids, _UNSET)
+                if item is _UNSET:
+                    break
+                token, company_id = item
+                result = PortfolioResult(company_id)
+                try:
+                    company = CompanyData(company_id, year=year, client=client,
+                                          cache=cache, sections=sections,
+                                          compact=compact, concepts=concepts,
+                                          database=database)
+                except ValueError as e:
+                    result.errors.append(e)
+                    yield result
+                    continue
+                result.company = company
+                results[token] = result
+                future = executor.submit(
+                    _fetch_portfolio_references, company, year)
+                pending[future] = (token, None)
+
+            if not pending:
+                break
+            done, _ = futures.wait(pending,
+                                   return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                token, reference = pending.pop(future)
+                result = results[token]
+                company = result.company
+
+                if reference is None:
+                    try:
+                        filing_requests, add_info_dict = future.result()
+                    except Exception as e:
+                        result.errors.append(e)
+                        result.company = None
+                        yield results.pop(token)
+                        continue
+                    company.data = {}
+                    open_filings[token] = len(filing_requests)
+                    for reference, data_url in filing_requests:
+                        filing_future = executor.submit(
+                            company._fetch_filing,
+                            reference, data_url, add_info_dict, accept_type)
+                        pending[filing_future] = (token, data_url)
+                else:
+                    try:
+                        filing = future.result()
+                        company.data[filing.filing_reference] = filing
+                    except Exception as e:
+                        result.errors.append(e)
+                    open_filings[token] -= 1
+
+                if open_filings.get(token) == 0:
+                    del open_filings[token]
+                    yield results.pop(token)
+
+
+def _fetch_portfolio_references(company: CompanyData, year: int) -> tuple:
+    """
+    Fetch the reference table of a company for 'fetch_many()'.
+
+    Return the filing URLs and additional info or raise an error if the
+    company is not found.
+    """
+    company._set_company_info()
+    return company._filing_requests(year)
+
 # def excel_export(company_dict, filename, period='N'):
 #     """
 #     Export to excel. Filename has to provide path.
@@ -0,0 +1,135 @@
+"""
+This script benchmarks fetching companies end to end against mock_server.py.
+
+A MockServer with the given faults is started in this process and
+CompanyData.fetch_many() pulls synthetic companies (or those of a fixture
+directory) from it through a CBSOClient with the given workers, rate limit
+and adaptive concurrency. No API key or network is needed. It prints the
+throughput, the client's view of the requests (latency, retries, errors, see
+instrumentation.py) and the responses the server sent per status.
+
+Example:
+    python bench_client.py --companies 500 --workers 16 --latency 0.05
+    python bench_client.py --throttle 0.1 --server-error 0.05 --retry-after 0
+    python bench_client.py --quota 50 --rate 45 --adaptive --workers 32
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import CompanyData as cd
+import bench_fixtures as fx
+from cache import REFERENCES
+from client import CBSOClient
+from concurrency import AdaptiveLimiter
+from instrumentation import Metrics
+from mock_server import Faults, MockServer, Quota
+from ratelimit import RateLimiter
+
+
+def run(company_ids, server: MockServer, client: CBSOClient, years=2,
+        workers=8) -> dict:
+    """Return the results of fetching company_ids from a running server."""
+    environment = cd.ENVIRONMENT
+    cd.ENVIRONMENT = server.url
+    started = time.perf_counter()
+    companies = filings = failed = 0
+    try:
+        for result in cd.fetch_many(company_ids, year=years,
+                                    max_workers=workers, client=client):
+            companies += 1
+            failed += not result.ok
+            if result.company is not None and result.company.data:
+                filings += len(result.company.data)
+    finally:
+        cd.ENVIRONMENT = environment
+    seconds = time.perf_counter() - started
+
+    snapshot = client.metrics.snapshot()
+    return {
+        'companies': companies,
+        'failed': failed,
+        'filings': filings,
+        'seconds': seconds,
+        'companies_per_second': companies / seconds,
+        'requests': snapshot['requests'],
+        'retries': snapshot['retries'],
+        'errors': snapshot['errors'],
+        'latency_p50': snapshot['latency']['p50'],
+        'latency_p95': snapshot['latency']['p95'],
+        'server': server.stats(),
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fixtures',
+                        help='directory of bench_fixtures.py, default '
+                             'synthetic companies')
+    parser.add_argument('--companies', type=int, default=200)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--adaptive', action='store_true',
+                        help='use an AdaptiveLimiter up to --workers')
+    parser.add_argument('--rate', type=float,
+                        help='requests per second of the client')
+    parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--backoff', type=float, default=0.5,
+                        help='backoff factor of the client in seconds')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--not-found', type=float, default=0.0)
+    parser.add_argument('--throttle', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--server-error', type=float, default=0.0)
+    parser.add_argument('--quota', type=float,
+                        help='requests per second the server accepts')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help='write the results to a JSON file')
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        company_ids = sorted(os.listdir(os.path.join(args.fixtures,
+                                                     REFERENCES)))
+        company_ids = company_ids[:args.companies]
+    else:
+        company_ids = [fx.company_id(i) for i in range(args.companies)]
+
+    faults = Faults(args.latency, args.jitter, args.not_found, args.throttle,
+                    args.server_error, args.retry_after, args.seed)
+    quota = Quota(args.quota) if args.quota else None
+    concurrency = None
+    if args.adaptive:
+        concurrency = AdaptiveLimiter(initial=min(4, args.workers),
+                                      maximum=args.workers)
+    client = CBSOClient(
+        pool_size=args.workers, max_retries=args.max_retries,
+        backoff_factor=args.backoff, concurrency=concurrency,
+        rate_limiter=RateLimiter(args.rate) if args.rate else None,
+        metrics=Metrics())
+
+    with MockServer(args.fixtures, faults, quota, years=args.years) as server:
+        result = run(company_ids, server, client, args.years, args.workers)
+    client.close()
+
+    print(f"{result['companies']:,} companies ({result['failed']:,} failed), "
+          f"{result['filings']:,} filings in {result['seconds']:.1f} s: "
+          f"{result['companies_per_second']:.1f} companies/s")
+    print(f"client: {result['requests']:,} requests, {result['retries']:,} "
+          f"retries, {result['errors']:,} errors, latency p50 "
+          f"{result['latency_p50']} s, p95 {result['latency_p95']} s")
+    print(f"server: {result['server']['requests']:,} requests, statuses "
+          f"{result['server']['statuses']}")
+    if concurrency is not None:
+        print(f'concurrency: {concurrency.metrics()}')
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+This script writes the fixtures used by bench_parse.py.
+
+A fixture directory has the layout of a cache.DiskCache: the raw reference
+table of every company in 'references/' and the raw JSONXBRL of every filing
+in 'filings/'. It is filled in one of two ways:
+
+    - 'record' requests real companies from the CBSO webservice (an API key
+      is needed once) and keeps the responses, so the benchmarks replay
+      real filings offline afterwards;
+    - 'synthetic' generates companies with the structure of real filings:
+      micro, abbreviated and full scheme rubrics, administrators and
+      participating interests. Full scheme filings get many administrators
+      and participations, to measure large filings.
+
+Example:
+    python bench_fixtures.py synthetic --out fixtures/ --companies 1000
+    python bench_fixtures.py record ids.txt --out fixtures/ --years 2
+"""
+
+import argparse
+import json
+import random
+import sys
+
+import dictionaries as dct
+from cache import DiskCache, FILINGS, REFERENCES
+
+# Model type and amount of rubric codes per period of each scheme, None is
+# every known code.
+SCHEMES = {
+    'micro': ('m07-f', 80),
+    'abbreviated': ('m01-f', 200),
+    'full': ('m02-f', None),
+    }
+# (legal persons, natural persons, participating interests) per scheme.
+SIZES = {
+    'micro': (0, 2, 0),
+    'abbreviated': (2, 5, 3),
+    'full': (20, 30, 50),
+    }
+ACCEPT = 'x.jsonxbrl'
+# Always present, the metrics read them.
+METRIC_CODES = ['70', '74', '740', '9146', '40', '9150', '44', '600/8', '61',
+                '9145', '60', '62', '630', '631/4', '635/8', '9901', '76A',
+                '66A', '9125', '32', '33', '71', '72', '30/31', '34', '36']
+
+
+def open_fixtures(directory: str) -> DiskCache:
+    """Return the fixture directory as an unbounded, non-expiring cache."""
+    return DiskCache(directory, max_size=None, references_ttl=None)
+
+
+def scheme_of(index: int) -> str:
+    """Return the scheme of the index-th synthetic company."""
+    return list(SCHEMES)[index % len(SCHEMES)]
+
+
+def company_id(index: int) -> str:
+    """Return a valid enterprise number for the index-th synthetic company."""
+    base = 20000000 + index
+    return f'{base:08d}{97 - base % 97:02d}'.zfill(10)
+
+
+def _address(rnd: random.Random) -> dict:
+    return {
+        'Street': rnd.choice(['Kerkstraat', 'Rue de la Loi', 'Stationsplein']),
+        'Number': str(rnd.randint(1, 200)),
+        'Box': rnd.choice([None, 'A', '2']),
+        'PostalCode': f'pcd:m{rnd.randint(1000, 9999)}',
+        'City': rnd.choice(['Brussel', 'Gent', 'Liège', 'Antwerpen']),
+        'Country': 'cty:mBE',
+        }
+
+
+def _person(rnd: random.Random) -> dict:
+    return {
+        'FirstName': rnd.choice(['jan', 'marie', 'luc', 'sofie']),
+        'LastName': rnd.choice(['peeters', 'dubois', 'janssens', 'lambert']),
+        'Address': _address(rnd),
+        }
+
+
+def _mandates(rnd: random.Random) -> list:
+    return [{
+        'FunctionMandate': f'fct:m{rnd.choice([10, 11, 12, 30])}',
+        'MandateDates': {'StartDate': f'{rnd.randint(2000, 2020)}-06-01',
+                         'EndDate': f'{rnd.randint(2021, 2030)}-06-01'},
+        } for _ in range(rnd.randint(0, 2))]
+
+
+def _entity(rnd: random.Random) -> dict:
+    return {
+        'Name': f'Entity {rnd.randint(1, 10 ** 6)} NV',
+        'Identifier': company_id(rnd.randint(10 ** 6, 2 * 10 ** 6)),
+        'Address': _address(rnd),
+        }
+
+
+def synthetic_filing(reference: str, scheme: str, year: int,
+                     seed=0) -> dict:
+    """Return a JSONXBRL dictionary with the structure of a real filing."""
+    rnd = random.Random(f'{seed}-{reference}')
+    codes = list(dct.reversed_dict)
+    size = SCHEMES[scheme][1]
+    if size is not None:
+        codes = sorted(set(METRIC_CODES) | set(rnd.sample(codes, size)),
+                       key=codes.index)
+    legal, natural, interests = SIZES[scheme]
+
+    return {
+        'ReferenceNumber': reference,
+        'EnterpriseName': f'Synthetic {scheme} {reference}',
+        'Rubrics': [{'Code': code, 'Period': period,
+                     'Value': f'{rnd.uniform(-1e5, 1e7):.2f}'}
+                    for period in ('N', 'NM1') for code in codes],
+        'Administrators': {
+            'LegalPersons': [{
+                'Entity': _entity(rnd),
+                'Representatives': [_person(rnd)
+                                    for _ in range(rnd.randint(1, 2))],
+                'Mandates': _mandates(rnd),
+                } for _ in range(legal)],
+            'NaturalPersons': [{
+                'Person': _person(rnd),
+                'Mandates': _mandates(rnd),
+                } for _ in range(natural)],
+            },
+        'ParticipatingInterests': [{
+            'Entity': _entity(rnd),
+            'AccountDate': f'{year - 1}-12-31',
+            'Currency': 'ccy:mEUR',
+            'Equity': round(rnd.uniform(0, 1e7), 2),
+            'NetResult': round(rnd.uniform(-1e6, 1e6), 2),
+            'ParticipatingInterestHeld': [{
+                'Line': str(line),
+                'Nature': rnd.choice(['Aandelen', 'Parts']),
+                'Number': rnd.randint(1, 10 ** 5),
+                'PercentageDirectlyHeld': round(rnd.uniform(0, 100), 2),
+                'PercentageSubsidiaries': round(rnd.uniform(0, 10), 2),
+                } for line in range(rnd.randint(1, 2))],
+            } for _ in range(interests)],
+        }
+
+
+def synthetic_references(enterprise_number: str, scheme: str,
+                         years=2, first_year=2020) -> list:
+    """
+    Return the reference table of a company, with a correction of the
+    last year to exercise the deduplication.
+    """
+    references = []
+    for year in range(first_year, first_year + years):
+        for deposit in ('Initial', 'Correction'):
+            if deposit == 'Correction' and year != first_year + years - 1:
+                continue
+            month = '05' if deposit == 'Initial' else '09'
+            reference = f'{year}-{enterprise_number}-{deposit[0]}'
+            references.append({
+                'ReferenceNumber': reference,
+                'DepositDate': f'{year + 1}-{month}-01',
+                'ExerciseDates': {'startDate': f'{year}-01-01',
+                                  'endDate': f'{year}-12-31'},
+                'ModelType': SCHEMES[scheme][0],
+                'DepositType': deposit,
+                'ActivityCode': '43210',
+                'LegalForm': '610',
+                'EnterpriseName': f'Synthetic {scheme} {enterprise_number}',
+                'EnterpriseNumber': enterprise_number,
+                'Address': {'Street': 'Kerkstraat', 'Number': '1',
+                            'Box': None, 'PostalCode': 'pcd:m9000',
+                            'City': 'Gent', 'CountryCode': 'cty:mBE'},
+                'AccountingDataURL': 'https://ws.cbso.nbb.be/authentic/'
+                                     f'deposit/{reference}/accountingData',
+                })
+    # A consolidated filing has no AccountingDataURL.
+    references.append({**references[0], 'AccountingDataURL': None,
+                       'ReferenceNumber': references[0]['ReferenceNumber']
+                       + '-C'})
+    return references
+
+
+def write_synthetic(directory: str, companies=1000, years=2, seed=0) -> int:
+    """Write synthetic fixtures and return the amount of filings."""
+    fixtures = open_fixtures(directory)
+    filings = 0
+    for index in range(companies):
+        enterprise_number = company_id(index)
+        scheme = scheme_of(index)
+        references = synthetic_references(enterprise_number, scheme, years)
+        fixtures.set(REFERENCES, enterprise_number,
+                     json.dumps(references).encode())
+        for item in references:
+            if item['AccountingDataURL'] is None:
+                continue
+            year = int(item['ExerciseDates']['endDate'][:4])
+            filing = synthetic_filing(item['ReferenceNumber'], scheme, year,
+                                      seed)
+            fixtures.set(FILINGS, f"{item['ReferenceNumber']}.{ACCEPT}",
+                         json.dumps(filing).encode())
+            filings += 1
+    return filings
+
+
+def record(directory: str, company_ids, years=2) -> int:
+    """
+    Request companies from the webservice into the fixture directory and
+    return the amount of filings recorded.
+    """
+    from CompanyData import CompanyData
+    fixtures = open_fixtures(directory)
+    filings = 0
+    for enterprise_number in company_ids:
+        company = CompanyData(enterprise_number, year=years, cache=fixtures)
+        company.prefetch()
+        filings += len(company.data)
+    return filings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    synthetic = commands.add_parser('synthetic',
+                                    help='generate synthetic companies')
+    synthetic.add_argument('--out', required=True)
+    synthetic.add_argument('--companies', type=int, default=1000)
+    synthetic.add_argument('--years', type=int, default=2)
+    synthetic.add_argument('--seed', type=int, default=0)
+    recorder = commands.add_parser('record',
+                                   help='record companies of the webservice')
+    recorder.add_argument('ids', help='file with one enterprise number per line')
+    recorder.add_argument('--out', required=True)
+    recorder.add_argument('--years', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.command == 'synthetic':
+        filings = write_synthetic(args.out, args.companies, args.years,
+                                  args.seed)
+    else:
+        with open(args.ids, encoding='utf-8') as f:
+            ids = [line.split('#', 1)[0].strip() for line in f]
+        filings = record(args.out, [i for i in ids if i], args.years)
+    print(f'{filings:,} filings in {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
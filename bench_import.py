@@ -0,0 +1,85 @@
+"""
+This script measures the cold import time of CompanyData.
+
+Every run imports the module in a fresh interpreter with '-X importtime' and
+reads the cumulative time of the module from its report. It also checks that
+none of the heavy dependencies (pandas, numpy, requests, dotenv) or the code
+tables are imported as a side effect. The exit status is 1 when the median
+time exceeds the budget or a heavy module was imported, so it can run in CI.
+
+Example:
+    python bench_import.py
+    python bench_import.py --module AsyncCompanyData --repeat 20 --budget 50
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY = ('pandas', 'numpy', 'requests', 'dotenv', 'dictionaries', 'codes',
+         'ratios')
+
+SCRIPT = """
+import sys
+import {module}
+print('LOADED', ' '.join(sorted(name for name in {heavy!r}
+                                if name in sys.modules)))
+"""
+
+
+def import_once(module: str) -> tuple:
+    """Return (milliseconds, heavy modules loaded) of one cold import."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         SCRIPT.format(module=module, heavy=HEAVY)],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f'Importing {module} failed:\n{result.stderr}')
+
+    micros = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            micros = int(parts[1])
+    loaded = []
+    for line in result.stdout.splitlines():
+        if line.startswith('LOADED'):
+            loaded = line.split()[1:]
+    if micros is None:
+        raise RuntimeError(f'No import time reported for {module}')
+    return micros / 1000, loaded
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--module', default='CompanyData')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--budget', type=float, default=50,
+                        help='maximum median import time in milliseconds')
+    args = parser.parse_args(argv)
+
+    # The first run compiles the .pyc files, it is not counted.
+    import_once(args.module)
+    times = []
+    loaded = set()
+    for _ in range(args.repeat):
+        milliseconds, heavy = import_once(args.module)
+        times.append(milliseconds)
+        loaded.update(heavy)
+
+    median = statistics.median(times)
+    print(f'import {args.module}: median {median:.1f} ms, '
+          f'min {min(times):.1f} ms, max {max(times):.1f} ms '
+          f'over {args.repeat} runs (budget {args.budget:.0f} ms)')
+    if loaded:
+        print('heavy modules imported: ' + ', '.join(sorted(loaded)))
+
+    return 1 if median > args.budget or loaded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+This script benchmarks the parsing of references and filings offline.
+
+The input is a fixture directory of bench_fixtures.py, recorded from the
+webservice or synthetic. No API calls are made. Each case is timed over
+'--repeat' runs (the best run counts) and then run once more under
+tracemalloc for its peak memory. The per-filing cases take the first
+'--sample' filings of each scheme, the panel takes every company:
+
+    references              _handle_df_of_references, per company
+    decode[scheme]          json.loads and Filing(), per filing
+    fin_data[scheme]        Filing.fetch_fin_data(['N', 'NM1']), per filing
+    ratios[filing]          ratios.compute_ratios of one filing's frame
+                            (N and NM1), per filing
+    administrators          CompanyData._fetch_administrators, per filing
+    participating_interests CompanyData._fetch_participating_interests
+    panel                   fetch_fin_data of every company concatenated and
+                            ratios.add_ratios, per company
+    ratios[panel]           ratios.add_ratios of that panel alone, per company
+
+Results can be saved and compared with an earlier run; the exit status is 1
+when a case got slower than the tolerance allows.
+
+Example:
+    python bench_fixtures.py synthetic --out fixtures/
+    python bench_parse.py fixtures/ --save baseline.json
+    python bench_parse.py fixtures/ --compare baseline.json --tolerance 0.2
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+import CompanyData as cd
+import ratios
+from bench_fixtures import ACCEPT, open_fixtures
+from cache import FILINGS, REFERENCES
+
+SCHEMES = {'m07-f': 'micro', 'm87-f': 'micro', 'm01-f': 'abbreviated',
+           'm81-f': 'abbreviated', 'm02-f': 'full', 'm82-f': 'full'}
+
+
+class Fixtures:
+    """Represent the companies and filings of a fixture directory."""
+    def __init__(self, directory: str, limit=None):
+        """Initialise the class' attributes and read the raw responses."""
+        cache = open_fixtures(directory)
+        ids = sorted(os.listdir(os.path.join(directory, REFERENCES)))
+        if limit:
+            ids = ids[:limit]
+        # Offline, the shared client is never used for a request.
+        self.company = cd.CompanyData(ids[0] if ids else '0403170701')
+
+        self.references = {}
+        self.filings = []
+        for company_id in ids:
+            raw = cache.get(REFERENCES, company_id)
+            self.references[company_id] = raw
+            table = self.company._handle_df_of_references(
+                pd.json_normalize(json.loads(raw)))
+            add_info = (table.set_index('ReferenceNumber')
+                        [['ExerciseDates.startDate', 'ExerciseDates.endDate',
+                          'ModelType', 'DepositType', 'ActivityCode',
+                          'LegalForm']]
+                        .to_dict('index'))
+            for reference, info in add_info.items():
+                data = cache.get(FILINGS, f'{reference}.{ACCEPT}')
+                if data is not None:
+                    self.filings.append((company_id, info, data))
+
+    def by_scheme(self) -> dict:
+        """Return {scheme: [(add info, raw filing)]}."""
+        schemes = {}
+        for _, info, data in self.filings:
+            scheme = SCHEMES.get(info['ModelType'], info['ModelType'])
+            schemes.setdefault(scheme, []).append((info, data))
+        return schemes
+
+    def decoded(self, items) -> list:
+        """Return Filing objects of (add info, raw filing) pairs."""
+        return [_filing(data, info) for info, data in items]
+
+
+def _filing(data: bytes, info: dict) -> cd.Filing:
+    response_dict = json.loads(data)
+    response_dict['Additional Info'] = info
+    return cd.Filing(response_dict)
+
+
+def cases(fixtures: Fixtures, sample=None) -> list:
+    """Return (name, function, items, bytes) of every benchmark case."""
+    company = fixtures.company
+    result = []
+
+    raws = list(fixtures.references.values())[:sample]
+    result.append((
+        'references',
+        lambda: [company._handle_df_of_references(
+            pd.json_normalize(json.loads(raw))) for raw in raws],
+        len(raws), sum(map(len, raws))))
+
+    sampled = []
+    for scheme, items in sorted(fixtures.by_scheme().items()):
+        items = items[:sample]
+        sampled += items
+        size = sum(len(data) for _, data in items)
+        filings = fixtures.decoded(items)
+        result.append((f'decode[{scheme}]',
+                       lambda items=items: fixtures.decoded(items),
+                       len(items), size))
+        result.append((
+            f'fin_data[{scheme}]',
+            lambda filings=filings: [f.fetch_fin_data(['N', 'NM1'])
+                                     for f in filings],
+            len(filings), size))
+
+    filings = fixtures.decoded(sampled)
+    frames = [(f.fetch_fin_data(['N', 'NM1'], metrics=False), f.modelType,
+               f.activityCode) for f in filings]
+    result.append((
+        'ratios[filing]',
+        lambda: [ratios.compute_ratios(frame, model_type, activity_code)
+                 for frame, model_type, activity_code in frames],
+        len(frames), None))
+
+    administrators = [f.dictionary['Administrators'] for f in filings
+                      if f.dictionary.get('Administrators')]
+    result.append((
+        'administrators',
+        lambda: [company._fetch_administrators(a) for a in administrators],
+        len(administrators), None))
+    interests = [f.dictionary['ParticipatingInterests'] for f in filings
+                 if f.dictionary.get('ParticipatingInterests') is not None]
+    result.append((
+        'participating_interests',
+        lambda: [company._fetch_participating_interests(p)
+                 for p in interests],
+        len(interests), None))
+
+    latest = {}
+    for company_id, info, data in fixtures.filings:
+        latest[company_id] = (info, data)
+    latest = dict(zip(latest, fixtures.decoded(latest.values())))
+
+    def frame():
+        frame = pd.concat([f.fetch_fin_data(['N'], metrics=False)
+                           for f in latest.values()])
+        info = pd.DataFrame({
+            'ModelType': [f.modelType for f in latest.values()],
+            'ActivityCode': [f.activityCode for f in latest.values()],
+            }, index=frame.index)
+        return pd.concat([frame, info], axis=1)
+    result.append(('panel', lambda: ratios.add_ratios(frame()), len(latest),
+                   None))
+    panel = frame() if latest else None
+    result.append(('ratios[panel]', lambda: ratios.add_ratios(panel),
+                   len(latest), None))
+    return result
+
+
+def measure(function, repeat: int) -> tuple:
+    """Return (best seconds, peak bytes) of a function."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(fixtures: Fixtures, repeat=3, only=None, sample=None) -> dict:
+    """
+    Return {case: {'items', 'seconds', 'per_second', 'mb_per_second',
+    'peak_mb'}} and print a line per case.
+    """
+    results = {}
+    print(f"{'case':<28}{'items':>8}{'items/s':>12}{'MB/s':>9}"
+          f"{'peak MB':>10}")
+    for name, function, items, size in cases(fixtures, sample):
+        if only and not any(part in name for part in only):
+            continue
+        if not items:
+            continue
+        seconds, peak = measure(function, repeat)
+        results[name] = {
+            'items': items,
+            'seconds': seconds,
+            'per_second': items / seconds,
+            'mb_per_second': size / seconds / 1e6 if size else None,
+            'peak_mb': peak / 1e6,
+            }
+        mb = results[name]['mb_per_second']
+        print(f'{name:<28}{items:>8,}{items / seconds:>12,.0f}'
+              f"{'-' if mb is None else f'{mb:.1f}':>9}"
+              f'{peak / 1e6:>10.1f}', flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return the cases slower than the baseline by more than tolerance."""
+    slower = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        change = before['per_second'] / result['per_second'] - 1
+        if change > tolerance:
+            slower.append((name, change))
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('fixtures', help='directory of bench_fixtures.py')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--limit', type=int,
+                        help='read only the first companies')
+    parser.add_argument('--sample', type=int, default=200,
+                        help='filings per scheme in the per-filing cases')
+    parser.add_argument('--only', nargs='*',
+                        help='run the cases containing one of these names')
+    parser.add_argument('--save', help='write the results to a JSON file')
+    parser.add_argument('--compare', help='JSON file of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown against --compare, 0.2 = 20%%')
+    args = parser.parse_args(argv)
+
+    fixtures = Fixtures(args.fixtures, args.limit)
+    print(f'{len(fixtures.references):,} companies, '
+          f'{len(fixtures.filings):,} filings')
+    results = run(fixtures, args.repeat, args.only, args.sample)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline, args.tolerance)
+        for name, change in slower:
+            print(f'slower: {name} by {change:.0%}')
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
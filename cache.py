@@ -0,0 +1,153 @@
+"""
+This module offers caches for API responses of the NBB.
+
+Filed annual accounts never change once deposited (a correction gets a new
+ReferenceNumber), so filings can be kept forever. Reference tables do change
+when a new filing is deposited and are only kept for a limited time.
+
+A cache stores raw response bytes per namespace and key:
+    - namespace 'filings', key 'ReferenceNumber.format', kept permanently.
+    - namespace 'references', key company ID, kept for 'references_ttl'.
+
+Any object with the same get/set methods as ResponseCache can be passed to
+CompanyData(cache=...), subclassing it is optional.
+"""
+
+import abc
+import os
+import re
+import tempfile
+import threading
+import time
+
+FILINGS = 'filings'
+REFERENCES = 'references'
+
+
+class ResponseCache(abc.ABC):
+    """Interface of a response cache."""
+    @abc.abstractmethod
+    def get(self, namespace: str, key: str):
+        """Return cached bytes or None."""
+
+    @abc.abstractmethod
+    def set(self, namespace: str, key: str, value: bytes):
+        """Store bytes."""
+
+
+class DiskCache(ResponseCache):
+    """Represent a persistent, size-bounded cache in a directory."""
+    def __init__(self, directory: str, max_size=2 * 1024 ** 3,
+                 references_ttl=24 * 3600):
+        """
+        Initialise the class' attributes.
+
+        max_size: bytes on disk before the least recently used entries are
+            evicted. None means unbounded.
+        references_ttl: seconds a reference table stays valid. None keeps
+            them forever, 0 disables caching them.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = {REFERENCES: references_ttl}
+        self._lock = threading.Lock()
+        self.size = 0
+        for path, stat in self._entries():
+            self.size += stat.st_size
+
+    def _path(self, namespace: str, key: str) -> str:
+        safe_key = re.sub(r'[^\w.-]', '_', key)
+        return os.path.join(self.directory, namespace, safe_key)
+
+    def _entries(self):
+        """Yield (path, stat) of all cached files."""
+        if not os.path.isdir(self.directory):
+            return
+        for namespace in os.scandir(self.directory):
+            if not namespace.is_dir():
+                continue
+            for entry in os.scandir(namespace.path):
+                if entry.is_file() and not entry.name.startswith('.'):
+                    yield entry.path, entry.stat()
+
+    def get(self, namespace: str, key: str):
+        """
+        Return cached bytes or None if missing or expired.
+
+        A hit refreshes the access time used for eviction. The modification
+        time is the moment the entry was stored and is used for the TTL.
+        """
+        path = self._path(namespace, key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        ttl = self.ttl.get(namespace)
+        if ttl is not None and time.time() - stat.st_mtime > ttl:
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError: # evicted by another thread
+            return None
+        return value
+
+    def set(self, namespace: str, key: str, value: bytes):
+        """
+        Store bytes, written atomically, and evict if over 'max_size'.
+        """
+        if self.ttl.get(namespace) == 0:
+            return
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                        prefix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(value)
+
+        with self._lock:
+            try:
+                self.size -= os.stat(path).st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self.size += len(value)
+            if self.max_size is not None and self.size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """
+        Remove least recently used entries until under 90% of 'max_size'.
+
+        Expired reference tables go first.
+        """
+        now = time.time()
+        target = self.max_size * 0.9
+        ttl = self.ttl.get(REFERENCES)
+
+        def priority(item):
+            path, stat = item
+            expired = (ttl is not None
+                       and os.path.basename(os.path.dirname(path)) == REFERENCES
+                       and now - stat.st_mtime > ttl)
+            return (not expired, stat.st_atime)
+
+        for path, stat in sorted(self._entries(), key=priority):
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+                self.size -= stat.st_size
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            for path, stat in list(self._entries()):
+                os.remove(path)
+            self.size = 0
@@ -0,0 +1,219 @@
+"""
+This module offers the HTTP client used by CompanyData to talk to the
+webservices of the NBB.
+
+One client holds one pooled requests.Session, so connections are kept alive
+and reused across calls (and threads) instead of paying a new TCP and TLS
+handshake for every filing. Throttling (429) and server errors (5xx) are
+retried with exponential backoff and jitter, honouring 'Retry-After'.
+With a ratelimit.RateLimiter every attempt first takes a token, so several
+threads or processes sharing a key stay under its quota. With a
+concurrency.AdaptiveLimiter the amount of requests in flight follows the
+latency and throttling of the server. With a keypool.KeyPool every attempt
+uses the least loaded subscription key, and a key that is throttled or
+refused is swapped for another one right away. The response (or the error
+raised once the retries run out) carries the amount of retries in
+'retries', see instrumentation.py.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from lazy import LazyModule
+
+requests = LazyModule('requests')
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Statuses that tell an adaptive concurrency limit to back off.
+OVERLOAD_STATUSES = (429, 503)
+# Statuses that quarantine a key of a KeyPool.
+KEY_STATUSES = (401, 403, 429)
+KEY_HEADER = 'NBB-CBSO-Subscription-Key'
+
+
+class CBSOClient:
+    """Represent a pooled, retrying HTTP session for the CBSO webservice."""
+    def __init__(
+            self,
+            pool_size=10,
+            timeout=(5, 60),
+            max_retries=5,
+            backoff_factor=0.5,
+            max_backoff=60,
+            retry_statuses=RETRY_STATUSES,
+            rate_limiter=None,
+            concurrency=None,
+            keys=None,
+            metrics=None):
+        """
+        Initialise the class' attributes.
+
+        pool_size: amount of keep-alive connections kept per host, should be
+            at least the amount of threads sharing this client.
+        timeout: seconds, either one number or a (connect, read) tuple.
+        max_retries: retries after the first attempt, 0 disables retrying.
+        backoff_factor: first backoff in seconds, doubled on every retry and
+            capped at max_backoff. Full jitter is applied.
+        rate_limiter: ratelimit.RateLimiter shared by everything using the
+            same subscription key, None sends requests as fast as they come.
+        concurrency: concurrency.AdaptiveLimiter deciding how many requests
+            may be in flight, the pool grows to its maximum.
+        keys: keypool.KeyPool, its keys replace the subscription key header
+            of the caller.
+        metrics: instrumentation.Metrics recording the requests made with
+            this client, None records them in instrumentation.metrics.
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = tuple(retry_statuses)
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.keys = keys
+        self.metrics = metrics
+        if concurrency is not None:
+            pool_size = max(pool_size, concurrency.maximum)
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url: str, headers: dict,
+            stream=False) -> requests.Response:
+        """
+        Return the response of a GET request, retrying where it makes sense.
+
+        The last response is returned once the retries are exhausted, the
+        caller decides what to do with the status code. Connection errors and
+        timeouts are retried as well and raised once the retries run out.
+        With stream=True the body is not read yet, see requests' docs.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self._send(url, headers, stream)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries:
+                    e.retries = attempt
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if (self.keys is not None
+                    and response.status_code in KEY_STATUSES
+                    and attempt < self.max_retries and self.keys.available()):
+                # That key is quarantined now, another one can go at once.
+                response.close()
+                attempt += 1
+                continue
+
+            if (response.status_code not in self.retry_statuses
+                    or attempt >= self.max_retries):
+                response.retries = attempt
+                return response
+
+            delay = self._backoff(attempt, response)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, url: str, headers: dict, stream: bool):
+        """
+        Return the response of one attempt, made with a key of the pool and
+        within the concurrency limit if the client has them.
+        """
+        key = None
+        if self.keys is not None:
+            key = self.keys.acquire()
+            headers = {**headers, KEY_HEADER: key.key}
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        started = time.monotonic()
+        response = None
+        failed = False
+        try:
+            response = self.session.get(
+                url, headers=headers, timeout=self.timeout, stream=stream)
+            return response
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout):
+            failed = True
+            raise
+        finally:
+            status = None if response is None else response.status_code
+            if self.concurrency is not None:
+                latency = None if response is None else \
+                    time.monotonic() - started
+                self.concurrency.release(
+                    latency, failed or status in OVERLOAD_STATUSES)
+            if key is not None:
+                retry_after = None
+                if status == 429:
+                    retry_after = self._retry_after(
+                        response.headers.get('Retry-After'))
+                self.keys.release(key, status, retry_after)
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        """
+        Return seconds to wait before the next attempt.
+
+        A 'Retry-After' header of the server takes precedence over the
+        exponential backoff.
+        """
+        if response is not None:
+            retry_after = self._retry_after(
+                response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+
+        cap = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        return random.uniform(0, cap)
+
+    def _retry_after(self, value):
+        """
+        Return seconds from a 'Retry-After' header or None.
+
+        The header is either a number of seconds or an HTTP date.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        from email.utils import parsedate_to_datetime
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> CBSOClient:
+    """Return the client shared by all CompanyData objects without one."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = CBSOClient()
+        return _default_client
@@ -0,0 +1,156 @@
+"""
+This module offers one registry of the rubric codes of the NBB, built once
+at import from dictionaries.bookcodes_dictionary.
+
+Every code gets a dense integer id, in order of the table. The codes and
+their labels are kept as arrays indexed by that id, so aligning filings of
+many companies and looking up values is array indexing instead of string
+dictionaries. Renaming a few hundred columns is fastest with the plain
+{code: label} dictionary LABELS. Codes not in the table (found in filings)
+are registered on the fly and get their code as label.
+
+Example:
+    ids = code_ids(['70', '9901'])
+    labels_of(ids)           # array of the descriptions
+    rename(df.columns)       # descriptions for known codes
+    matrix, ids = align([filing_a, filing_b], period='N')
+"""
+
+import sys
+import threading
+
+import numpy as np
+
+import dictionaries as dct
+
+_lock = threading.Lock()
+_codes = []
+_labels = []
+CODE_IDS = {}
+
+for _label, _code in dct.bookcodes_dictionary.items():
+    if _code in CODE_IDS: # a code listed twice keeps its last label
+        _labels[CODE_IDS[_code]] = _label
+    else:
+        CODE_IDS[_code] = len(_codes)
+        _codes.append(sys.intern(_code))
+        _labels.append(_label)
+
+# Codes of the table, unknown codes registered later are not counted.
+KNOWN = len(_codes)
+LABELS = dict(zip(_codes, _labels))
+
+MODEL_TYPES = np.array(list(dct.modelType_dict.values()), dtype=object)
+MODEL_TYPE_NAMES = np.array(list(dct.modelType_dict), dtype=object)
+MODEL_TYPE_IDS = {model: i for i, model in enumerate(MODEL_TYPES)}
+
+_arrays = (0, None, None)
+
+
+def _snapshot() -> tuple:
+    """Return the (codes, labels) arrays, rebuilt only after new codes."""
+    global _arrays
+    size, codes, labels = _arrays
+    if size != len(_codes):
+        with _lock:
+            size = len(_codes)
+            codes = np.array(_codes[:size], dtype=object)
+            labels = np.array(_labels[:size], dtype=object)
+            _arrays = (size, codes, labels)
+    return codes, labels
+
+
+def codes_array() -> np.ndarray:
+    """Return array of all registered codes, indexed by id."""
+    return _snapshot()[0]
+
+
+def labels_array() -> np.ndarray:
+    """Return array of all labels, indexed by id."""
+    return _snapshot()[1]
+
+
+def code_id(code: str) -> int:
+    """Return the integer id of a rubric code, registering it if new."""
+    found = CODE_IDS.get(code)
+    if found is None:
+        with _lock:
+            found = CODE_IDS.get(code)
+            if found is None:
+                found = len(_codes)
+                _codes.append(sys.intern(code))
+                _labels.append(_codes[-1])
+                CODE_IDS[code] = found
+    return found
+
+
+def code_ids(codes) -> np.ndarray:
+    """Return int32 array of the ids of the codes, registering new ones."""
+    return np.fromiter((code_id(code) for code in codes), dtype='int32')
+
+
+def codes_of(ids) -> np.ndarray:
+    """Return array of the codes of the ids."""
+    return codes_array()[np.asarray(ids, dtype='int64')]
+
+
+def labels_of(ids) -> np.ndarray:
+    """Return array of the labels of the ids."""
+    return labels_array()[np.asarray(ids, dtype='int64')]
+
+
+def label(code: str):
+    """Return the label of a code in the table, else None."""
+    found = CODE_IDS.get(code)
+    if found is None or found >= KNOWN:
+        return None
+    return _labels[found]
+
+
+def rename(columns) -> list:
+    """
+    Return the column names with every code of the table replaced by its
+    label. Other columns (Symbol, dates, ratios, ...) are left unchanged.
+    """
+    get = LABELS.get
+    return [get(column, column) for column in columns]
+
+
+def align(filings, period='N', ids=None) -> tuple:
+    """
+    Return a (filings x codes) float64 matrix of one period and the code ids
+    of its columns. Missing rubrics are NaN.
+
+    filings: CompactFiling objects, or anything with a 'dictionary' holding
+        'Rubrics'. ids: code ids of the columns, by default every code
+        registered after reading the filings.
+    """
+    packed = [_period_arrays(filing, period) for filing in filings]
+    if ids is None:
+        ids = np.arange(len(_codes), dtype='int32')
+    ids = np.asarray(ids, dtype='int32')
+
+    position = np.full(len(_codes), -1, dtype='int64')
+    position[ids] = np.arange(len(ids))
+    matrix = np.full((len(packed), len(ids)), np.nan, dtype='float64')
+    for row, (filing_ids, values) in enumerate(packed):
+        columns = position[filing_ids]
+        keep = columns >= 0
+        matrix[row, columns[keep]] = values[keep]
+    return matrix, ids
+
+
+def _period_arrays(filing, period: str) -> tuple:
+    """Return (code ids, values) of one period of a filing."""
+    periods = getattr(filing, 'periods', None)
+    if isinstance(periods, dict):
+        empty = (np.empty(0, dtype='int32'), np.empty(0, dtype='float64'))
+        return periods.get(period, empty)
+
+    values = {}
+    for item in filing.dictionary.get('Rubrics', []):
+        if item.get('Period') == period:
+            values[code_id(item.get('Code', '0'))] = \
+                float(item.get('Value', '0'))
+    return (np.fromiter(values.keys(), dtype='int32', count=len(values)),
+            np.fromiter(values.values(), dtype='float64', count=len(values)))
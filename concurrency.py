@@ -0,0 +1,147 @@
+"""
+This module offers an adaptive limit on the amount of requests in flight.
+
+A fixed amount of workers is either too timid when the CBSO webservice is
+quiet or too aggressive when it is busy. AdaptiveLimiter tunes the limit with
+AIMD (additive increase, multiplicative decrease), like TCP does:
+
+    - a response with a normal latency, while the limit is in use, raises
+      the limit by 'increase' per limit's worth of responses (about +1 per
+      round trip);
+    - a throttled response (429, 503), a timeout or connection error, or a
+      latency above 'tolerance' times the smoothed latency and at least
+      'min_delta' seconds above it multiplies the limit by 'decrease', at
+      most once per round trip. Without the floor, jitter of a millisecond
+      on a fast server would count as a spike.
+
+The current limit is available as 'limit' and, with more, in 'metrics()'.
+
+Example:
+    controller = AdaptiveLimiter(initial=4, maximum=64)
+    client = CBSOClient(concurrency=controller)
+    for result in fetch_many(ids, client=client):   # up to 64 threads
+        ...
+    controller.limit
+"""
+
+import threading
+import time
+
+
+class AdaptiveLimiter:
+    """Represent an AIMD controlled limit on concurrent requests."""
+    def __init__(self, initial=4, minimum=1, maximum=64, increase=1.0,
+                 decrease=0.5, tolerance=2.0, smoothing=0.1, min_delta=0.05):
+        """
+        Initialise the class' attributes.
+
+        initial, minimum, maximum: requests in flight.
+        increase: added to the limit per round trip without trouble.
+        decrease: factor applied to the limit on trouble.
+        tolerance, min_delta: a latency above tolerance times the smoothed
+            latency, and at least min_delta seconds above it, counts as a
+            spike.
+        smoothing: weight of a new sample in the smoothed latency.
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError('Expected 1 <= minimum <= initial <= maximum')
+        if not 0 < decrease < 1:
+            raise ValueError('decrease must be between 0 and 1')
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.min_delta = min_delta
+        self.smoothing = smoothing
+
+        self._limit = float(initial)
+        self._inflight = 0
+        self._latency = None
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+
+        self.successes = 0
+        self.throttled = 0
+        self.spikes = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """Return the current limit on requests in flight."""
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        """Return the amount of requests in flight."""
+        return self._inflight
+
+    def acquire(self):
+        """Block until a request may go out."""
+        with self._condition:
+            while self._inflight >= int(self._limit):
+                self._condition.wait()
+            self._inflight += 1
+
+    def release(self, latency=None, overloaded=False):
+        """
+        Report a finished request and adjust the limit.
+
+        latency: seconds until the response, None if there was none (the
+            limit is then left alone unless overloaded).
+        overloaded: the server throttled or failed to answer in time.
+        """
+        with self._condition:
+            saturated = self._inflight >= int(self._limit)
+            self._inflight -= 1
+            now = time.monotonic()
+
+            if overloaded:
+                self.throttled += 1
+                self._decrease(now)
+            elif latency is None:
+                pass
+            elif (self._latency is not None
+                    and latency > self.tolerance * self._latency
+                    and latency - self._latency > self.min_delta):
+                self.spikes += 1
+                self._decrease(now)
+            else:
+                self.successes += 1
+                # Only grow a limit that is actually used, an idle client
+                # would otherwise end up at the maximum.
+                if saturated:
+                    self._limit = min(self.maximum,
+                                      self._limit + self.increase / self._limit)
+
+            if latency is not None:
+                if self._latency is None:
+                    self._latency = latency
+                else:
+                    self._latency += self.smoothing * (latency - self._latency)
+            self._condition.notify_all()
+
+    def _decrease(self, now: float):
+        """Cut the limit, once per round trip for one congestion event."""
+        if now - self._last_decrease < (self._latency or 0):
+            return
+        self._limit = max(self.minimum, self._limit * self.decrease)
+        self._last_decrease = now
+        self.decreases += 1
+
+    def metrics(self) -> dict:
+        """Return the limit, requests in flight, latency and counters."""
+        with self._condition:
+            return {
+                'limit': int(self._limit),
+                'inflight': self._inflight,
+                'latency': self._latency,
+                'successes': self.successes,
+                'throttled': self.throttled,
+                'spikes': self.spikes,
+                'decreases': self.decreases,
+                }
+
+    def __repr__(self):
+        return (f'AdaptiveLimiter(limit={self.limit}, '
+                f'inflight={self._inflight}, maximum={self.maximum})')
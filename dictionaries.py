@@ -412,7 +412,7 @@ bookcodes_dictionary = {
     '(8731)':'8731',
     'Aantal aandelen (8732)':'8732',
     'Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening'
-    'van conversierechten - Bedrag van de lopende converteerbare leningen '
+    ' van conversierechten - Bedrag van de lopende converteerbare leningen '
     '(8740)':'8740',
     'Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening'
     ' van conversierechten - Bedrag van het te plaatsen kapitaal '
@@ -609,439 +609,11 @@ bookcodes_dictionary = {
     'Uitzendkrachten -  Kosten voor de vennootschap (1521)':'1521',
     }
 
-reversed_dict = {
-    "20":"OPRICHTINGSKOSTEN (20)",
-    "21/28":"VASTE ACTIVA (21/28)",
-    "21":"Immateriële vaste activa (21)",
-    "22/27":"Materiële vaste activa (22/27)",
-    "22":"Terreinen en gebouwen (22)",
-    "23":"Installaties, machines en uitrusting (23)",
-    "24":"Meubilair en rollend materieel (24)",
-    "25":"Leasing en soortgelijke rechten (25)",
-    "26":"Overige materiële vaste activa (26)",
-    "27":"Activa in aanbouw en vooruitbetalingen (27)",
-    "28":"Financiële vaste activa (28)",
-    "280/1":"Verbonden ondernemingen (280/1)",
-    "280":"Deelnemingen (280)",
-    "281":"Vorderingen (281)",
-    "282/3":"Ondernemingen waarmee een deelnemingsverhouding bestaat (282/3)",
-    "282":"Deelnemingen (282)",
-    "283":"Vorderingen (283)",
-    "284/8":"Andere financiële vaste activa (284/8)",
-    "284":"Aandelen (284)",
-    "285/8":"Vorderingen en borgtochten in contanten (285/8)",
-    "29/58":"VLOTTENDE ACTIVA (29/58)",
-    "29":"Vorderingen op meer dan één jaar (29)",
-    "290":"Handelsvorderingen (290)",
-    "291":"Overige vorderingen (291)",
-    "3":"Voorraden en bestellingen in uitvoering (3)",
-    "30/36":"Voorraden (30/36)",
-    "30/31":"Grond- en hulpstoffen (30/31)",
-    "32":"Goederen in bewerking (32)",
-    "33":"Gereed product (33)",
-    "34":"Handelsgoederen (34)",
-    "35":"Onroerende goederen bestemd voor verkoop (35)",
-    "36":"Vooruitbetalingen (36)",
-    "37":"Bestellingen in uitvoering (37)",
-    "40/41":"Vorderingen op ten hoogste één jaar (40/41)",
-    "40":"Handelsvorderingen (40)",
-    "41":"Overige vorderingen (41)",
-    "50/53":"Geldbeleggingen (50/53)",
-    "50":"Eigen aandelen (50)",
-    "51/53":"Overige beleggingen (52/53)",
-    "54/58":"Liquide middelen (54/58)",
-    "490/1":"Overlopende rekeningen (490/1)",
-    "20/58":"TOTAAL VAN DE ACTIVA (20/58)",
-    "10/15":"EIGEN VERMOGEN (10/15)",
-    "10/11":"Inbreng (10/11)",
-    "10":"Kapitaal (10)",
-    "100":"Geplaatst kapitaal (100)",
-    "101":"Niet-opgevraagd kapitaal (101)",
-    "11":"Buiten kapitaal (11)",
-    "1100/10":"Uitgiftepremies (1100/10)",
-    "1109/19":"Andere (1109/19)",
-    "12":"Herwaarderingsmeerwaarden (12)",
-    "13":"Reserves (13)",
-    "130/1":"Onbeschikbare reserves (130/1)",
-    "130":"Wettelijke reserve (130)",
-    "1311":"Statutair onbeschikbare reserves (1311)",
-    "1312":"Inkoop eigen aandelen (1312)",
-    "1313":"Financiële steunverlening (1313)",
-    "1319":"Overige (1319)",
-    "132":"Belastingvrije reserves (132)",
-    "133":"Beschikbare reserves (133)",
-    "14":"Overgedragen winst (verlies) (14)",
-    "15":"Kapitaalsubsidies (15)",
-    "19":"Voorschot aan de vennoten op de verdeling van het netto- actief (19)",
-    "16":"VOORZIENINGEN EN UITGESTELDE BELASTINGEN (16)",
-    "160/5":"Voorzieningen voor risico's en kosten (160/5)",
-    "160":"Pensioenen en soortgelijke verplichtingen (160)",
-    "161":"Belastingen (161)",
-    "162":"Grote herstellings- en onderhoudswerken (162)",
-    "163":"Milieuverplichtingen (163)",
-    "164/5":"Overige risico's en kosten (164/5)",
-    "168":"Uitgestelde belastingen (168)",
-    "17/49":"SCHULDEN (17/49)",
-    "17":"Schulden op meer dan één jaar (17)",
-    "170/4":"Financiële schulden (170/4)",
-    "170":"Achtergestelde leningen (170)",
-    "171":"Niet-achtergestelde obligatieleningen (171)",
-    "172":"Leasingschulden en soortgelijke schulden (172)",
-    "173":"Kredietinstellingen (173)",
-    "174":"Overige leningen (174)",
-    "175":"Handelsschulden (175)",
-    "1750":"Leveranciers (1750)",
-    "1751":"Te betalen wissels (1751)",
-    "176":"Vooruitbetalingen op bestellingen (176)",
-    "178/9":"Overige schulden (178/9)",
-    "42/48":"Schulden op ten hoogste één jaar (42/48)",
-    "42":"Schulden op meer dan één jaar die binnen het jaar vervallen (42)",
-    "43":"Financiële schulden (43)",
-    "430/8":"Kredietinstellingen (430/8)",
-    "439":"Overige leningen (439)",
-    "44":"Handelsschulden (44)",
-    "440/4":"Leveranciers (440/4)",
-    "441":"Te betalen wissels (441)",
-    "46":"Vooruitbetalingen op bestellingen (46)",
-    "45":"Schulden met betrekking tot belastingen, bezoldigingen en sociale lasten (45)",
-    "450/3":"Belastingen (450/3)",
-    "454/9":"Bezoldigingen en sociale lasten (454/9)",
-    "47/48":"Overige schulden (47/48)",
-    "492/3":"Overlopende rekeningen (492/3)",
-    "10/49":"TOTAAL VAN DE PASSIVA (10/49)",
-    "9900":"Brutomarge (9900)",
-    "70/76A":"Bedrijfsopbrengsten (70/76A)",
-    "70":"Omzet (70)",
-    "71":"Voorraad goederen in bewerking en gereed product en bestellingen in uitvoering: toename (afname) (71)",
-    "72":"Geproduceerde vaste activa (72)",
-    "74":"Andere bedrijfsopbrengsten (74)",
-    "76A":"Niet-recurrente bedrijfsopbrengsten (76A)",
-    "60/66A":"Bedrijfskosten (60/66A)",
-    "60":"Handelsgoederen, grond- en hulpstoffen (60)",
-    "600/8":"Aankopen (600/8)",
-    "609":"Voorraad: afname (toename) (609)",
-    "61":"Diensten en diverse goederen (61)",
-    "62":"Bezoldigingen, sociale lasten en pensioenen (62)",
-    "630":"Afschrijvingen en waardeverminderingen op oprichtingskosten, op immateriële en materiële vaste activa (630)",
-    "631/4":"Waardeverminderingen op voorraden, op bestellingen in uitvoering en op handelsvorderingen: toevoegingen (terugnemingen) (631/4)",
-    "635/8":"Voorzieningen voor risico's en kosten: toevoegingen (bestedingen en terugnemingen) (635/8)",
-    "640/8":"Andere bedrijfskosten (640/8)",
-    "649":"Als herstructureringskosten geactiveerde bedrijfskosten (649)",
-    "66A":"Niet-recurrente bedrijfskosten (66A)",
-    "9901":"Bedrijfswinst (Bedrijfsverlies) (9901)",
-    "75/76B":"Financiële opbrengsten (75/76B)",
-    "75":"Recurrente financiële opbrengsten (75)",
-    "750":"Opbrengsten uit financiële vaste activa (750)",
-    "751":"Opbrengsten uit vlottende activa (751)",
-    "752/9":"Andere financiële opbrengsten (752/9)",
-    "76B":"Niet-recurrente financiële opbrengsten (76B)",
-    "65/66B":"Financiële kosten (65/66B)",
-    "65":"Recurrente financiële kosten (65)",
-    "650":"Kosten van schulden (650)",
-    "651":"Waardeverminderingen op vlottende activa andere dan voorraden, bestellingen in uitvoering en handelsvorderingen: toevoegingen (terugnemingen) (651)",
-    "652/9":"Andere financiële kosten (652/9)",
-    "66B":"Niet-recurrente financiële kosten (66B)",
-    "9903":"Winst (Verlies) van het boekjaar vóór belasting (9903)",
-    "780":"Onttrekking aan de uitgestelde belastingen (780)",
-    "680":"Overboeking naar de uitgestelde belastingen (680)",
-    "67/77":"Belastingen op het resultaat (67/77)",
-    "670/3":"Belastingen (670/3)",
-    "77":"Regularisering van belastingen en terugneming van voorzieningen voor belastingen (77)",
-    "9904":"Winst (Verlies) van het boekjaar (9904)",
-    "789":"Onttrekking aan de belastingvrije reserves (789)",
-    "689":"Overboeking naar de belastingvrije reserves (689)",
-    "9905":"Te bestemmen winst (verlies) van het boekjaar (9905)",
-    "9906":"Te bestemmen winst (verlies) (9906)",
-    "14P":"Overgedragen winst (verlies) van het vorige boekjaar (14P)",
-    "791/2":"Onttrekking aan het eigen vermogen (791/2)",
-    "791":"aan de inbreng (791)",
-    "792":"aan de reserves (792)",
-    "691/2":"Toevoeging aan het eigen vermogen (691/2)",
-    "691":"aan de inbreng (691)",
-    "6920":"aan de wettelijke reserve (6920)",
-    "6921":"aan de overige reserves (6921)",
-    "794":"Tussenkomst van de vennoten in het verlies (794)",
-    "694/7":"Uit te keren winst (694/7)",
-    "694":"Vergoeding van de inbreng (694)",
-    "695":"Bestuurders of zaakvoerders (695)",
-    "696":"Werknemers (696)",
-    "697":"Andere rechthebbenden (697)",
-    "8025P":"IMA Aanschaffingswaarde per einde van het boekjaar (8025P)",
-    "8022":"IMA Aanschaffingen, met inbegrip van de geproduceerde vaste activa (8022)",
-    "8032":"IMA Overdrachten en buitengebruikstellingen (8032)",
-    "8042":"IMA Overboekingen van een post naar een andere (8042)",
-    "8052":"IMA Aanschaffingswaarde per einde van het boekjaar (8052)",
-    "8122P":"IMA Afschrijvingen en waardeverminderingen per einde van het boekjaar (8122P)",
-    "8072":"IMA Geboekt (8072)",
-    "8082":"IMA Teruggenomen (8082)",
-    "8092":"IMA Verworven van derden (8092)",
-    "8102":"IMA Afgeboekt na overdrachten en buitengebruikstellingen (8102)",
-    "8112":"IMA Overgeboekt van een post naar een andere (8112)",
-    "8122":"IMA Afschrijvingen en waardeverminderingen per einde van het boekjaar (8122)",
-    "211":"IMA NETTOBOEKWAARDE PER EINDE VAN HET BOEKJAAR (211)",
-    "8053P":"GW Aanschaffingswaarde per einde van het boekjaar (8053P)",
-    "8023":"GW Aanschaffingen, met inbegrip van de geproduceerde vaste activa (8023)",
-    "8033":"GW Overdrachten en buitengebruikstellingen (8033)",
-    "8043":"GW Overboekingen van een post naar een andere (8043)",
-    "8053":"GW Aanschaffingswaarde per einde van het boekjaar (8053)",
-    "8123P":"GW Afschrijvingen en waardeverminderingen per einde van het boekjaar (8123P)",
-    "8073":"GW Geboekt (8073)",
-    "8083":"GW Teruggenomen (8083)",
-    "8093":"GW Verworven van derden (8093)",
-    "8103":"GW Afgeboekt na overdrachten en buitengebruikstellingen (8103)",
-    "8113":"GW Overgeboekt van een post naar een andere (8113)",
-    "8123":"GW Afschrijvingen en waardeverminderingen per einde van het boekjaar (8123)",
-    "212":"GW NETTOBOEKWAARDE PER EINDE VAN HET BOEKJAAR (212)",
-    "8192P":"MA Aanschaffingswaarde per einde van het boekjaar (8192P)",
-    "8162":"MA Aanschaffingen, met inbegrip van de geproduceerde vaste activa (8162)",
-    "8172":"MA Overdrachten en buitengebruikstellingen (8172)",
-    "8182":"MA Overboekingen van een post naar een andere (8182)",
-    "8192":"MA Aanschaffingswaarde per einde van het boekjaar (8192)",
-    "8252P":"MA Meerwaarden per einde van het boekjaar (8252P)",
-    "8212":"MA Geboekt (8212)",
-    "8222":"MA Verworven van derden (8222)",
-    "8232":"MA Afgeboekt (8232)",
-    "8242":"MA Overgeboekt van een post naar een andere (8242)",
-    "8252":"MA Meerwaarden per einde van het boekjaar (8252)",
-    "8322P":"MA Afschrijvingen en waardeverminderingen per einde van het boekjaar (8322P)",
-    "8272":"MA Geboekt (8272)",
-    "8282":"MA Teruggenomen (8282)",
-    "8292":"MA Verworven van derden (8292)",
-    "8302":"MA Afgeboekt na overdrachten en buitengebruikstellingen (8302)",
-    "8312":"MA Overgeboekt van een post naar een andere (8312)",
-    "8322":"MA Afschrijvingen en waardeverminderingen per einde van het boekjaar (8322)",
-    "8193P":"MeuRolMat Aanschaffingswaarde per einde van het boekjaar (8193P)",
-    "8163":"MeuRolMat Aanschaffingen, met inbegrip van de geproduceerde vaste activa (8163)",
-    "8173":"MeuRolMat Overdrachten en buitengebruikstellingen (8173)",
-    "8183":"MeuRolMat Overboekingen van een post naar een andere (8183)",
-    "8193":"MeuRolMat Aanschaffingswaarde per einde van het boekjaar (8193)",
-    "8253P":"MeuRolMat Meerwaarden per einde van het boekjaar (8253P)",
-    "8213":"MeuRolMat Geboekt (8213)",
-    "8223":"MeuRolMat Verworven van derden (8223)",
-    "8233":"MeuRolMat Afgeboekt (8233)",
-    "8243":"MeuRolMat Overgeboekt van een post naar een andere (8243)",
-    "8253":"MeuRolMat Meerwaarden per einde van het boekjaar (8253)",
-    "8323P":"MeuRolMat Afschrijvingen en waardeverminderingen per einde van het boekjaar (8323P)",
-    "8273":"MeuRolMat Geboekt (8273)",
-    "8283":"MeuRolMat Teruggenomen (8283)",
-    "8293":"MeuRolMat Verworven van derden (8293)",
-    "8303":"MeuRolMat Afgeboekt na overdrachten en buitengebruikstellingen (8303)",
-    "8313":"MeuRolMat Overgeboekt van een post naar een andere (8313)",
-    "8323":"MeuRolMat Afschrijvingen en waardeverminderingen per einde van het boekjaar (8323)",
-    "8195P":"OvMat Aanschaffingswaarde per einde van het boekjaar (8195P)",
-    "8165":"OvMat Aanschaffingen, met inbegrip van de geproduceerde vaste activa (8165)",
-    "8175":"OvMat Overdrachten en buitengebruikstellingen (8175)",
-    "8185":"OvMat Overboekingen van een post naar een andere (8185)",
-    "8195":"OvMat Aanschaffingswaarde per einde van het boekjaar (8195)",
-    "8255P":"OvMat Meerwaarden per einde van het boekjaar (8255P)",
-    "8215":"OvMat Geboekt (8215)",
-    "8225":"OvMat Verworven van derden (8225)",
-    "8235":"OvMat Afgeboekt (8235)",
-    "8245":"OvMat Overgeboekt van een post naar een andere (8245)",
-    "8255":"OvMat Meerwaarden per einde van het boekjaar (8255)",
-    "8325P":"OvMat Afschrijvingen en waardeverminderingen per einde van het boekjaar (8325P)",
-    "8275":"OvMat Geboekt (8275)",
-    "8285":"OvMat Teruggenomen (8285)",
-    "8295":"OvMat Verworven van derden (8295)",
-    "8305":"OvMat Afgeboekt na overdrachten en buitengebruikstellingen (8305)",
-    "8315":"OvMat Overgeboekt van een post naar een andere (8315)",
-    "8325":"OvMat Afschrijvingen en waardeverminderingen per einde van het boekjaar (8325)",
-    "8392P":"FA Aanschaffingswaarde per einde van het boekjaar (8392P)",
-    "8362":"FA Aanschaffingen, met inbegrip van de geproduceerde vaste activa (8362)",
-    "8372":"FA Overdrachten en buitengebruikstellingen (8372)",
-    "8382":"FA Overboekingen van een post naar een andere (8382)",
-    "8392":"FA Aanschaffingswaarde per einde van het boekjaar (8392)",
-    "8452P":"FA Meerwaarden per einde van het boekjaar (8452P)",
-    "8412":"FA Geboekt (8412)",
-    "8422":"FA Verworven van derden (8422)",
-    "8432":"FA Afgeboekt (8432)",
-    "8442":"FA Overgeboekt van een post naar een andere (8442)",
-    "8452":"FA Meerwaarden per einde van het boekjaar (8452)",
-    "8522P":"FA Afschrijvingen en waardeverminderingen per einde van het boekjaar (8522P)",
-    "8472":"FA Geboekt (8472)",
-    "8482":"FA Teruggenomen (8482)",
-    "8492":"FA Verworven van derden (8492)",
-    "8502":"FA Afgeboekt na overdrachten en buitengebruikstellingen (8502)",
-    "8512":"FA Overgeboekt van een post naar een andere (8512)",
-    "8522":"FA Waardeverminderingen per einde van het boekjaar (8522)",
-    "8552P":"FA Niet-opgevraagde bedragen per einde van het boekjaar (8552P)",
-    "8542":"FA Mutaties tijdens het boekjaar (8542)",
-    "8552":"FA Niet-opgevraagde bedragen per einde van het boekjaar (8552)",
-    "283P":"FA NETTOBOEKWAARDE PER EINDE VAN HET BOEKJAAR (283P)",
-    "8582":"FA Toevoegingen (8582)",
-    "8592":"FA Terugbetalingen (8592)",
-    "8602":"FA Geboekte waardeverminderingen (8602)",
-    "8612":"FA Teruggenomen waardeverminderingen (8612)",
-    "8622":"FA Wisselkoersverschillen (8622)",
-    "8632":"FA Overige mutaties (8632)",
-    "283":"FA NETTOBOEKWAARDE PER EINDE VAN HET BOEKJAAR (283)",
-    "8652":"FA GECUMULEERDE WAARDEVERMINDERINGEN OP VORDERINGEN PER EINDE BOEKJAAR (8652)",
-    "8393P":"FA_andere Aanschaffingswaarde per einde van het boekjaar (8393P)",
-    "8363":"FA_andere Aanschaffingen, met inbegrip van de geproduceerde vaste activa (8363)",
-    "8373":"FA_andere Overdrachten en buitengebruikstellingen (8373)",
-    "8383":"FA_andere Overboekingen van een post naar een andere (8383)",
-    "8393":"FA_andere Aanschaffingswaarde per einde van het boekjaar (8393)",
-    "8453P":"FA_andere Meerwaarden per einde van het boekjaar (8453P)",
-    "8413":"FA_andere Geboekt (8413)",
-    "8423":"FA_andere Verworven van derden (8423)",
-    "8433":"FA_andere Afgeboekt (8433)",
-    "8443":"FA_andere Overgeboekt van een post naar een andere (8443)",
-    "8453":"FA_andere Meerwaarden per einde van het boekjaar (8453)",
-    "8523P":"FA_andere Afschrijvingen en waardeverminderingen per einde van het boekjaar (8523P)",
-    "8473":"FA_andere Geboekt (8473)",
-    "8483":"FA_andere Teruggenomen (8483)",
-    "8493":"FA_andere Verworven van derden (8493)",
-    "8503":"FA_andere Afgeboekt na overdrachten en buitengebruikstellingen (8503)",
-    "8513":"FA_andere Overgeboekt van een post naar een andere (8513)",
-    "8523":"FA_andere Waardeverminderingen per einde van het boekjaar (8523)",
-    "8553P":"FA_andere Niet-opgevraagde bedragen per einde van het boekjaar (8553P)",
-    "8543":"FA_andere Mutaties tijdens het boekjaar (8543)",
-    "8553":"FA_andere Niet-opgevraagde bedragen per einde van het boekjaar (8553)",
-    "285/8P":"FA_andere NETTOBOEKWAARDE PER EINDE VAN HET BOEKJAAR (285/8P)",
-    "8583":"FA_andere Toevoegingen (8583)",
-    "8593":"FA_andere Terugbetalingen (8593)",
-    "8603":"FA_andere Geboekte waardeverminderingen (8603)",
-    "8613":"FA_andere Teruggenomen waardeverminderingen (8613)",
-    "8623":"FA_andere Wisselkoersverschillen (8623)",
-    "8633":"FA_andere Overige mutaties (8633)",
-    "8653":"FA_andere GECUMULEERDE WAARDEVERMINDERINGEN OP VORDERINGEN PER EINDE BOEKJAAR (8653)",
-    "51":"Aandelen en geldbeleggingen andere dan vastrentende beleggingen (51)",
-    "8681":"Aandelen - Boekwaarde verhoogd met het niet-opgevraagde bedrag (8681)",
-    "8682":"Aandelen - Niet-opgevraagd bedrag (8682)",
-    "8683":"Edele metalen en kunstwerken (8683)",
-    "52":"Vastrentende effecten (v)",
-    "8684":"Vastrentende effecten uitgegeven door kredietinstellingen (8684)",
-    "53":"Termijnrekeningen bij kredietinstellingen (53)",
-    "8686":"Met een resterende looptijd of opzegtermijn van hoogstens één maand (8686)",
-    "8687":"Met een resterende looptijd of opzegtermijn van meer dan één maand en hoogstens één jaar(8687)",
-    "8788":"Met een resterende looptijd of opzegtermijn van meer dan één jaar (8788)",
-    "8689":"Hierboven niet-opgenomen overige geldbeleggingen (8689)",
-    "100P":"Geplaatst kapitaal per einde van het boekjaar (100P)",
-    "8702":"Aandelen op naam (8702)",
-    "8703":"Gedematerialiseerde aandelen (8703)",
-    "8712":"Opgevraagd, niet-gestort kapitaal Aandeelhouders die nog moeten volstorten (8712)",
-    "8721":"Eigen aandelen gehouden door de vennootschap zelf - Kapitaalbedrag (8721)",
-    "8722":"Aantal aandelen (8722)",
-    "8731":"Eigen aandelen gehouden door haar dochters - Kapitaalbedrag (8731)",
-    "8732":"Aantal aandelen (8732)",
-    "8740":"Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening van conversierechten - Bedrag van de lopende converteerbare leningen (8740)",
-    "8741":"Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening van conversierechten - Bedrag van het te plaatsen kapitaal (8741)",
-    "8742":"Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening van conversierechten - Maximum aantal uit te geven aandelen (8742)",
-    "8745":"Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening van inschrijvingsrechten - Aantal inschrijvingsrechten in omloop (8745)",
-    "8746":"Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening van inschrijvingsrechten - Bedrag van het te plaatsen kapitaal (8746)",
-    "8747":"Verplichtingen tot uitgifte van aandelen als gevolg van de uitoefening van inschrijvingsrechten - Maximum aantal uit te geven aandelen (8747)",
-    "8751":"Toegestaan, niet-geplaatst kapitaal (8751)",
-    "8761":"Aandelen buiten kapitaal - Verdeling - Aantal aandelen (8761)",
-    "8762":"Aandelen buiten kapitaal - Verdeling -Daaraan verbonden stemrecht (8762)",
-    "8771":"Uitsplitsing volgens de aandeelhouders - Aantal aandelen gehouden door de vennootschap zelf (8771)",
-    "8781":"Uitsplitsing volgens de aandeelhouders - Aantal aandelen gehouden door haar dochters (8781)",
-    "740":"Andere - exploitatiesubsidies en vanwege de overheid ontvangen compenserende bedragen (740)",
-    "9086":"Werknemers waarvoor de vennootschap een DIMONA-verklaring heeft ingediend of die zijn ingeschreven in het algemeen personeelsregister - Totaal aantal op de afsluitingsdatum (9086)",
-    "9087":"Gemiddeld personeelsbestand berekend in voltijdse equivalenten (9087)",
-    "9088":"Aantal daadwerkelijk gepresteerde uren (9088)",
-    "620":"Personeelskosten - Bezoldigingen en rechtstreekse sociale voordelen (620)",
-    "621":"Personeelskosten - Werkgeversbijdragen voor sociale verzekeringen (621)",
-    "622":"Personeelskosten - Werkgeverspremies voor bovenwettelijke verzekeringen (622)",
-    "623":"Personeelskosten - Andere personeelskosten (623)",
-    "624":"Personeelskosten - Ouderdoms- en overlevingspensioenen (624)",
-    "635":"Voorzieningen voor pensioenen en soortgelijke verplichtingen - Toevoegingen (bestedingen en terugnemingen) (635)",
-    "9110":"Waardeverminderingen - Op voorraden en bestellingen in uitvoering - Geboekt (9110)",
-    "9111":"Waardeverminderingen - Op voorraden en bestellingen in uitvoering - Teruggenomen (9111)",
-    "9112":"Waardeverminderingen - Op handelsvorderingen - Geboekt (9112)",
-    "9113":"Waardeverminderingen - Op handelsvorderingen - Teruggenomen (9113)",
-    "9115":"Voorzieningen voor risico's en kosten - Toevoegingen (9115)",
-    "9116":"Voorzieningen voor risico's en kosten - Bestedingen en terugnemingen (9116)",
-    "640":"Andere bedrijfskosten - Bedrijfsbelastingen en -taksen (640)",
-    "641/8":"Andere bedrijfskosten - Andere (641/8)",
-    "9096":"Uitzendkrachten en ter beschikking van de vennootschap gestelde personen - Totaal aantal op de afsluitingsdatum (9096)",
-    "9097":"Uitzendkrachten en ter beschikking van de vennootschap gestelde personen - Gemiddeld aantal berekend in voltijdse equivalenten (9097)",
-    "9098":"Uitzendkrachten en ter beschikking van de vennootschap gestelde personen - Aantal daadwerkelijk gepresteerde uren (9098)",
-    "617":"Uitzendkrachten en ter beschikking van de vennootschap gestelde personen - Kosten voor de vennootschap (617)",
-    "9125":"Door de overheid toegekende subsidies, aangerekend op de resultatenrekening: Kapitaalsubsidies (9125)",
-    "9126":"Door de overheid toegekende subsidies, aangerekend op de resultatenrekening: Interestsubsidies (9126)",
-    "754":"Uitsplitsing van de overige financiële opbrengsten - Gerealiseerde wisselkoersverschillen (754)",
-    "6501":"Afschrijving van kosten bij uitgifte van leningen (6501)",
-    "6502":"Geactiveerde interesten (6502)",
-    "6510":"Waardeverminderingen op vlottende activa - geboekt (6510)",
-    "6511":"Waardeverminderingen op vlottende activa - geboekt (6511)",
-    "653":"Andere FK - Bedrag van het disconto ten laste van de vennootschap bij de verhandeling van vorderingen (653)",
-    "6560":"Voorzieningen met fin. karakter - toevoegingen (6560)",
-    "6561":"Voorzieningen met fin. karakter - bestedingen en terugnemingen (6561)",
-    "654":"Uitsplitsing van overige fin. kosten - gerealiseerde wisselkoerswinsten (654)",
-    "655":"Uitsplitsing van overige fin. kosten - resultaten uit de omrekening van vreemde valuta (655)",
-    "760":"Terugneming van afschrijvingen en van waardeverminderingen op immateriële en materiële vaste activa (760)",
-    "7620":"Terugneming van voorzieningen voor niet-recurrente bedrijfsrisico's en - kosten (7620)",
-    "7630":"Meerwaarden bij de realisatie van immateriële en materiële vaste activa (7630)",
-    "764/8":"Andere niet-recurrente bedrijfsopbrengsten (764/8)",
-    "761":"Terugneming van waardeverminderingen op financiële vaste activa (761)",
-    "7621":"Terugneming van voorzieningen voor niet-recurrente financiële risico's en kosten (7621)",
-    "7631":"Meerwaarden bij de realisatie van financiële vaste activa (7631)",
-    "769":"Andere niet-recurrente financiële opbrengsten (769)",
-    "660":"Niet-recurrente afschrijvingen en waardeverminderingen op oprichtingskosten, op immateriële en materiële vaste activa (660)",
-    "6620":"Voorzieningen voor niet-recurrente bedrijfsrisico's en -kosten: toevoegingen (bestedingen) (6620)",
-    "6630":"Minderwaarden bij de realisatie van immateriële en materiële vaste activa (6630)",
-    "664/7":"Andere niet-recurrente bedrijfskosten (664/7)",
-    "6690":"Als herstructureringskosten geactiveerde niet-recurrente bedrijfskosten (6690)",
-    "661":"Waardeverminderingen op financiële vaste activa (661)",
-    "6621":"Voorzieningen voor niet-recurrente financiële risico's en kosten: toevoegingen (bestedingen) (6621)",
-    "6631":"Minderwaarden bij de realisatie van financiële vaste activa (6631)",
-    "668":"Andere niet-recurrente financiële kosten (668)",
-    "6691":"Als herstructureringskosten geactiveerde niet-recurrente financiële kosten (6691)",
-    "9134":"Belastingen op het resultaat van het boekjaar (9134)",
-    "9138":"Belastingen op het resultaat vorige boekjaren (9138)",
-    "9141":"Bronnen van belastingslatenties - actieve (9141)",
-    "9144":"Bronnen van belastingslatenties - passieve (9144)",
-    "9145":"In rekening gebrachte belasting op de toegevoegde waarde - aan vennootschap (9145)",
-    "9146":"In rekening gebrachte belasting op de toegevoegde waarde - door vennootschap (9146)",
-    "9147":"Ingehouden bedragen ten laste van derden bij wijze van - bedrijfsvoorheffing (9147)",
-    "9148":"Ingehouden bedragen ten laste van derden bij wijze van - roerende voorheffing (9148)",
-    "9149":"Door de vennootschap gestelde of onherroepelijk beloofde persoonlijke zekerheden als waarborg voor schulden of verplichtingen van derden (9149)",
-    "9150":"Door de vennootschap geëndosseerde handelseffecten in omloop (9150)",
-    "9151":"Door de vennootschap getrokken of voor aval getekende handelseffecten (9151)",
-    "9153":"Maximumbedrag ten belope waarvan andere verplichtingen van derden door de vennootschap zijn gewaarborgd (9153)",
-    "1001":"Gemiddeld aantal werknemers - Voltijds (1001)",
-    "1002":"Gemiddeld aantal werknemers - Deeltijds (1002)",
-    "1003":"Gemiddeld aantal werknemers - Totaal VTE (1003)",
-    "1011":"Aantal daadwerkelijk gepresteerde uren - Voltijds (1011)",
-    "1012":"Aantal daadwerkelijk gepresteerde uren - Deeltijds (1012)",
-    "1013":"Aantal daadwerkelijk gepresteerde uren - Totaal (1013)",
-    "1021":"Personeelskosten - Voltijds (1021)",
-    "1022":"Personeelskosten - Deeltijds (1022)",
-    "1023":"Personeelskosten - Totaal (1023)",
-    "1033":"Bedrag van de voordelen bovenop het loon (1033)",
-    "1051":"Aantal werknemers voltijds (1051)",
-    "1052":"Aantal werknemers deeltijds (1051)",
-    "1053":"Aantal werknemers totaal VTE (1051)",
-    "1101":"Overeenkomst onbepaalde tijd / voltijds (1101)",
-    "1102":"Overeenkomst onbepaalde tijd / deeltijds (1102)",
-    "1103":"Overeenkomst onbepaalde tijd / totaal VTE (1103)",
-    "1111":"Overeenkomst bepaalde tijd / voltijds (1111)",
-    "1112":"Overeenkomst bepaalde tijd / deeltijds(1112)",
-    "1113":"Overeenkomst bepaalde tijd / totaal VTE (1113)",
-    "1121":"Overeenkomst duidelijk omschreven werk / voltijds(1121)",
-    "1122":"Overeenkomst duidelijk omschreven werk / deeltijds (1122)",
-    "1123":"Overeenkomst duidelijk omschreven werk / totaal VTE (1123)",
-    "1131":"Vervangingsovereenkomst / voltijds(1131)",
-    "1132":"Vervangingsovereenkomst / deeltijds (1132)",
-    "1133":"Vervangingsovereenkomst / totaal VTE (1133)",
-    "1203":"Mannen totaal VTE (1203)",
-    "12003":"Mannen - lager onderwijs (12003)",
-    "12013":"Mannen - secundair onderwijs (12013)",
-    "12023":"Mannen - hoger niet-universitair onderwijs (12023)",
-    "12033":"Mannen - universitair onderwijs (12033)",
-    "1213":"Vrouwen totaal VTE (1213)",
-    "12103":"Vrouwen - lager onderwijs (12103)",
-    "12113":"Vrouwen - secundair onderwijs (12113)",
-    "12123":"Vrouwen - hoger niet-universitair onderwijs (12123)",
-    "12133":"Vrouwen - universitair onderwijs (12133)",
-    "1303":"Directiepersoneel totaal VTE (1303)",
-    "1343":"Bedienden totaal VTE (1343)",
-    "1323":"Arbeiders totaal VTE(1323)",
-    "1333":"Andere  totaal VTE (1333)",
-    "1501":"Uitzendkrachten -  Gemiddeld aantal tewerkgestelde personen (1501)",
-    "1511":"Uitzendkrachten -  Aantal daadwerkelijk gepresteerde uren (1511)",
-    "1521":"Uitzendkrachten -  Kosten voor de vennootschap (1521)",
-}
+# Derived from bookcodes_dictionary so the two tables can not drift, the
+# label of a code that appears twice is the last one. See codes.py for
+# the integer code index built on top of it.
+reversed_dict = {code: label
+                 for label, code in bookcodes_dictionary.items()}
 
 modelType_dict = {
     "Full scheme company with capital": "m02-f",
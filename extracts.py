@@ -0,0 +1,237 @@
+"""
+This module offers bulk retrieval from the 'extracts' database of the CBSO
+webservice.
+
+'fetch_many' needs one reference call per company before its filings can be
+requested. The extracts database also lists all filings deposited on one day
+in one batch, so a backfill over many companies needs one reference call per
+day instead of one per company, and only the filings of the requested
+companies are downloaded. The extracts are pre-structured and much smaller
+than a JSONXBRL, see CompanyData.normalize_filing for the shapes read.
+
+Batches of past days with deposits do not change and are cached
+permanently with a cache. An empty batch of a past day is only kept for the
+TTL of reference tables, its deposits may not have been published yet. The
+batch of today is never cached.
+
+Example:
+    dates = deposit_dates('2024-01-01', '2024-03-31')
+    for result in fetch_extracts(dates, company_ids=ids, cache=cache):
+        if result.ok:
+            store.write_company(result.company)
+"""
+
+import concurrent.futures as futures
+import datetime
+import json
+import time
+import uuid
+
+import pandas as pd
+
+import CompanyData as cd
+import cache as cch
+import instrumentation
+from client import CBSOClient, KEY_HEADER
+
+
+def deposit_dates(start, end=None) -> list:
+    """
+    Return the days from 'start' up to and including 'end' (yesterday if
+    None) as 'YYYY-MM-DD' strings. Both are dates or such strings.
+    """
+    start = _as_date(start)
+    if end is None:
+        end = datetime.date.today() - datetime.timedelta(days=1)
+    end = _as_date(end)
+    return [(start + datetime.timedelta(days=i)).isoformat()
+            for i in range((end - start).days + 1)]
+
+
+def _as_date(value) -> datetime.date:
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+
+def batch_uri_creation(date) -> str:
+    """Return the URL of the references deposited on one day."""
+    date = _as_date(date).isoformat()
+    return f'{cd.ENVIRONMENT}extracts/batch/{date}/references'
+
+
+def fetch_batch(date, client=None, cache=None) -> pd.DataFrame:
+    """
+    Return DataFrame of the references deposited on 'date' in the extracts
+    database, empty if there are none (e.g. on a Sunday).
+    """
+    date = _as_date(date).isoformat()
+    key = f'extracts-batch-{date}.json'
+    cacheable = cache is not None and date < datetime.date.today().isoformat()
+
+    client = client or cd.get_default_client()
+    url = batch_uri_creation(date)
+    metrics = getattr(client, 'metrics', None) or instrumentation.metrics
+    api_answer = None
+    if cacheable:
+        api_answer = (cache.get(cch.FILINGS, key)
+                      or cache.get(cch.REFERENCES, key))
+    if api_answer is not None:
+        metrics.record(instrumentation.RequestEvent(
+            url, cache=instrumentation.HIT, size=len(api_answer)))
+        return _batch(api_answer)
+
+    api_answer = _get(client, url, metrics,
+                      instrumentation.MISS if cacheable else None)
+    references = _batch(api_answer)
+    if cacheable:
+        cache.set(cch.REFERENCES if references.empty else cch.FILINGS,
+                  key, api_answer)
+    return references
+
+
+def _batch(api_answer: bytes) -> pd.DataFrame:
+    """Return DataFrame of the references in a batch response."""
+    references = json.loads(api_answer)
+    if isinstance(references, dict): # {'References': [...]}
+        references = next(iter(references.values()), [])
+    return pd.json_normalize(references)
+
+
+def _get(client, url: str, metrics, cache_status=None) -> bytes:
+    """
+    Return the body of a JSON response, b'[]' for a 404. The request is
+    recorded in metrics.
+    """
+    request_id = str(uuid.uuid4())
+    hdr = {
+        'X-Request-Id': request_id,
+        KEY_HEADER: cd.get_api_key(),
+        'Accept': 'application/json',
+        'User-Agent': 'PostmanRuntime/7.37.3',
+    }
+    event = instrumentation.RequestEvent(url, request_id, cache=cache_status)
+    started = time.monotonic()
+    try:
+        response = client.get(url, headers=hdr)
+        event.status = response.status_code
+        event.retries = getattr(response, 'retries', 0)
+        if response.status_code == 404:
+            response.close()
+            return b'[]'
+        response.raise_for_status()
+        event.size = len(response.content)
+        return response.content
+    except Exception as e:
+        event.error = e
+        event.retries = getattr(e, 'retries', event.retries)
+        raise
+    finally:
+        event.latency = time.monotonic() - started
+        metrics.record(event)
+
+
+def _enterprise_number(value):
+    """Return a cleaned enterprise number, None if it is not one."""
+    try:
+        return cd.clean_company_id(str(value))
+    except ValueError:
+        return None
+
+
+def fetch_extracts(dates, company_ids=None, max_workers=8, client=None,
+                   cache=None, sections=None, compact=False):
+    """
+    Fetch the extracts deposited on 'dates' and yield PortfolioResult
+    objects, one per company and day with filings.
+
+    Every day costs one reference call, then only the filings of
+    'company_ids' (all companies if None) are requested, over one bounded
+    thread pool. 'result.company' is a CompanyData of the 'extracts'
+    database whose reference table holds the filings of that day. An
+    invalid company ID, or a day whose references fail, raises the error.
+    """
+    if client is None:
+        client = CBSOClient(pool_size=max_workers)
+    max_workers = cd._workers(client, max_workers)
+    wanted = None
+    if company_ids is not None:
+        wanted = {cd.clean_company_id(str(i)) for i in company_ids}
+    dates = iter(dates)
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        open_filings = {}
+        results = {}
+
+        while True:
+            # A few days ahead keeps the pool busy without listing them all.
+            batches = sum(1 for kind, _ in pending.values() if kind == 'day')
+            while batches < max_workers:
+                date = next(dates, None)
+                if date is None:
+                    break
+                future = executor.submit(fetch_batch, date, client, cache)
+                pending[future] = ('day', date)
+                batches += 1
+
+            if not pending:
+                break
+            done, _ = futures.wait(pending,
+                                   return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                kind, key = pending.pop(future)
+
+                if kind == 'day':
+                    for result, filing_requests, add_info_dict in _companies(
+                            future.result(), wanted, client, cache, sections,
+                            compact):
+                        results[result.company_id, key] = result
+                        open_filings[result.company_id, key] = len(
+                            filing_requests)
+                        for reference, data_url in filing_requests:
+                            filing_future = executor.submit(
+                                result.company._fetch_filing,
+                                reference, data_url, add_info_dict)
+                            pending[filing_future] = (
+                                'filing', (result.company_id, key))
+                    continue
+
+                result = results[key]
+                try:
+                    filing = future.result()
+                    result.company.data[filing.filing_reference] = filing
+                except Exception as e:
+                    result.errors.append(e)
+                open_filings[key] -= 1
+                if open_filings[key] == 0:
+                    del open_filings[key]
+                    yield results.pop(key)
+
+
+def _companies(references, wanted, client, cache, sections, compact):
+    """
+    Yield (PortfolioResult, filing requests, additional info) per company in
+    the references of one day.
+    """
+    if references.empty or 'EnterpriseNumber' not in references:
+        return
+    numbers = references['EnterpriseNumber'].map(_enterprise_number)
+    if wanted is not None:
+        references = references[numbers.isin(wanted)]
+        numbers = numbers[references.index]
+
+    for company_id, rows in references.groupby(numbers, sort=False):
+        result = cd.PortfolioResult(company_id)
+        company = cd.CompanyData(company_id, client=client, cache=cache,
+                                 sections=sections, compact=compact,
+                                 database='extracts')
+        company.reference_table = company._handle_df_of_references(
+            rows.reset_index(drop=True))
+        filing_requests, add_info_dict = company._filing_requests(
+            len(company.reference_table))
+        if not filing_requests:
+            continue
+        company.data = {}
+        result.company = company
+        yield result, filing_requests, add_info_dict
@@ -0,0 +1,236 @@
+"""
+This module offers instrumentation of the requests to the CBSO webservice.
+
+Every request made by CompanyData, and every response read from its cache,
+is recorded as a RequestEvent: URL, 'X-Request-Id', status code, latency,
+bytes received, retries of the client, cache hit or miss and the error if
+any. Events are:
+    - logged to the 'nbb_cbso' logger, DEBUG for successes and WARNING for
+      errors, with the event as 'extra={"nbb": {...}}' for structured
+      handlers;
+    - aggregated in a Metrics object: counters per status, cache and error,
+      and histograms of latency and size;
+    - passed to the hooks of that Metrics object, e.g. to feed a
+      monitoring system or alert on the error rate.
+
+All clients share the module-level 'metrics' unless a CBSOClient is given
+its own.
+
+Example:
+    import logging
+    logging.basicConfig(level=logging.DEBUG)
+    metrics.add_hook(lambda event: event.ok or alert(event))
+    ...
+    metrics.snapshot()['latency']['p95']
+"""
+
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger('nbb_cbso')
+
+# Upper bounds of the histogram buckets, the last bucket is unbounded.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+HIT = 'hit'
+MISS = 'miss'
+
+
+class RequestEvent:
+    """Represent one request to the webservice, or one cache lookup."""
+    def __init__(self, url: str, request_id=None, status=None, latency=None,
+                 size=None, retries=0, cache=None, error=None):
+        """
+        Initialise the class' attributes.
+
+        status: HTTP status code, None for a cache hit or a failed request.
+        latency: seconds until the body was read.
+        size: bytes received, or read from the cache for a hit.
+        retries: attempts of the client after the first one.
+        cache: 'hit', 'miss', or None without a cache.
+        error: the exception or error message, None if all went well.
+        """
+        self.url = url
+        self.request_id = request_id
+        self.status = status
+        self.latency = latency
+        self.size = size
+        self.retries = retries
+        self.cache = cache
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the request succeeded or was answered by cache."""
+        return self.error is None and (self.status is None
+                                       or self.status < 400)
+
+    def as_dict(self) -> dict:
+        """Return the event as a dictionary, the error as a string."""
+        return {
+            'url': self.url,
+            'request_id': self.request_id,
+            'status': self.status,
+            'latency': self.latency,
+            'size': self.size,
+            'retries': self.retries,
+            'cache': self.cache,
+            'error': None if self.error is None else str(self.error),
+            }
+
+    def __repr__(self):
+        return (f'RequestEvent({self.url!r}, status={self.status}, '
+                f'latency={self.latency}, cache={self.cache})')
+
+
+class Histogram:
+    """Represent counts of values in fixed buckets."""
+    def __init__(self, bounds):
+        """Initialise the class' attributes, bounds in increasing order."""
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = None
+
+    def observe(self, value: float):
+        """Add a value."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def quantile(self, q: float):
+        """
+        Return the upper bound of the bucket holding quantile q, the maximum
+        for the last bucket, or None without values.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.maximum
+
+    def as_dict(self) -> dict:
+        """Return count, mean, p50, p95, p99, maximum and the buckets."""
+        labels = [f'<={b:g}' for b in self.bounds] + [f'>{self.bounds[-1]:g}']
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.maximum,
+            'buckets': dict(zip(labels, self.counts)),
+            }
+
+
+class Metrics:
+    """Represent counters and histograms of RequestEvents, and hooks."""
+    def __init__(self):
+        """Initialise the class' attributes."""
+        self._lock = threading.Lock()
+        self.hooks = []
+        self.reset()
+
+    def reset(self):
+        """Set all counters and histograms back to zero, hooks are kept."""
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.retries = 0
+            self.bytes = 0
+            self.statuses = {}
+            self.cache = {HIT: 0, MISS: 0}
+            self.latency = Histogram(LATENCY_BUCKETS)
+            self.size = Histogram(SIZE_BUCKETS)
+
+    def add_hook(self, hook):
+        """Call hook(event) for every event recorded from now on."""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Stop calling a hook."""
+        self.hooks.remove(hook)
+
+    def record(self, event: RequestEvent):
+        """Add an event to the counters, log it and pass it to the hooks."""
+        with self._lock:
+            if event.cache in self.cache:
+                self.cache[event.cache] += 1
+            if event.cache != HIT:
+                self.requests += 1
+                self.retries += event.retries
+                self.statuses[event.status] = self.statuses.get(
+                    event.status, 0) + 1
+                if event.latency is not None:
+                    self.latency.observe(event.latency)
+                if event.size is not None:
+                    self.bytes += event.size
+                    self.size.observe(event.size)
+            if not event.ok:
+                self.errors += 1
+
+        if event.ok:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('%s %s %s %s bytes in %s s, %d retries (%s)',
+                             event.status, event.cache or '-', event.url,
+                             event.size, _seconds(event.latency),
+                             event.retries, event.request_id,
+                             extra={'nbb': event.as_dict()})
+        else:
+            logger.warning('%s %s failed: %s, %d retries (%s)',
+                           event.status, event.url, event.error,
+                           event.retries, event.request_id,
+                           extra={'nbb': event.as_dict()})
+
+        for hook in list(self.hooks):
+            try:
+                hook(event)
+            except Exception:
+                # A broken hook must not break the crawl.
+                logger.exception('Instrumentation hook %r failed', hook)
+
+    def error_rate(self) -> float:
+        """Return the share of requests that failed, 0 without requests."""
+        with self._lock:
+            return self.errors / self.requests if self.requests else 0.0
+
+    def snapshot(self) -> dict:
+        """Return the counters and histograms as a dictionary."""
+        with self._lock:
+            lookups = self.cache[HIT] + self.cache[MISS]
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'error_rate': (self.errors / self.requests
+                               if self.requests else 0.0),
+                'retries': self.retries,
+                'bytes': self.bytes,
+                'statuses': dict(self.statuses),
+                'cache_hits': self.cache[HIT],
+                'cache_misses': self.cache[MISS],
+                'cache_hit_rate': (self.cache[HIT] / lookups
+                                   if lookups else None),
+                'latency': self.latency.as_dict(),
+                'size': self.size.as_dict(),
+                }
+
+    def __repr__(self):
+        return (f'Metrics(requests={self.requests}, errors={self.errors}, '
+                f'cache_hits={self.cache[HIT]})')
+
+
+def _seconds(value) -> str:
+    return '-' if value is None else f'{value:.3f}'
+
+
+# Shared by all clients without metrics of their own.
+metrics = Metrics()
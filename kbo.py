@@ -0,0 +1,408 @@
+"""
+This module offers a local, indexed copy of the open data of the
+Kruispuntbank van Ondernemingen (KBO / Crossroads Bank for Enterprises).
+
+The KBO publishes a monthly zip with the full register (enterprise.csv,
+activity.csv, address.csv, denomination.csv, ...) and a monthly update zip
+with, per table, the entities to delete (<table>_delete.csv) and the rows to
+insert (<table>_insert.csv). Both are read straight from the zip, row by row,
+and written in chunks to one SQLite file, so the multi-gigabyte CSVs are
+never extracted nor held in memory.
+
+Enterprise numbers are normalized like CompanyData does ('0403.170.701' ->
+'0403170701'), so the store joins with the other modules. Dates become ISO
+('dd-mm-yyyy' -> 'yyyy-mm-dd').
+
+Tables:
+    enterprises    one row per enterprise, with legal form and start date.
+    activities     NACE codes per entity, indexed on (nace_code) and entity.
+    addresses      addresses per entity, indexed on (zipcode) and entity.
+    denominations  names per entity.
+    meta           snapshot date and extract number of the last file.
+
+Example:
+    kbo = KboStore('kbo.sqlite')
+    kbo.ingest('KboOpenData_0140_2025_09_Full.zip')
+    kbo.ingest('KboOpenData_0141_2025_10_Update.zip')
+    kbo.enterprise('0403.170.701')
+    kbo.by_nace('4321', postal_codes=['9000', '9050'])
+"""
+
+import csv
+import io
+import os
+import sqlite3
+import threading
+import zipfile
+from itertools import islice
+from operator import itemgetter
+
+import pandas as pd
+
+from CompanyData import clean_company_id
+
+# table: (CSV file, key column in the CSV, [(CSV column, SQL column)])
+TABLES = {
+    'enterprises': ('enterprise', 'EnterpriseNumber', [
+        ('EnterpriseNumber', 'enterprise_number'),
+        ('Status', 'status'),
+        ('JuridicalSituation', 'juridical_situation'),
+        ('TypeOfEnterprise', 'type_of_enterprise'),
+        ('JuridicalForm', 'juridical_form'),
+        ('StartDate', 'start_date'),
+        ]),
+    'activities': ('activity', 'EntityNumber', [
+        ('EntityNumber', 'entity_number'),
+        ('ActivityGroup', 'activity_group'),
+        ('NaceVersion', 'nace_version'),
+        ('NaceCode', 'nace_code'),
+        ('Classification', 'classification'),
+        ]),
+    'addresses': ('address', 'EntityNumber', [
+        ('EntityNumber', 'entity_number'),
+        ('TypeOfAddress', 'type_of_address'),
+        ('CountryNL', 'country'),
+        ('Zipcode', 'zipcode'),
+        ('MunicipalityNL', 'municipality'),
+        ('StreetNL', 'street'),
+        ('HouseNumber', 'house_number'),
+        ('Box', 'box'),
+        ('DateStrikingOff', 'date_striking_off'),
+        ]),
+    'denominations': ('denomination', 'EntityNumber', [
+        ('EntityNumber', 'entity_number'),
+        ('Language', 'language'),
+        ('TypeOfDenomination', 'type_of_denomination'),
+        ('Denomination', 'denomination'),
+        ]),
+    }
+NUMBER_COLUMNS = ('EnterpriseNumber', 'EntityNumber')
+DATE_COLUMNS = ('StartDate', 'DateStrikingOff')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS enterprises (
+    enterprise_number TEXT PRIMARY KEY,
+    status TEXT,
+    juridical_situation TEXT,
+    type_of_enterprise TEXT,
+    juridical_form TEXT,
+    start_date TEXT
+);
+CREATE TABLE IF NOT EXISTS activities (
+    entity_number TEXT NOT NULL,
+    activity_group TEXT,
+    nace_version TEXT,
+    nace_code TEXT,
+    classification TEXT
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    entity_number TEXT NOT NULL,
+    type_of_address TEXT,
+    country TEXT,
+    zipcode TEXT,
+    municipality TEXT,
+    street TEXT,
+    house_number TEXT,
+    box TEXT,
+    date_striking_off TEXT
+);
+CREATE TABLE IF NOT EXISTS denominations (
+    entity_number TEXT NOT NULL,
+    language TEXT,
+    type_of_denomination TEXT,
+    denomination TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS ix_activities_entity ON activities (entity_number);
+CREATE INDEX IF NOT EXISTS ix_activities_nace ON activities (nace_code);
+CREATE INDEX IF NOT EXISTS ix_addresses_entity ON addresses (entity_number);
+CREATE INDEX IF NOT EXISTS ix_addresses_zipcode ON addresses (zipcode);
+CREATE INDEX IF NOT EXISTS ix_denominations_entity
+    ON denominations (entity_number);
+"""
+INDEX_NAMES = ['ix_activities_entity', 'ix_activities_nace',
+               'ix_addresses_entity', 'ix_addresses_zipcode',
+               'ix_denominations_entity']
+
+
+def _iso_date(value: str) -> str:
+    """Return 'dd-mm-yyyy' as 'yyyy-mm-dd', other values unchanged."""
+    if len(value) == 10 and value[2] == '-' and value[5] == '-':
+        return f'{value[6:]}-{value[3:5]}-{value[:2]}'
+    return value
+
+
+def _clean_number(value: str) -> str:
+    """Return the enterprise or establishment number without dots."""
+    # The register writes '0403.170.701', dropping the dots gives what
+    # clean_company_id returns without a regex per row.
+    digits = value.replace('.', '')
+    if len(digits) in (10, 11) and digits.isdigit():
+        return digits
+    try:
+        return clean_company_id(value)
+    except ValueError:
+        return value
+
+
+class KboStore:
+    """Represent a SQLite file with the KBO register."""
+    def __init__(self, path='kbo.sqlite', chunk_size=50000):
+        """Initialise the class' attributes and create missing tables."""
+        self.path = path
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA + INDEXES)
+
+    def meta(self) -> dict:
+        """Return the meta data of the last ingested file."""
+        with self._lock:
+            return dict(self.connection.execute(
+                'SELECT key, value FROM meta').fetchall())
+
+    def ingest(self, path: str, force=False) -> dict:
+        """
+        Load a KBO zip, full or update, and return {table: rows written}.
+
+        A full file replaces the register. An update is applied on top of
+        it, only if its ExtractNumber follows the one in the store; an older
+        update is skipped and a gap raises a ValueError unless force=True.
+        """
+        with zipfile.ZipFile(path) as archive:
+            members = {os.path.basename(name).lower(): name
+                       for name in archive.namelist()}
+            file_meta = self._read_meta(archive, members)
+            extract_type = file_meta.get('ExtractType', '').lower()
+            if extract_type not in ('full', 'update'):
+                extract_type = ('full' if 'enterprise.csv' in members
+                                else 'update')
+
+            if extract_type == 'update' and not force:
+                if not self._is_next(file_meta):
+                    return {}
+
+            with self._lock:
+                if extract_type == 'full':
+                    written = self._load_full(archive, members)
+                else:
+                    written = self._load_update(archive, members)
+                with self.connection:
+                    self.connection.executemany(
+                        'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                        list(file_meta.items()))
+        return written
+
+    def _read_meta(self, archive, members) -> dict:
+        """Return Variable: Value of meta.csv, empty if missing."""
+        if 'meta.csv' not in members:
+            return {}
+        rows = self._rows(archive, members['meta.csv'])
+        next(rows, None)
+        return {row[0]: row[1] for row in rows if len(row) >= 2}
+
+    def _is_next(self, file_meta: dict) -> bool:
+        """
+        Return True if the update follows the store, False if it is already
+        applied. Raise a ValueError if updates are missing in between.
+        """
+        try:
+            new = int(file_meta['ExtractNumber'])
+            current = int(self.meta()['ExtractNumber'])
+        except (KeyError, ValueError):
+            return True
+        if new <= current:
+            return False
+        if new > current + 1:
+            raise ValueError(f'Update {new} does not follow extract '
+                             f'{current} in the store, apply the updates '
+                             f'in between or ingest a full file')
+        return True
+
+    def _rows(self, archive, name: str):
+        """Yield the rows of a CSV in the zip, decoded while streaming."""
+        with archive.open(name) as raw:
+            text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+            yield from csv.reader(text)
+
+    def _records(self, archive, name: str, columns: list):
+        """Yield tuples of the wanted columns, normalized."""
+        rows = self._rows(archive, name)
+        header = next(rows, None)
+        if header is None:
+            return
+        # A missing column points past the end of the row and reads ''.
+        positions = [header.index(csv_name) if csv_name in header
+                     else len(header) for csv_name, _ in columns]
+        select = itemgetter(*positions)
+        single = len(positions) == 1
+        width = max(positions) + 1
+        converters = [
+            (k, _clean_number if csv_name in NUMBER_COLUMNS else _iso_date)
+            for k, (csv_name, _) in enumerate(columns)
+            if csv_name in NUMBER_COLUMNS or csv_name in DATE_COLUMNS]
+
+        for row in rows:
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            values = (select(row),) if single else select(row)
+            if converters:
+                values = list(values)
+                for k, convert in converters:
+                    values[k] = convert(values[k])
+            yield values
+
+    def _insert(self, table: str, columns: list, records) -> int:
+        """Insert records in chunks and return the amount."""
+        names = ', '.join(sql_name for _, sql_name in columns)
+        # Empty CSV fields are stored as NULL.
+        marks = ', '.join("NULLIF(?, '')" for _ in columns)
+        verb = 'INSERT OR REPLACE' if table == 'enterprises' else 'INSERT'
+        sql = f'{verb} INTO {table} ({names}) VALUES ({marks})'
+        written = 0
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                return written
+            self.connection.executemany(sql, chunk)
+            written += len(chunk)
+
+    def _load_full(self, archive, members) -> dict:
+        """Replace all tables with the CSVs of a full file."""
+        written = {}
+        # Building the indexes once after loading is much faster than
+        # keeping them up to date row by row.
+        with self.connection:
+            for name in INDEX_NAMES:
+                self.connection.execute(f'DROP INDEX IF EXISTS {name}')
+            for table, (csv_name, _, columns) in TABLES.items():
+                member = members.get(f'{csv_name}.csv')
+                if member is None:
+                    continue
+                self.connection.execute(f'DELETE FROM {table}')
+                written[table] = self._insert(
+                    table, columns, self._records(archive, member, columns))
+        with self.connection:
+            self.connection.executescript(INDEXES)
+        self.connection.execute('ANALYZE')
+        return written
+
+    def _load_update(self, archive, members) -> dict:
+        """Apply the delete and insert CSVs of an update file."""
+        written = {}
+        with self.connection:
+            for table, (csv_name, key, columns) in TABLES.items():
+                sql_key = dict(columns)[key]
+                delete = members.get(f'{csv_name}_delete.csv')
+                if delete is not None:
+                    self.connection.execute(
+                        'CREATE TEMP TABLE IF NOT EXISTS deleted '
+                        '(number TEXT PRIMARY KEY)')
+                    self.connection.execute('DELETE FROM deleted')
+                    self._insert_deleted(archive, delete, key)
+                    self.connection.execute(
+                        f'DELETE FROM {table} WHERE {sql_key} IN '
+                        f'(SELECT number FROM deleted)')
+                insert = members.get(f'{csv_name}_insert.csv')
+                if insert is not None:
+                    written[table] = self._insert(
+                        table, columns,
+                        self._records(archive, insert, columns))
+        return written
+
+    def _insert_deleted(self, archive, name: str, key: str):
+        """Fill the temporary table 'deleted' with the numbers of a CSV."""
+        records = self._records(archive, name, [(key, 'number')])
+        while True:
+            chunk = list(islice(records, self.chunk_size))
+            if not chunk:
+                return
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO deleted VALUES (?)', chunk)
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        """Return the result of a SQL query as DataFrame."""
+        with self._lock:
+            return pd.read_sql_query(sql, self.connection, params=params)
+
+    def enterprise(self, company_id: str) -> dict:
+        """
+        Return the enterprise, its names, main NACE codes and registered
+        address as dictionary, None if unknown.
+        """
+        number = clean_company_id(company_id)
+        with self._lock:
+            cursor = self.connection.execute(
+                'SELECT * FROM enterprises WHERE enterprise_number = ?',
+                (number,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            result = dict(zip([c[0] for c in cursor.description], row))
+            result['denominations'] = [r[0] for r in self.connection.execute(
+                'SELECT denomination FROM denominations '
+                'WHERE entity_number = ?', (number,))]
+            result['nace_codes'] = self.connection.execute(
+                'SELECT nace_version, nace_code, classification '
+                'FROM activities WHERE entity_number = ?',
+                (number,)).fetchall()
+            address = self.connection.execute(
+                'SELECT zipcode, municipality, street, house_number, box '
+                'FROM addresses WHERE entity_number = ? '
+                "ORDER BY type_of_address = 'REGO' DESC LIMIT 1",
+                (number,)).fetchone()
+            result['address'] = address
+        return result
+
+    def by_nace(self, nace_code: str, postal_codes=None, version=None,
+                main_only=True) -> pd.DataFrame:
+        """
+        Return DataFrame of the enterprises with a NACE code starting with
+        'nace_code', optionally within postal codes and for one NACE
+        version ('2008', '2025').
+        """
+        sql = """
+            SELECT DISTINCT e.enterprise_number, e.juridical_form,
+                   a.nace_version, a.nace_code, ad.zipcode, ad.municipality
+            FROM activities a
+            JOIN enterprises e ON e.enterprise_number = a.entity_number
+            LEFT JOIN addresses ad ON ad.entity_number = a.entity_number
+                                  AND ad.type_of_address = 'REGO'
+            WHERE a.nace_code >= ? AND a.nace_code < ?
+        """
+        # A range instead of LIKE so the index on nace_code is used.
+        params = [nace_code, nace_code + '\uffff']
+        if main_only:
+            sql += " AND a.classification = 'MAIN'"
+        if version is not None:
+            sql += ' AND a.nace_version = ?'
+            params.append(str(version))
+        if postal_codes is not None:
+            postal_codes = [str(code) for code in postal_codes]
+            sql += (' AND ad.zipcode IN ('
+                    + ', '.join('?' for _ in postal_codes) + ')')
+            params.extend(postal_codes)
+        return self.query(sql + ' ORDER BY e.enterprise_number', params)
+
+    def by_postal_code(self, postal_code: str) -> pd.DataFrame:
+        """Return DataFrame of the enterprises registered in a postal code."""
+        return self.query("""
+            SELECT e.enterprise_number, e.juridical_form, ad.zipcode,
+                   ad.municipality, ad.street, ad.house_number
+            FROM addresses ad
+            JOIN enterprises e ON e.enterprise_number = ad.entity_number
+            WHERE ad.zipcode = ? AND ad.type_of_address = 'REGO'
+            ORDER BY e.enterprise_number
+        """, [str(postal_code)])
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
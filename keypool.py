@@ -0,0 +1,174 @@
+"""
+This module offers a pool of CBSO subscription keys for bulk runs.
+
+Every key has its own quota in requests per second. For each request the pool
+hands out the least loaded key that is not quarantined: the one with the
+fewest requests in flight relative to its quota, requests still waiting for
+a token of the key included. A key that gets a 429 is quarantined for its
+'Retry-After' (or 'quarantine' seconds), one that gets a 401/403 for
+'unauthorized_quarantine' seconds, and the client retries on another key.
+Once every key is refused, requests fail with a PermissionError instead of
+waiting out the quarantine.
+
+Keys can be given in code or in the environment (or .env), as
+'key:quota' pairs separated by commas:
+    NBB_CBSO_sub_keys=1a2b...:10,3c4d...:5
+
+Example:
+    pool = KeyPool([SubscriptionKey('1a2b...', rate=10),
+                    SubscriptionKey('3c4d...', rate=5)])
+    client = CBSOClient(keys=pool)
+"""
+
+import os
+import threading
+import time
+
+from ratelimit import RateLimiter
+
+
+class SubscriptionKey:
+    """Represent one subscription key, its quota and usage."""
+    def __init__(self, key: str, rate=None, burst=None, path=None):
+        """
+        Initialise the class' attributes.
+
+        rate: quota in requests per second, None for no limit of its own.
+        burst, path: see ratelimit.RateLimiter, path shares the quota of the
+            key with other processes.
+        """
+        self.key = key
+        self.rate = rate
+        self.limiter = RateLimiter(rate, burst, path) if rate else None
+        self.inflight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.quarantined_until = 0.0
+        # True while the last answer to the key was a 401 or 403.
+        self.refused = False
+
+    @property
+    def name(self) -> str:
+        """Return the key masked for logs and metrics."""
+        return self.key[:4] + '...' if len(self.key) > 8 else '...'
+
+    def __repr__(self):
+        return f'SubscriptionKey({self.name!r}, rate={self.rate})'
+
+
+class KeyPool:
+    """Represent subscription keys shared by all requests of a client."""
+    def __init__(self, keys, quarantine=60.0, unauthorized_quarantine=900.0):
+        """
+        Initialise the class' attributes.
+
+        keys: SubscriptionKey objects or plain key strings (no quota).
+        quarantine: seconds a key rests after a 429 without 'Retry-After'.
+        unauthorized_quarantine: seconds a key rests after a 401 or 403.
+        """
+        self.keys = [k if isinstance(k, SubscriptionKey) else SubscriptionKey(k)
+                     for k in keys]
+        if not self.keys:
+            raise ValueError('A KeyPool needs at least one key')
+        self.quarantine = quarantine
+        self.unauthorized_quarantine = unauthorized_quarantine
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, variable='NBB_CBSO_sub_keys', **kwargs):
+        """
+        Return a KeyPool of 'key:quota,key:quota' in the environment (or
+        .env), None if the variable is not set. The quota is optional.
+        """
+        value = os.getenv(variable)
+        if value is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            value = os.getenv(variable)
+        if not value:
+            return None
+
+        keys = []
+        for item in value.split(','):
+            key, _, rate = item.strip().partition(':')
+            if key:
+                keys.append(SubscriptionKey(key, float(rate) if rate else None))
+        return cls(keys, **kwargs)
+
+    def _load(self, key: SubscriptionKey) -> float:
+        """Return the load of a key if it got one more request."""
+        return (key.inflight + 1) / (key.rate or 1)
+
+    def acquire(self) -> SubscriptionKey:
+        """
+        Return the least loaded healthy key, after waiting for a token of its
+        quota. When all keys are quarantined, wait for the first throttled
+        one to return. Raise a PermissionError when every key is
+        quarantined because it was refused (401/403).
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                healthy = [k for k in self.keys if k.quarantined_until <= now]
+                if healthy:
+                    key = min(healthy, key=self._load)
+                    key.inflight += 1
+                    break
+                throttled = [k for k in self.keys if not k.refused]
+                if not throttled:
+                    raise PermissionError(
+                        'All subscription keys were refused (401/403): '
+                        + ', '.join(k.name for k in self.keys))
+                wait = min(k.quarantined_until for k in throttled) - now
+            time.sleep(wait)
+
+        if key.limiter is not None:
+            key.limiter.acquire()
+        return key
+
+    def release(self, key: SubscriptionKey, status=None, retry_after=None):
+        """
+        Report the status code of a request made with the key. A 429
+        quarantines the key for 'retry_after' seconds (or 'quarantine'), a
+        401 or 403 for 'unauthorized_quarantine'.
+        """
+        with self._lock:
+            key.inflight -= 1
+            key.requests += 1
+            now = time.monotonic()
+            if status is not None:
+                key.refused = status in (401, 403)
+            if status == 429:
+                key.throttled += 1
+                rest = retry_after if retry_after is not None else self.quarantine
+                key.quarantined_until = max(key.quarantined_until, now + rest)
+            elif status in (401, 403):
+                key.rejected += 1
+                key.quarantined_until = max(
+                    key.quarantined_until, now + self.unauthorized_quarantine)
+
+    def available(self) -> bool:
+        """Return True if a key is not quarantined right now."""
+        now = time.monotonic()
+        return any(k.quarantined_until <= now for k in self.keys)
+
+    def metrics(self) -> list:
+        """Return usage per key, with the key masked."""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'key': k.name,
+                'rate': k.rate,
+                'inflight': k.inflight,
+                'requests': k.requests,
+                'throttled': k.throttled,
+                'rejected': k.rejected,
+                'quarantined': max(0.0, k.quarantined_until - now),
+                } for k in self.keys]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self):
+        return f'KeyPool({self.keys!r})'
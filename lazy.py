@@ -0,0 +1,47 @@
+"""
+This module offers lazy stand-ins for heavy modules.
+
+Importing CompanyData should cost next to nothing for workers that only
+validate ids or read cached data. Modules such as pandas, numpy and requests
+are therefore bound to a LazyModule and only imported on the first attribute
+access, e.g. the first 'pd.DataFrame(...)'.
+
+Example:
+    pd = LazyModule('pandas')
+    pd.DataFrame()   # pandas is imported here
+
+See bench_import.py to check the import time of CompanyData.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Represent a module that is imported on first attribute access."""
+    def __init__(self, name: str):
+        """Initialise the class' attributes."""
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        """Return the module, importing it if needed."""
+        module = self.__dict__['_module']
+        if module is None:
+            # import_module holds the import lock, so threads racing here
+            # get the same module object.
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute: str, value):
+        setattr(self._load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
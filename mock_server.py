@@ -0,0 +1,339 @@
+"""
+This script runs a local stand-in of the CBSO webservice for load and
+fault-injection testing.
+
+It answers the two routes CompanyData uses, for every database:
+    /{database}/legalEntity/{enterprise number}/references
+    /{database}/deposit/{reference}/accountingData
+The companies come from a fixture directory of bench_fixtures.py (recorded
+or synthetic), or are generated on request: any valid enterprise number then
+has synthetic references and filings. The 'AccountingDataURL' of every
+reference points back to the server.
+
+Faults are injected per request, so the retries, rate limiting and
+concurrency of CBSOClient can be measured offline:
+    - latency: seconds before answering, plus up to 'jitter' at random;
+    - not_found, throttle, server_error: share of requests answered with a
+      404, a 429 with 'Retry-After', or a 500/502/503;
+    - quota: requests per second the server accepts, like the quota of a
+      subscription key, requests above it get a 429 with 'Retry-After'.
+
+Point CompanyData at the server by setting its ENVIRONMENT, or run
+nbb_fetch.py with --environment.
+
+Example:
+    with MockServer(faults=Faults(latency=0.05, throttle=0.1)) as server:
+        cd.ENVIRONMENT = server.url
+        results = list(cd.fetch_many(ids, year=2))
+        server.stats()
+
+    python mock_server.py --port 8080 --latency 0.05 --throttle 0.1
+    python mock_server.py --fixtures fixtures/ --quota 20
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import CompanyData as cd
+import bench_fixtures as fx
+from cache import FILINGS, REFERENCES
+from client import KEY_HEADER
+
+SERVER_ERRORS = (500, 502, 503)
+
+_REFERENCES = re.compile(r'^/(\w+)/legalEntity/(\d{10,11})/references$')
+_FILING = re.compile(r'^/(\w+)/deposit/([^/]+)/accountingData$')
+# The host of a filing URL, e.g. 'https://ws.cbso.nbb.be/' of a recording.
+_HOST = re.compile(rb'https?://[^/"]+/(?=(?:%s)/)'
+                   % '|'.join(cd.DATABASES).encode())
+
+
+class Faults:
+    """Represent the faults a MockServer injects in its responses."""
+    def __init__(self, latency=0.0, jitter=0.0, not_found=0.0, throttle=0.0,
+                 server_error=0.0, retry_after=1.0, seed=None):
+        """
+        Initialise the class' attributes.
+
+        latency, jitter: seconds, every response waits latency plus a random
+            share of jitter.
+        not_found, throttle, server_error: share of requests, 0 to 1,
+            answered with a 404, a 429 or a 500/502/503.
+        retry_after: seconds in the 'Retry-After' header of a 429, None
+            leaves it out.
+        seed: of the random draws, for repeatable runs.
+        """
+        if not_found + throttle + server_error > 1:
+            raise ValueError('The shares of faults add up to more than 1')
+        self.latency = latency
+        self.jitter = jitter
+        self.not_found = not_found
+        self.throttle = throttle
+        self.server_error = server_error
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> tuple:
+        """Return (seconds to wait, status to fail with or None)."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            draw = self._random.random()
+            status = None
+            if draw < self.not_found:
+                status = 404
+            elif draw < self.not_found + self.throttle:
+                status = 429
+            elif draw < self.not_found + self.throttle + self.server_error:
+                status = self._random.choice(SERVER_ERRORS)
+        return delay, status
+
+    def __repr__(self):
+        return (f'Faults(latency={self.latency}, not_found={self.not_found}, '
+                f'throttle={self.throttle}, '
+                f'server_error={self.server_error})')
+
+
+class Quota:
+    """
+    Represent the quota of the server: a token bucket that refuses a request
+    instead of delaying it when empty.
+    """
+    def __init__(self, rate: float, burst=None):
+        """Initialise the class' attributes, burst defaults to one second."""
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Return None if the request may go, else seconds until it may."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens
+                               + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate
+
+
+class MockServer:
+    """Represent a local, threaded stand-in of the CBSO webservice."""
+    def __init__(self, fixtures=None, faults=None, quota=None, key=None,
+                 years=2, host='127.0.0.1', port=0):
+        """
+        Initialise the class' attributes, the server starts with start().
+
+        fixtures: directory of bench_fixtures.py, None generates synthetic
+            companies for any enterprise number.
+        faults: Faults, None answers every request at once.
+        quota: Quota shared by all requests, None accepts any rate.
+        key: subscription key to require, None accepts any (or none).
+        years: of the synthetic companies.
+        port: 0 picks a free port, see 'url'.
+        """
+        self.fixtures = None if fixtures is None else fx.open_fixtures(
+            fixtures)
+        self.faults = faults or Faults()
+        self.quota = quota
+        self.key = key
+        self.years = years
+        self.statuses = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        # Clients open many connections at once under load.
+        self.httpd.request_queue_size = 128
+        self.httpd.mock = self
+
+    @property
+    def url(self) -> str:
+        """Return the base URL, the ENVIRONMENT of CompanyData."""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self) -> 'MockServer':
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        name='mock-cbso', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def record(self, status: int):
+        """Count a response."""
+        with self._lock:
+            self.requests += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def stats(self) -> dict:
+        """Return the amount of requests and responses per status."""
+        with self._lock:
+            return {'requests': self.requests,
+                    'statuses': dict(sorted(self.statuses.items()))}
+
+    def reset(self):
+        """Set the counters back to zero."""
+        with self._lock:
+            self.requests = 0
+            self.statuses = {}
+
+    def references(self, enterprise_number: str):
+        """Return the reference table as bytes, None for an unknown company."""
+        if self.fixtures is not None:
+            data = self.fixtures.get(REFERENCES, enterprise_number)
+        else:
+            scheme = fx.scheme_of(int(enterprise_number))
+            data = json.dumps(fx.synthetic_references(
+                enterprise_number, scheme, self.years)).encode()
+        if data is None:
+            return None
+        # The filing URLs point to the real webservice.
+        return _HOST.sub(self.url.encode(), data)
+
+    def filing(self, reference: str):
+        """Return the JSONXBRL of a filing as bytes, None if unknown."""
+        if self.fixtures is not None:
+            return self.fixtures.get(FILINGS, f'{reference}.{fx.ACCEPT}')
+        # Synthetic references are '{year}-{enterprise number}-{I|C}'.
+        parts = reference.split('-')
+        if (len(parts) != 3 or not parts[0].isdigit()
+                or not parts[1].isdigit() or parts[2] not in ('I', 'C')):
+            return None
+        scheme = fx.scheme_of(int(parts[1]))
+        return json.dumps(fx.synthetic_filing(reference, scheme,
+                                              int(parts[0]))).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answer one request of a MockServer."""
+    # Keep-alive, like the real webservice, so pooled connections are reused.
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes, with Nagle's algorithm the body
+    # waits for the delayed ACK of the headers on a kept-alive connection.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        mock = self.server.mock
+        delay, fault = mock.faults.draw()
+        if delay:
+            time.sleep(delay)
+
+        if mock.key is not None and self.headers.get(KEY_HEADER) != mock.key:
+            return self._send(401, b'{"message": "Invalid subscription key"}')
+        if mock.quota is not None:
+            wait = mock.quota.take()
+            if wait is not None:
+                return self._send(429, b'{"message": "Rate limit is exceeded"}',
+                                  {'Retry-After': f'{max(1, round(wait))}'})
+        if fault == 429:
+            headers = {}
+            if mock.faults.retry_after is not None:
+                headers['Retry-After'] = f'{mock.faults.retry_after:g}'
+            return self._send(429, b'{"message": "Rate limit is exceeded"}',
+                              headers)
+        if fault is not None:
+            return self._send(fault, b'{"message": "Injected fault"}')
+
+        path = self.path.split('?', 1)[0]
+        body = None
+        match = _REFERENCES.match(path)
+        if match and match.group(1) in cd.DATABASES:
+            body = mock.references(match.group(2))
+        match = _FILING.match(path)
+        if match and match.group(1) in cd.DATABASES:
+            body = mock.filing(match.group(2))
+        if body is None:
+            return self._send(404, b'{"message": "Resource not found"}')
+        self._send(200, body)
+
+    def _send(self, status: int, body: bytes, headers=None):
+        self.server.mock.record(status)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Thousands of requests per second would flood stderr.
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fixtures',
+                        help='directory of bench_fixtures.py, default '
+                             'synthetic companies')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--years', type=int, default=2,
+                        help='filings per synthetic company')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds before every response')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='random seconds added to --latency')
+    parser.add_argument('--not-found', type=float, default=0.0,
+                        help='share of requests answered with a 404')
+    parser.add_argument('--throttle', type=float, default=0.0,
+                        help='share of requests answered with a 429')
+    parser.add_argument('--retry-after', type=float, default=1.0,
+                        help="seconds in the 'Retry-After' of a 429")
+    parser.add_argument('--server-error', type=float, default=0.0,
+                        help='share of requests answered with a 5xx')
+    parser.add_argument('--quota', type=float,
+                        help='requests per second accepted, more get a 429')
+    parser.add_argument('--burst', type=float,
+                        help='requests accepted at once, default one second '
+                             'of --quota')
+    parser.add_argument('--key', help='subscription key to require')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    faults = Faults(args.latency, args.jitter, args.not_found, args.throttle,
+                    args.server_error, args.retry_after, args.seed)
+    quota = Quota(args.quota, args.burst) if args.quota else None
+    server = MockServer(args.fixtures, faults, quota, args.key, args.years,
+                        args.host, args.port)
+    print(f'Serving on {server.url}, {faults}', file=sys.stderr, flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.stats()), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
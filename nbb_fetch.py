@@ -0,0 +1,296 @@
+"""
+This script pulls the filings of many companies into a Parquet store.
+
+Enterprise numbers are read from a file (one per line, '#' starts a comment)
+or from stdin. References and filings are fetched in parallel with
+CompanyData.fetch_many(), the rubrics are written to a store.ParquetStore in
+batches and every finished company is recorded in a checkpoint file. Running
+the same command again skips the companies in the checkpoint, so an
+interrupted crawl resumes where it stopped. Companies that failed are
+recorded too and only fetched again with --retry-errors.
+
+Throughput, ETA, latency, retries and cache hits are printed to stderr,
+every request is logged at DEBUG with --log-level DEBUG. The exit status is 1 if any
+company failed and 130 when interrupted (progress is saved first).
+
+Example:
+    python nbb_fetch.py ids.txt --years 3 --out store/
+    cat ids.txt | python nbb_fetch.py - --out store/ --workers 16
+    python nbb_fetch.py ids.txt --out store/ --retry-errors
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import CompanyData as cd
+from client import CBSOClient
+from concurrency import AdaptiveLimiter
+from instrumentation import Metrics
+from keypool import KeyPool
+from ratelimit import RateLimiter
+
+OK = 'ok'
+ERROR = 'error'
+INVALID = 'invalid'
+
+
+class Checkpoint:
+    """
+    Represent the progress of a crawl as an append-only file, one line per
+    finished company: '<enterprise number>\\t<status>\\t<message>'.
+
+    Appending keeps the cost of recording a batch independent of the size of
+    the crawl. A line that was cut off by a crash is ignored.
+    """
+    def __init__(self, path: str):
+        """Initialise the class' attributes and read existing progress."""
+        self.path = path
+        self.status = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    parts = line.rstrip('\n').split('\t')
+                    if len(parts) >= 2:
+                        self.status[parts[0]] = parts[1]
+
+    def done(self, company_id: str, retry_errors=False) -> bool:
+        """Return True if the company does not need to be fetched again."""
+        status = self.status.get(company_id)
+        if status is None:
+            return False
+        return not (retry_errors and status == ERROR)
+
+    def record(self, entries: list):
+        """Append (company_id, status, message) entries and flush to disk."""
+        if not entries:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for company_id, status, message in entries:
+                message = ' '.join(str(message).split())
+                f.write(f'{company_id}\t{status}\t{message}\n')
+                self.status[company_id] = status
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class Progress:
+    """Represent throughput and ETA of a crawl, printed to stderr."""
+    def __init__(self, total: int, interval=10.0, stream=sys.stderr,
+                 concurrency=None, metrics=None):
+        """Initialise the class' attributes."""
+        self.total = total
+        self.concurrency = concurrency
+        self.metrics = metrics
+        self.interval = interval
+        self.stream = stream
+        self.companies = 0
+        self.filings = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self._printed = self.started
+
+    def update(self, filings: int, error: bool):
+        """Count one finished company and print if the interval passed."""
+        self.companies += 1
+        self.filings += filings
+        self.errors += error
+        now = time.monotonic()
+        if now - self._printed >= self.interval:
+            self._printed = now
+            self.report()
+
+    def report(self, final=False):
+        """Print a progress line."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = self.companies / elapsed
+        line = (f'{self.companies:,}/{self.total:,} companies '
+                f'({self.companies / max(self.total, 1):.1%}) | '
+                f'{rate:.1f} companies/s, {self.filings / elapsed:.1f} '
+                f'filings/s | errors {self.errors:,}')
+        if self.concurrency is not None:
+            line += f' | limit {self.concurrency.limit}'
+        if self.metrics is not None:
+            snapshot = self.metrics.snapshot()
+            p95 = snapshot['latency']['p95']
+            line += (f" | p95 {'-' if p95 is None else f'{p95:g}s'}, "
+                     f"retries {snapshot['retries']:,}, "
+                     f"cache hits {snapshot['cache_hits']:,}")
+        if final:
+            line += f' | elapsed {_duration(elapsed)}'
+        elif rate > 0:
+            remaining = (self.total - self.companies) / rate
+            line += f' | ETA {_duration(remaining)}'
+        print(line, file=self.stream, flush=True)
+
+
+def _duration(seconds: float) -> str:
+    """Return seconds as H:MM:SS."""
+    seconds = int(seconds)
+    return f'{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+
+
+def read_ids(source) -> list:
+    """
+    Return (cleaned id, line) pairs of the lines of a file object, in order
+    and without duplicates. Invalid ids are kept with None as cleaned id.
+    """
+    seen = set()
+    ids = []
+    for line in source:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        try:
+            company_id = cd.clean_company_id(line)
+        except ValueError:
+            ids.append((None, line))
+            continue
+        if company_id not in seen:
+            seen.add(company_id)
+            ids.append((company_id, line))
+    return ids
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Pull NBB filings of many companies into a Parquet store.')
+    parser.add_argument('ids', nargs='?', default='-',
+                        help="file with one enterprise number per line, "
+                             "'-' reads stdin (default)")
+    parser.add_argument('--years', type=int, default=1,
+                        help='amount of most recent filings per company')
+    parser.add_argument('--out', required=True,
+                        help='directory of the Parquet store')
+    parser.add_argument('--checkpoint',
+                        help='progress file, default <out>/.nbb_fetch.checkpoint')
+    parser.add_argument('--database', default='authentic',
+                        choices=list(cd.DATABASES),
+                        help='CBSO database to read the filings from')
+    parser.add_argument('--environment', default=cd.ENVIRONMENT,
+                        help='base URL of the webservice, e.g. that of '
+                             'mock_server.py')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='parallel requests, the maximum with --adaptive')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='tune the parallel requests to the latency and '
+                             'throttling of the server')
+    parser.add_argument('--batch', type=int, default=500,
+                        help='companies per store write and checkpoint')
+    parser.add_argument('--cache',
+                        help='directory of a DiskCache for the responses')
+    parser.add_argument('--rate', type=float,
+                        help='maximum requests per second, e.g. the quota '
+                             'of the subscription key')
+    parser.add_argument('--burst', type=float,
+                        help='requests allowed at once, default one second '
+                             'of --rate')
+    parser.add_argument('--rate-file',
+                        help='share the --rate budget with other processes '
+                             'using the same file')
+    parser.add_argument('--retry-errors', action='store_true',
+                        help='fetch companies that failed in earlier runs')
+    parser.add_argument('--progress', type=float, default=10.0,
+                        help='seconds between progress lines')
+    parser.add_argument('--log-level', default='WARNING',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='DEBUG logs every request, WARNING (default) '
+                             'only failed ones')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level, stream=sys.stderr,
+                        format='%(asctime)s %(levelname)s %(message)s')
+
+    cd.ENVIRONMENT = args.environment.rstrip('/') + '/'
+
+    # Imported here so '--help' stays fast and works without pyarrow.
+    from store import ParquetStore
+    store = ParquetStore(args.out)
+    checkpoint = Checkpoint(args.checkpoint or os.path.join(
+        args.out, '.nbb_fetch.checkpoint'))
+    rate_limiter = None
+    if args.rate:
+        rate_limiter = RateLimiter(args.rate, args.burst, args.rate_file)
+    concurrency = None
+    if args.adaptive:
+        concurrency = AdaptiveLimiter(initial=min(4, args.workers),
+                                      maximum=args.workers)
+    # Several keys in NBB_CBSO_sub_keys are pooled, see keypool.py.
+    metrics = Metrics()
+    client = CBSOClient(pool_size=args.workers, rate_limiter=rate_limiter,
+                        concurrency=concurrency,
+                        keys=KeyPool.from_environment(), metrics=metrics)
+    cache = None
+    if args.cache:
+        from cache import DiskCache
+        cache = DiskCache(args.cache)
+
+    if args.ids == '-':
+        ids = read_ids(sys.stdin)
+    else:
+        with open(args.ids, encoding='utf-8') as f:
+            ids = read_ids(f)
+
+    invalid = [(line, INVALID, 'Wrong input')
+               for company_id, line in ids if company_id is None]
+    todo = [company_id for company_id, _ in ids
+            if company_id is not None
+            and not checkpoint.done(company_id, args.retry_errors)]
+    skipped = len(ids) - len(invalid) - len(todo)
+    checkpoint.record([entry for entry in invalid
+                       if not checkpoint.done(entry[0])])
+    print(f'{len(todo):,} companies to fetch, {skipped:,} already done, '
+          f'{len(invalid):,} invalid', file=sys.stderr, flush=True)
+
+    progress = Progress(len(todo), interval=args.progress,
+                        concurrency=concurrency, metrics=metrics)
+    batch = []
+    entries = []
+
+    def flush():
+        store.write_companies(batch)
+        checkpoint.record(entries)
+        batch.clear()
+        entries.clear()
+
+    results = cd.fetch_many(
+        todo, year=args.years, max_workers=args.workers, client=client,
+        cache=cache, sections=['Rubrics'], compact=True,
+        database=args.database)
+    try:
+        for result in results:
+            if result.company is not None:
+                batch.append(result.company)
+            if result.ok:
+                entries.append((result.company_id, OK, ''))
+            else:
+                entries.append((result.company_id, ERROR,
+                                '; '.join(map(str, result.errors))))
+            filings = len(result.company.data) if result.company else 0
+            progress.update(filings, not result.ok)
+            if len(entries) >= args.batch:
+                flush()
+    except KeyboardInterrupt:
+        results.close()
+        flush()
+        progress.report(final=True)
+        print(f'Interrupted, progress saved to {checkpoint.path}',
+              file=sys.stderr)
+        return 130
+
+    flush()
+    progress.report(final=True)
+    return 1 if progress.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
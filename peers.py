@@ -0,0 +1,287 @@
+"""
+This module offers a search for similar companies (peers).
+
+A PeerIndex is built once from one row per company: its NACE code
+(ActivityCode), legal form, postal code and a few rubrics and ratios. The
+rubrics and ratios are scaled (log for amounts, then centred on the median
+and divided by the interquartile range) into a vector per company.
+
+Companies are grouped by the first digits of their NACE code and every group
+gets its own nearest-neighbour index, a BallTree of scikit-learn if it is
+installed, else a NumPy matrix searched in one vectorised pass. A query looks
+in the group of the company, and ranks the candidates by the distance of
+their vectors plus a penalty for a different NACE code, legal form or
+region. Queries take milliseconds over hundreds of thousands of companies.
+
+Example:
+    frame = frame_from_store(ParquetStore('store/'), kbo=KboStore('kbo.sqlite'))
+    index = PeerIndex(frame)
+    index.save('peers.pkl')
+    index.peers('0403.170.701', k=10)
+"""
+
+import pickle
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import ratios
+from CompanyData import clean_company_id
+
+try:
+    from sklearn.neighbors import BallTree
+except ImportError:
+    BallTree = None
+
+# Revenue, operating profit, total assets, equity, employees (FTE) and ratios.
+FEATURES = ['70', '9901', '20/58', '10/15', '9087', 'Gross Margin',
+            'Net Margin', 'DSO', 'DPO']
+# Amounts are compared on a log scale, a company twice as big is as far away
+# at any size.
+AMOUNTS = ['70', '9901', '20/58', '10/15', '9087']
+CLIP = 5.0
+
+
+def region(postal_code) -> str:
+    """Return 'Brussels', 'Flanders' or 'Wallonia' of a Belgian postal code."""
+    try:
+        code = int(str(postal_code).strip()[:4])
+    except (TypeError, ValueError):
+        return None
+    if 1000 <= code < 1300:
+        return 'Brussels'
+    if 1500 <= code < 4000 or 8000 <= code < 10000:
+        return 'Flanders'
+    if 1300 <= code < 1500 or 4000 <= code < 8000:
+        return 'Wallonia'
+    return None
+
+
+def frame_from_store(store, kbo=None, years=None, features=FEATURES):
+    """
+    Return DataFrame with one row per company for PeerIndex, from the latest
+    filing of every company in a store.ParquetStore.
+
+    kbo: kbo.KboStore to add legal form and postal code, and the main NACE
+        code where the filing has none.
+    years: fiscal years to read, None reads all.
+    """
+    codes = [f for f in features if f not in ratios.RATIOS]
+    if any(f in ratios.RATIOS for f in features):
+        codes = sorted(set(codes) | set(ratios.INPUT_CODES))
+
+    long = store.read(
+        columns=['EnterpriseNumber', 'ReferenceNumber', 'Period', 'Code',
+                 'Value', 'StartDate', 'EndDate', 'ModelType', 'ActivityCode'],
+        years=years, codes=codes)
+    long = long[long['Period'] == 'N']
+
+    info = (long.drop_duplicates('ReferenceNumber')
+                .sort_values('EndDate')
+                .drop_duplicates('EnterpriseNumber', keep='last')
+                .set_index('ReferenceNumber'))
+    long = long[long['ReferenceNumber'].isin(info.index)]
+    panel = long.pivot_table(index='ReferenceNumber', columns='Code',
+                             values='Value', aggfunc='last')
+    panel = info[['EnterpriseNumber', 'StartDate', 'EndDate', 'ModelType',
+                  'ActivityCode']].join(panel)
+    ratio_names = [f for f in features if f in ratios.RATIOS]
+    if ratio_names:
+        panel = panel.join(ratios.compute_ratios(panel)[ratio_names])
+
+    frame = panel.set_index('EnterpriseNumber')
+    frame = frame.reindex(columns=['ActivityCode'] + list(features))
+    frame['LegalForm'] = None
+    frame['PostalCode'] = None
+
+    if kbo is not None:
+        register = kbo.query("""
+            SELECT e.enterprise_number, e.juridical_form, ad.zipcode,
+                   (SELECT a.nace_code FROM activities a
+                    WHERE a.entity_number = e.enterprise_number
+                      AND a.classification = 'MAIN'
+                    ORDER BY a.nace_version DESC LIMIT 1) AS nace_code
+            FROM enterprises e
+            LEFT JOIN addresses ad ON ad.entity_number = e.enterprise_number
+                                  AND ad.type_of_address = 'REGO'
+        """).drop_duplicates('enterprise_number')
+        register = register.set_index('enterprise_number').reindex(frame.index)
+        frame['LegalForm'] = register['juridical_form']
+        frame['PostalCode'] = register['zipcode']
+        frame['ActivityCode'] = frame['ActivityCode'].fillna(
+            register['nace_code'])
+    return frame
+
+
+class PeerIndex:
+    """Represent a nearest-neighbour index of companies."""
+    def __init__(self, frame: pd.DataFrame, features=None, weights=None,
+                 group_digits=2, nace_penalty=0.5, legal_form_penalty=0.5,
+                 region_penalty=0.5, leaf_size=40):
+        """
+        Initialise the class' attributes and build the index.
+
+        frame: one row per company, indexed by enterprise number, with
+            'ActivityCode', optionally 'LegalForm' and 'PostalCode' (or
+            'Region'), and the feature columns.
+        features: columns to compare, by default those of FEATURES in frame.
+        weights: {feature: weight}, 1 for features not given.
+        group_digits: NACE digits that must match, 2 is the division.
+        *_penalty: added to the distance when the full NACE code, the legal
+            form or the region differs.
+        """
+        if features is None:
+            features = [f for f in FEATURES if f in frame.columns]
+        self.features = list(features)
+        self.group_digits = group_digits
+        self.nace_penalty = nace_penalty
+        self.legal_form_penalty = legal_form_penalty
+        self.region_penalty = region_penalty
+
+        self.ids = np.array([clean_company_id(str(i)) for i in frame.index],
+                            dtype=object)
+        self.positions = {company_id: i for i, company_id in enumerate(self.ids)}
+        self.nace = self._column(frame, 'ActivityCode')
+        self.legal_form = self._column(frame, 'LegalForm')
+        if 'Region' in frame.columns:
+            self.region = self._column(frame, 'Region')
+        else:
+            self.region = np.array(
+                [region(p) for p in self._column(frame, 'PostalCode')],
+                dtype=object)
+        self.values = frame[self.features].apply(
+            pd.to_numeric, errors='coerce').to_numpy(dtype='float64')
+
+        self.vectors = self._scale(self.values)
+        if weights:
+            self.vectors *= np.array([weights.get(f, 1.0)
+                                      for f in self.features])
+
+        groups = {}
+        for i, code in enumerate(self.nace):
+            groups.setdefault(self._group(code), []).append(i)
+        self.groups = {key: np.array(rows) for key, rows in groups.items()}
+        self.groups[None] = np.arange(len(self.ids))
+        self.trees = {}
+        self.matrices = {}
+        if BallTree is not None:
+            self.trees = {key: BallTree(self.vectors[rows], leaf_size=leaf_size)
+                          for key, rows in self.groups.items()}
+        else:
+            # Contiguous vectors and squared norms per group, so a query is
+            # one matrix-vector product.
+            for key, rows in self.groups.items():
+                matrix = np.ascontiguousarray(self.vectors[rows])
+                self.matrices[key] = (matrix, (matrix ** 2).sum(axis=1))
+
+    def _column(self, frame, column) -> np.ndarray:
+        """Return a column as strings (None where missing)."""
+        if column not in frame.columns:
+            return np.full(len(frame), None, dtype=object)
+        return np.array([None if pd.isna(v) else str(v).strip()
+                         for v in frame[column]], dtype=object)
+
+    def _group(self, code):
+        """Return the NACE group of a code, None without code."""
+        if not code:
+            return None
+        return code.replace('.', '')[:self.group_digits]
+
+    def _scale(self, values: np.ndarray) -> np.ndarray:
+        """
+        Return the values as comparable vectors: log of amounts, centred on
+        the median, divided by the interquartile range and clipped. Missing
+        values become the median.
+        """
+        x = values.copy()
+        amounts = [i for i, f in enumerate(self.features) if f in AMOUNTS]
+        x[:, amounts] = np.sign(x[:, amounts]) * np.log1p(np.abs(x[:, amounts]))
+
+        # A feature missing for every company is left at 0.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            center = np.nanmedian(x, axis=0)
+            spread = (np.nanpercentile(x, 75, axis=0)
+                      - np.nanpercentile(x, 25, axis=0))
+            fallback = np.nanstd(x, axis=0)
+        spread = np.where(spread > 0, spread,
+                          np.where(fallback > 0, fallback, 1.0))
+        center = np.nan_to_num(center)
+        spread = np.nan_to_num(spread, nan=1.0)
+        z = np.clip((x - center) / spread, -CLIP, CLIP)
+        return np.nan_to_num(z, nan=0.0)
+
+    def _candidates(self, key, vector: np.ndarray, k: int) -> tuple:
+        """Return (distances, positions) of the k nearest in a group."""
+        rows = self.groups[key]
+        k = min(k, len(rows))
+        if self.trees:
+            distances, found = self.trees[key].query(vector.reshape(1, -1), k=k)
+            return distances[0], rows[found[0]]
+        matrix, norms = self.matrices[key]
+        squared = norms - 2 * (matrix @ vector) + vector @ vector
+        nearest = np.argpartition(squared, k - 1)[:k]
+        return np.sqrt(np.maximum(squared[nearest], 0)), rows[nearest]
+
+    def peers(self, company_id: str, k=10, oversample=4) -> pd.DataFrame:
+        """
+        Return DataFrame of the k most similar companies, most similar first.
+
+        Candidates come from the NACE group of the company (all companies if
+        the group is too small) and are ranked by 'distance': the distance of
+        the vectors plus the penalties for a different NACE code, legal form
+        or region.
+        """
+        position = self.positions.get(clean_company_id(company_id))
+        if position is None:
+            raise KeyError(f'{company_id} is not in the peer index')
+        vector = self.vectors[position]
+        key = self._group(self.nace[position])
+
+        if len(self.groups.get(key, ())) <= k:
+            key = None
+        distances, found = self._candidates(key, vector, k * oversample + 1)
+        keep = found != position
+        distances, found = distances[keep], found[keep]
+
+        scores = (distances
+                  + self.nace_penalty * self._differs(self.nace, position, found)
+                  + self.legal_form_penalty
+                  * self._differs(self.legal_form, position, found)
+                  + self.region_penalty
+                  * self._differs(self.region, position, found))
+        best = np.argsort(scores, kind='stable')[:k]
+        found = found[best]
+
+        result = pd.DataFrame({
+            'EnterpriseNumber': self.ids[found],
+            'distance': scores[best],
+            'ActivityCode': self.nace[found],
+            'LegalForm': self.legal_form[found],
+            'Region': self.region[found],
+            })
+        values = pd.DataFrame(self.values[found], columns=self.features)
+        return pd.concat([result, values], axis=1)
+
+    def _differs(self, column: np.ndarray, position: int,
+                 found: np.ndarray) -> np.ndarray:
+        """Return 1.0 where the candidates differ from the company, else 0."""
+        own = column[position]
+        if own is None:
+            return np.zeros(len(found))
+        return (column[found] != own).astype('float64')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def save(self, path: str):
+        """Write the index to a file."""
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'PeerIndex':
+        """Return an index written with 'save'. Only load trusted files."""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
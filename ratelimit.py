@@ -0,0 +1,121 @@
+"""
+This module offers a token bucket that keeps the requests to the CBSO
+webservice under the quota of a subscription key.
+
+The bucket holds at most 'burst' tokens and refills at 'rate' tokens per
+second, every request takes one. A caller that finds the bucket empty
+reserves its token anyway and sleeps until it is due, so waiting callers are
+served in order instead of all retrying at once.
+
+Within one process the bucket is shared by all threads. Given a 'path', the
+state (tokens and time) lives in that small file, locked with fcntl for every
+update, so all local processes using the same path share one bucket and the
+aggregate rate stays at the quota.
+
+Example:
+    limiter = RateLimiter(rate=10, burst=20, path='/tmp/nbb-cbso.bucket')
+    client = CBSOClient(rate_limiter=limiter)
+"""
+
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError: # not available on Windows
+    fcntl = None
+
+# tokens, time of the last update (seconds since the epoch)
+_STATE = struct.Struct('<dd')
+
+
+class RateLimiter:
+    """Represent a token bucket shared by threads and, optionally, processes."""
+    def __init__(self, rate: float, burst=None, path=None):
+        """
+        Initialise the class' attributes.
+
+        rate: tokens (requests) per second.
+        burst: size of the bucket, the amount of requests that may go out at
+            once after a quiet period. Defaults to one second worth of rate.
+        path: file holding the shared state, None keeps it in this process.
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        if path is not None and fcntl is None:
+            raise ImportError('Sharing a RateLimiter between processes '
+                              'requires fcntl, which is POSIX only')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self.path = path
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._fd = None
+        self._pid = None
+
+    def acquire(self, tokens=1) -> float:
+        """Block until 'tokens' are available and return seconds waited."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def reserve(self, tokens=1) -> float:
+        """
+        Take 'tokens' from the bucket and return the seconds to wait before
+        using them, without sleeping. For event loops:
+            await asyncio.sleep(limiter.reserve())
+        """
+        with self._lock:
+            if self.path is None:
+                self._tokens, self._updated, delay = self._take(
+                    self._tokens, self._updated, tokens)
+                return delay
+
+            fd = self._file()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                data = os.pread(fd, _STATE.size, 0)
+                if len(data) == _STATE.size:
+                    available, updated = _STATE.unpack(data)
+                else: # new file
+                    available, updated = self.burst, time.time()
+                available, updated, delay = self._take(
+                    available, updated, tokens)
+                os.pwrite(fd, _STATE.pack(available, updated), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            return delay
+
+    def _take(self, available: float, updated: float, tokens: float) -> tuple:
+        """Return the bucket after refilling and taking, and the delay."""
+        now = time.time()
+        # The clock may step back, e.g. after an NTP correction.
+        elapsed = max(0.0, now - updated)
+        available = min(self.burst, available + elapsed * self.rate)
+        available -= tokens
+        delay = -available / self.rate if available < 0 else 0.0
+        return available, max(now, updated), delay
+
+    def _file(self) -> int:
+        """Return the descriptor of the state file, opened once per process."""
+        # A forked child shares the parent's descriptor and with it the lock,
+        # so it opens its own.
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+    def close(self):
+        """Close the state file."""
+        with self._lock:
+            if self._fd is not None and self._pid == os.getpid():
+                os.close(self._fd)
+            self._fd = None
+
+    def __repr__(self):
+        return (f'RateLimiter(rate={self.rate:g}, burst={self.burst:g}, '
+                f'path={self.path!r})')
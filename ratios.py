@@ -0,0 +1,200 @@
+"""
+This module offers financial ratios computed over a whole DataFrame at once.
+
+The input is a panel with one row per company and period and one column per
+rubric code ('70', '600/8', ...), e.g. the output of Filing.fetch_fin_data
+before renaming, or many of them concatenated. Columns named after the
+description of the code ('Omzet (70)') are recognised as well.
+
+Every ratio is a float column. Where a ratio can not be computed it is NaN and
+the reason is given in the matching flag column, e.g. 'DSO flag'. Rows without
+a problem have no flag (missing value).
+
+The pandas conversions cost about the same for one row as for thousands, so a
+single filing goes through 'filing_ratios' instead, which reads its rows of
+{code: value} directly. Filing.fetch_fin_data does so.
+
+Example:
+    panel = pd.concat([filing.fetch_fin_data(['N', 'NM1'], metrics=False)
+                       for filing in filings])
+    scored = add_ratios(panel, model_type='m02-f')
+"""
+
+import numpy as np
+import pandas as pd
+
+import codes as cds
+
+RATIOS = ['DSO', 'DPO', 'DIO_crude', 'DIO_finished', 'Gross Margin',
+          'Net Margin']
+FLAGS = [f'{name} flag' for name in RATIOS]
+# Rubric codes read by compute_ratios, to read only those from a store.
+INPUT_CODES = ['70', '74', '740', '9146', '40', '9150', '600/8', '61', '9145',
+               '44', '35', '30/31', '34', '36', '60', '62', '630', '631/4',
+               '635/80', '640/8', '649', '71', '72', '9125', '32', '33', '37',
+               '9901', '76A', '66A', '635/8']
+FULL_SCHEMES = ['m02-f', 'm82-f']
+CONSTRUCTION = ('41', '42', '43')
+
+NOT_365_DAYS = 'Not 365 days'
+ZERO_DIVISION = 'Zero Division'
+NO_REVENUE_DSO = 'Revenue (70) not given'
+NO_REVENUE = 'No revenue given'
+NOT_FULL_SCHEME = 'Not available for Abbr. or Micro model'
+
+
+def _code(panel: pd.DataFrame, code: str) -> np.ndarray:
+    """Return the values of a rubric code as floats, 0 if not present."""
+    for column in (code, cds.label(code)):
+        if column is not None and column in panel.columns:
+            return (pd.to_numeric(panel[column], errors='coerce')
+                    .fillna(0).to_numpy(dtype='float64'))
+    return np.zeros(len(panel))
+
+
+def _column_or_value(panel: pd.DataFrame, column: str, value) -> np.ndarray:
+    """Return a column of the panel, or 'value' repeated if given."""
+    if value is not None:
+        return np.full(len(panel), value, dtype=object)
+    if column in panel.columns:
+        return panel[column].to_numpy(dtype=object)
+    return np.full(len(panel), None, dtype=object)
+
+
+def _flagged(values: np.ndarray, flags: list):
+    """
+    Return a float ratio and its flag column. 'flags' is a list of
+    (condition, reason), the first condition that holds sets the flag.
+    """
+    flag = np.full(len(values), None, dtype=object)
+    for condition, reason in reversed(flags):
+        flag[condition] = reason
+    ratio = np.where(pd.isna(flag), values, np.nan).astype('float64')
+    return ratio, flag
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, np.nan,
+                        numerator / np.where(denominator == 0, 1, denominator))
+
+
+def compute_ratios(panel: pd.DataFrame, model_type=None,
+                   activity_code=None) -> pd.DataFrame:
+    """
+    Return DataFrame with the ratios and their flags, same index as panel.
+
+    The panel needs 'StartDate' and 'EndDate' columns. 'ModelType' and
+    'ActivityCode' are read from the panel unless given for all rows.
+    """
+    start = pd.to_datetime(panel['StartDate']).to_numpy()
+    end = pd.to_datetime(panel['EndDate']).to_numpy()
+    not_full_year = ~((end - start) >= np.timedelta64(362, 'D'))
+
+    result = _ratios(lambda code: _code(panel, code), not_full_year,
+                     _column_or_value(panel, 'ModelType', model_type),
+                     _column_or_value(panel, 'ActivityCode', activity_code))
+    ratios = pd.DataFrame(
+        {name: result[name][0] for name in RATIOS}, index=panel.index)
+    for name, flag in zip(RATIOS, FLAGS):
+        ratios[flag] = pd.Series(result[name][1], index=panel.index,
+                                 dtype=object)
+    return ratios
+
+
+def filing_ratios(rows: list, start_date, end_date, model_type=None,
+                  activity_code=None) -> dict:
+    """
+    Return {column: values} of the ratios and flags of a single filing, the
+    columns of compute_ratios. 'rows' are {code: value} per period, missing
+    codes count as 0.
+    """
+    days = pd.Timestamp(end_date) - pd.Timestamp(start_date)
+    not_full_year = np.full(len(rows), not days >= pd.Timedelta(days=362))
+
+    def c(code):
+        values = np.array([row.get(code, 0.0) for row in rows],
+                          dtype='float64')
+        return np.where(np.isnan(values), 0, values)
+
+    result = _ratios(c, not_full_year,
+                     np.full(len(rows), model_type, dtype=object),
+                     np.full(len(rows), activity_code, dtype=object))
+    columns = {name: result[name][0] for name in RATIOS}
+    for name, flag in zip(RATIOS, FLAGS):
+        columns[flag] = result[name][1]
+    return columns
+
+
+def _ratios(c, not_full_year: np.ndarray, models: np.ndarray,
+            activities: np.ndarray) -> dict:
+    """
+    Return {ratio: (values, flags)}. 'c' returns the floats of a rubric
+    code, one per row.
+    """
+    not_full_scheme = ~np.isin(models, FULL_SCHEMES)
+    construction = np.array(
+        [isinstance(a, str) and a.startswith(CONSTRUCTION)
+         for a in activities], dtype=bool)
+
+    result = {}
+
+    # Days sales outstanding
+    revenue = c('70')
+    denominator = revenue + c('74') - c('740') + c('9146')
+    result['DSO'] = _flagged(
+        np.round(_divide(c('40') + c('9150'), denominator) * 365), [
+            (not_full_year, NOT_365_DAYS),
+            (revenue == 0, NO_REVENUE_DSO),
+            (denominator == 0, ZERO_DIVISION),
+        ])
+
+    # Days payables outstanding
+    denominator = c('600/8') + c('61') + c('9145')
+    result['DPO'] = _flagged(
+        np.round(_divide(c('44'), denominator) * 365), [
+            (not_full_year, NOT_365_DAYS),
+            (denominator == 0, ZERO_DIVISION),
+        ])
+
+    # Inventory cycle of raw materials and goods for resale
+    real_estate = np.where(construction, 0, c('35'))
+    denominator = c('30/31') + c('34') + real_estate + c('36')
+    result['DIO_crude'] = _flagged(
+        np.nan_to_num(np.round(_divide(c('60'), denominator))), [
+            (not_full_year, NOT_365_DAYS),
+            (not_full_scheme, NOT_FULL_SCHEME),
+        ])
+
+    # Inventory cycle of work in progress and finished goods
+    operating_costs = (c('60') + c('61') + c('62') + c('630') + c('631/4')
+                       + c('635/80') + c('640/8') + c('649'))
+    numerator = (operating_costs - c('71') - c('72') - c('740')
+                 - c('9125'))
+    real_estate = np.where(construction, c('35'), 0)
+    denominator = c('32') + c('33') + real_estate + c('37')
+    result['DIO_finished'] = _flagged(
+        np.nan_to_num(np.round(_divide(numerator, denominator))), [
+            (not_full_year, NOT_365_DAYS),
+            (not_full_scheme, NOT_FULL_SCHEME),
+        ])
+
+    # Gross and net margin
+    revenue = c('70')
+    profit = c('9901') - c('76A') + c('66A')
+    depreciation = c('630') + c('631/4') + c('635/8')
+    denominator = revenue + c('74') + c('740')
+    for name, numerator in (('Gross Margin', profit + depreciation),
+                            ('Net Margin', profit + c('9125'))):
+        result[name] = _flagged(_divide(numerator * 100, denominator), [
+            (np.trunc(revenue) == 0, NO_REVENUE),
+            (denominator == 0, ZERO_DIVISION),
+        ])
+    return result
+
+
+def add_ratios(panel: pd.DataFrame, model_type=None,
+               activity_code=None) -> pd.DataFrame:
+    """Return the panel with the ratio and flag columns added."""
+    return pd.concat(
+        [panel, compute_ratios(panel, model_type, activity_code)], axis=1)
@@ -0,0 +1,178 @@
+"""
+This module offers a Parquet store of all fetched rubrics.
+
+Every filing is written in long format, one row per rubric:
+    EnterpriseNumber, ReferenceNumber, Period, Code, Value, StartDate,
+    EndDate, ModelType, ActivityCode, FiscalYear
+
+The dataset is partitioned by FiscalYear (year of the end date of the
+exercise) and ModelType, so a query for one year or one scheme only reads
+those files. Reading only the needed columns skips the others on disk.
+
+Requires pyarrow:
+    pip install pyarrow
+
+Example:
+    store = ParquetStore('store/')
+    store.write_company(company)
+    df = store.read(columns=['EnterpriseNumber', 'Code', 'Value'],
+                    years=[2022, 2023], model_types=['m02-f'],
+                    codes=['70', '9901'])
+"""
+
+import os
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+    ds = None
+
+COLUMNS = ['EnterpriseNumber', 'ReferenceNumber', 'Period', 'Code', 'Value',
+           'StartDate', 'EndDate', 'ModelType', 'ActivityCode', 'FiscalYear']
+PARTITIONS = ['FiscalYear', 'ModelType']
+
+
+def filing_to_long(filing, company_id: str) -> pd.DataFrame:
+    """
+    Return DataFrame with one row per rubric of a Filing. A code given twice
+    for a period keeps its last value, like Filing.
+    """
+    rubrics = pd.DataFrame.from_records(
+        filing.dictionary.get('Rubrics', []),
+        columns=['Period', 'Code', 'Value'])
+    end_date = filing.endDate
+    long = pd.DataFrame({
+        'EnterpriseNumber': company_id,
+        'ReferenceNumber': filing.filing_reference,
+        'Period': rubrics['Period'].astype(str),
+        'Code': rubrics['Code'].fillna('0').astype(str),
+        'Value': pd.to_numeric(rubrics['Value'], errors='coerce'),
+        'StartDate': filing.startDate,
+        'EndDate': end_date,
+        'ModelType': filing.modelType or 'unknown',
+        'ActivityCode': filing.activityCode,
+        'FiscalYear': int(str(end_date)[:4]) if end_date else 0,
+        }, columns=COLUMNS)
+    return long.drop_duplicates(['Period', 'Code'], keep='last',
+                                ignore_index=True)
+
+
+class ParquetStore:
+    """Represent a partitioned Parquet dataset of rubrics on disk."""
+    def __init__(self, path: str):
+        """Initialise the class' attributes."""
+        if pa is None:
+            raise ImportError("ParquetStore requires pyarrow: "
+                              "'pip install pyarrow'")
+        self.path = path
+        self.schema = pa.schema([
+            ('EnterpriseNumber', pa.string()),
+            ('ReferenceNumber', pa.string()),
+            ('Period', pa.string()),
+            ('Code', pa.string()),
+            ('Value', pa.float64()),
+            ('StartDate', pa.string()),
+            ('EndDate', pa.string()),
+            ('ModelType', pa.string()),
+            ('ActivityCode', pa.string()),
+            ('FiscalYear', pa.int32()),
+            ])
+        self.partitioning = ds.partitioning(
+            pa.schema([('FiscalYear', pa.int32()),
+                       ('ModelType', pa.string())]),
+            flavor='hive')
+        self._references = None
+
+    def _dataset(self):
+        return ds.dataset(self.path, schema=self.schema, format='parquet',
+                          partitioning=self.partitioning)
+
+    def references(self) -> set:
+        """Return the set of ReferenceNumbers already in the store."""
+        if self._references is None:
+            if os.path.isdir(self.path):
+                table = self._dataset().to_table(columns=['ReferenceNumber'])
+                self._references = set(
+                    table.column('ReferenceNumber').unique().to_pylist())
+            else:
+                self._references = set()
+        return self._references
+
+    def write(self, filings, company_id: str, skip_existing=True) -> int:
+        """
+        Append the rubrics of the filings and return the amount of rows.
+
+        Filings already in the store are skipped unless skip_existing=False.
+        """
+        return self.write_many(((filing, company_id) for filing in filings),
+                               skip_existing)
+
+    def write_many(self, items, skip_existing=True) -> int:
+        """
+        Append (filing, company_id) pairs of many companies in one go and
+        return the amount of rows. Writing in batches keeps the amount of
+        files in the dataset down.
+        """
+        frames = []
+        for filing, company_id in items:
+            if skip_existing and filing.filing_reference in self.references():
+                continue
+            frames.append(filing_to_long(filing, company_id))
+        if not frames:
+            return 0
+
+        df = pd.concat(frames, ignore_index=True)
+        table = pa.Table.from_pandas(df, schema=self.schema,
+                                     preserve_index=False)
+        ds.write_dataset(
+            table, self.path, format='parquet',
+            partitioning=self.partitioning,
+            basename_template=f'part-{uuid.uuid4().hex}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore')
+        self.references().update(df['ReferenceNumber'].unique())
+        return len(df)
+
+    def write_company(self, company, skip_existing=True) -> int:
+        """Append all filings in 'company.data' and return amount of rows."""
+        return self.write(company.data.values(), company.id, skip_existing)
+
+    def write_companies(self, companies, skip_existing=True) -> int:
+        """Append the filings of many CompanyData objects in one write."""
+        return self.write_many(((filing, company.id)
+                                for company in companies
+                                for filing in company.data.values()),
+                               skip_existing)
+
+    def read(self, columns=None, years=None, model_types=None, codes=None,
+             enterprise_numbers=None, filter=None) -> pd.DataFrame:
+        """
+        Return DataFrame with the requested columns and rows.
+
+        years and model_types prune partitions, codes and enterprise_numbers
+        filter rows while scanning. 'filter' takes any extra pyarrow dataset
+        expression, e.g. ds.field('Value') > 1000.
+        """
+        if not os.path.isdir(self.path):
+            return pd.DataFrame(columns=columns or COLUMNS)
+
+        expressions = []
+        for column, values in (('FiscalYear', years),
+                               ('ModelType', model_types),
+                               ('Code', codes),
+                               ('EnterpriseNumber', enterprise_numbers)):
+            if values is not None:
+                expressions.append(ds.field(column).isin(list(values)))
+        if filter is not None:
+            expressions.append(filter)
+
+        expression = None
+        for item in expressions:
+            expression = item if expression is None else expression & item
+
+        table = self._dataset().to_table(columns=columns, filter=expression)
+        return table.to_pandas()
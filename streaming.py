@@ -0,0 +1,233 @@
+"""
+This module offers a streaming reader for JSONXBRL responses.
+
+A JSONXBRL filing is one JSON object with sections such as 'Rubrics',
+'Administrators' and 'ParticipatingInterests'. Most pipelines only need a few
+of them. 'load_sections' reads the response chunk by chunk and only decodes
+the requested sections; the others are scanned and dropped on the fly. The raw
+bytes are never held as a whole, only the text of the section being read, and
+each section is yielded as soon as it is complete. Memory is the gain, not
+speed: skipping a section in Python costs more than json.loads() of it.
+
+Example:
+    response = requests.get(url, headers=hdr, stream=True)
+    filing = load_sections(response.iter_content(65536), ['Rubrics'])
+"""
+
+import codecs
+import json
+import re
+
+# Always kept, Filing needs them.
+REQUIRED = ('ReferenceNumber', 'EnterpriseName')
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+_STRUCTURE = re.compile(r'["{}\[\],]|[^"{}\[\],\s]')
+# A whole string in one match, else a bracket, else an unterminated string.
+_IN_VALUE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]|"')
+_STRING_END = re.compile(r'["\\]')
+
+
+class _ValueScanner:
+    """
+    Find the end of one JSON value across chunks, keeping track of strings
+    and nesting depth. Regular expressions jump from one significant
+    character to the next, so plain text is not looked at char by char.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+
+    def scan(self, text: str, pos: int) -> int:
+        """
+        Return the index just after the value, or -1 if it continues in the
+        next chunk. 'pos' is where scanning resumes.
+        """
+        end = len(text)
+        while pos < end:
+            if self.escape:
+                self.escape = False
+                pos += 1
+                continue
+
+            if self.in_string:
+                match = _STRING_END.search(text, pos)
+                if match is None:
+                    return -1
+                pos = match.start()
+                if text[pos] == '\\':
+                    self.escape = True
+                else:
+                    self.in_string = False
+                    if self.depth == 0:
+                        return pos + 1
+                pos += 1
+                continue
+
+            if self.depth > 0:
+                for match in _IN_VALUE.finditer(text, pos):
+                    char = text[match.start()]
+                    if char == '{' or char == '[':
+                        self.depth += 1
+                    elif char == '}' or char == ']':
+                        self.depth -= 1
+                        if self.depth == 0:
+                            return match.end()
+                    elif match.end() - match.start() == 1:
+                        self.in_string = True
+                        pos = match.end()
+                        break
+                else:
+                    return -1
+                continue
+
+            match = _STRUCTURE.search(text, pos)
+            if match is None:
+                return -1
+            pos = match.start()
+            char = text[pos]
+
+            if char == '"':
+                self.in_string = True
+                self.started = True
+            elif char in '{[':
+                self.depth += 1
+                self.started = True
+            elif char in '}]':
+                if self.depth == 0: # end of a top-level scalar
+                    return pos
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos + 1
+            elif char == ',':
+                if self.started:
+                    return pos
+            else:
+                self.started = True
+            pos += 1
+        return -1
+
+
+def iter_sections(chunks, sections=None):
+    """
+    Yield (key, value) of the top-level object for the requested sections.
+
+    chunks: iterable of bytes (or str), e.g. response.iter_content().
+    sections: keys to decode, None decodes all. The keys in REQUIRED are
+        always decoded.
+    """
+    wanted = None if sections is None else set(sections) | set(REQUIRED)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    done = False
+
+    def more():
+        nonlocal buffer, pos, done
+        if done:
+            return False
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            done = True
+            buffer = buffer[pos:] + decoder.decode(b'', final=True)
+            pos = 0
+            return False
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or not more():
+                return
+
+    def expect(chars: str) -> str:
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] not in chars:
+            found = buffer[pos:pos + 20] or 'end of data'
+            raise ValueError(f'Not a JSON object, expected {chars!r} '
+                             f'but found {found!r}')
+        pos += 1
+        return buffer[pos - 1]
+
+    def read_value(keep: bool):
+        nonlocal pos
+        skip_whitespace()
+        if keep:
+            return decode_value()
+        scanner = _ValueScanner()
+        while True:
+            end = scanner.scan(buffer, pos)
+            if end != -1:
+                pos = end
+                return None
+            # Only the scanner state is carried to the next chunk.
+            pos = len(buffer)
+            if not more():
+                raise ValueError('Unexpected end of JSON data')
+
+    def decode_value():
+        """
+        Decode a value with the C decoder, retrying only when the buffered
+        text has doubled, so the work stays linear in its size.
+        """
+        nonlocal pos, buffer
+        parts = [buffer[pos:]]
+        size = len(parts[0])
+        next_attempt = 0
+        while True:
+            if size >= next_attempt or done:
+                text = ''.join(parts)
+                parts = [text]
+                try:
+                    value, end = _decoder.raw_decode(text)
+                except json.JSONDecodeError:
+                    if done:
+                        raise
+                    next_attempt = 2 * size
+                else:
+                    # Only a number may continue in the next chunk, so it
+                    # only counts once the delimiter after it is seen. A
+                    # string, object, array or literal is complete.
+                    if type(value) not in (int, float) or done or \
+                            text[end:end + 1] in (',', '}', ']', ':') or \
+                            (end < len(text) and text[end] in WHITESPACE):
+                        buffer, pos = text, end
+                        return value
+                    next_attempt = size + 1
+            pos = len(buffer)
+            more()
+            parts.append(buffer)
+            size += len(buffer)
+
+    expect('{')
+    skip_whitespace()
+    if buffer[pos:pos + 1] == '}':
+        return
+    while True:
+        key = read_value(keep=True)
+        expect(':')
+        keep = wanted is None or key in wanted
+        value = read_value(keep)
+        if keep:
+            yield key, value
+        if expect(',}') == '}':
+            return
+
+
+def load_sections(chunks, sections=None) -> dict:
+    """Return dictionary with only the requested sections of the object."""
+    return dict(iter_sections(chunks, sections))
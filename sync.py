@@ -0,0 +1,181 @@
+"""
+This module offers an incremental refresh of CompanyData.
+
+The ReferenceNumbers already held locally are kept in a KnownReferences file.
+On a refresh only the reference table is requested; after deduplication by
+'_handle_df_of_references' it is compared with the known references and only
+filings that are new, or that correct a filing already held, are downloaded.
+
+Example:
+    known = KnownReferences('known_references.json')
+    for delta in sync_many(ids, known, max_workers=8):
+        print(delta)
+    known.save()
+"""
+
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import CompanyData as cd
+
+
+class KnownReferences:
+    """Represent the ReferenceNumbers held locally, per company."""
+    def __init__(self, path=None):
+        """
+        Initialise the class' attributes and read 'path' if it exists.
+
+        The file maps company ID to {ReferenceNumber: [startDate, endDate]},
+        the exercise dates are needed to recognise corrections.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.references = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.references = json.load(f)
+
+    def get(self, company_id: str) -> dict:
+        """Return {ReferenceNumber: (startDate, endDate)} of a company."""
+        with self._lock:
+            return {ref: tuple(dates) for ref, dates
+                    in self.references.get(company_id, {}).items()}
+
+    def add(self, company_id: str, reference: str, start: str, end: str):
+        """
+        Register a filing. A held filing for the same exercise is replaced.
+        """
+        with self._lock:
+            held = self.references.setdefault(company_id, {})
+            for ref, dates in list(held.items()):
+                if tuple(dates) == (start, end):
+                    del held[ref]
+            held[reference] = [start, end]
+
+    def save(self, path=None):
+        """Write the known references atomically to 'path'."""
+        path = path or self.path
+        directory = os.path.dirname(os.path.abspath(path))
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.references, f)
+            os.replace(tmp_path, path)
+
+
+class ReferenceDelta:
+    """Represent the outcome of an incremental refresh of one company."""
+    def __init__(self, company_id: str):
+        """Initialise atrributes."""
+        self.company_id = company_id
+        self.new = []
+        self.corrected = []
+        self.unchanged = []
+        self.data = {}
+        self.errors = []
+        self.company = None
+
+    @property
+    def fetched(self) -> int:
+        """Return the amount of filings downloaded."""
+        return len(self.data)
+
+    def __repr__(self):
+        return (f'ReferenceDelta({self.company_id!r}, new={len(self.new)}, '
+                f'corrected={len(self.corrected)}, '
+                f'unchanged={len(self.unchanged)}, errors={len(self.errors)})')
+
+
+def sync_company(company_id: str, known: KnownReferences, year=None,
+                 accept_type=None, client=None, cache=None,
+                 database='authentic') -> ReferenceDelta:
+    """
+    Return a ReferenceDelta after downloading only the filings not held.
+
+    year: only consider the last 'year' filings, None considers all of them.
+    database: one of CompanyData.DATABASES, its format is used unless
+        accept_type is given. Keep one KnownReferences per database.
+    Downloaded filings are registered in 'known'; failed ones are not, so the
+    next refresh tries them again.
+    """
+    delta = ReferenceDelta(company_id)
+    try:
+        company = cd.CompanyData(company_id, client=client, cache=cache,
+                                 database=database)
+        delta.company_id = company.id
+        company._set_company_info()
+    except Exception as e:
+        delta.errors.append(e)
+        return delta
+
+    delta.company = company
+    held = known.get(company.id)
+    held_periods = set(held.values())
+    filing_requests, add_info_dict = company._filing_requests(
+        year or len(company.reference_table))
+
+    to_fetch = []
+    for reference, data_url in filing_requests:
+        info = add_info_dict[reference]
+        period = (info['ExerciseDates.startDate'],
+                  info['ExerciseDates.endDate'])
+        if reference in held:
+            delta.unchanged.append(reference)
+            continue
+        elif period in held_periods:
+            delta.corrected.append(reference)
+        else:
+            delta.new.append(reference)
+        to_fetch.append((reference, data_url, period))
+
+    for reference, data_url, period in to_fetch:
+        try:
+            filing = company._fetch_filing(
+                reference, data_url, add_info_dict, accept_type)
+        except Exception as e:
+            delta.errors.append(e)
+            continue
+        delta.data[reference] = filing
+        known.add(company.id, reference, *period)
+
+    company.data = delta.data
+    return delta
+
+
+def sync_many(company_ids, known: KnownReferences, year=None, max_workers=8,
+              accept_type=None, client=None, cache=None, window=None,
+              database='authentic'):
+    """
+    Refresh many companies over a thread pool and yield ReferenceDelta
+    objects as they complete. Call 'known.save()' afterwards.
+
+    company_ids is read lazily, at most 'window' companies (default four per
+    worker) are in flight at once, like in CompanyData.fetch_many().
+    """
+    if database not in cd.DATABASES:
+        raise ValueError(f'Unknown database {database!r}')
+    if client is None:
+        client = cd.CBSOClient(pool_size=max_workers)
+    max_workers = cd._workers(client, max_workers)
+    if window is None:
+        window = 4 * max_workers
+    company_ids = iter(company_ids)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        while True:
+            while len(pending) < window:
+                company_id = next(company_ids, cd._UNSET)
+                if company_id is cd._UNSET:
+                    break
+                pending.add(executor.submit(
+                    sync_company, company_id, known, year, accept_type,
+                    client, cache, database))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -0,0 +1,54 @@
+"""
+Tests of concurrency.AdaptiveLimiter, driven by reported latencies without
+a server.
+"""
+
+import random
+
+from concurrency import AdaptiveLimiter
+
+
+def run(controller: AdaptiveLimiter, latencies, rounds=200):
+    """Fill the limit and release every request, for a number of rounds."""
+    for _ in range(rounds):
+        held = controller.limit
+        for _ in range(held):
+            controller.acquire()
+        for _ in range(held):
+            controller.release(next(latencies))
+
+
+def test_flat_latency_reaches_maximum():
+    # About 1 ms with jitter of a few times that, like a local server.
+    rnd = random.Random(0)
+    latencies = iter(lambda: rnd.uniform(0.0002, 0.004), None)
+    controller = AdaptiveLimiter(initial=4, maximum=16)
+    run(controller, latencies)
+
+    assert controller.limit == 16
+    assert controller.spikes == 0
+    assert controller.decreases == 0
+    assert controller.inflight == 0
+
+
+def test_latency_spike_decreases():
+    latencies = iter([0.1] * 100 + [1.0] + [0.1] * 100)
+    controller = AdaptiveLimiter(initial=8, maximum=8)
+    for latency in latencies:
+        controller.acquire()
+        controller.release(latency)
+        if latency == 1.0:
+            break
+
+    assert controller.spikes == 1
+    assert controller.limit == 4
+
+
+def test_overloaded_decreases_to_minimum():
+    # Without a known latency, every overloaded response decreases.
+    controller = AdaptiveLimiter(initial=8, minimum=2, maximum=8)
+    for _ in range(5):
+        controller.acquire()
+        controller.release(None, overloaded=True)
+    assert controller.limit == 2
+    assert controller.throttled == 5
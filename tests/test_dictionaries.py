@@ -0,0 +1,23 @@
+"""
+Tests of the code tables. data/reversed_dict.json is the hand-written
+reversed_dict that is now derived from bookcodes_dictionary.
+"""
+
+import json
+import os
+
+import codes
+import dictionaries as dct
+
+LITERAL = os.path.join(os.path.dirname(__file__), 'data', 'reversed_dict.json')
+
+
+def test_reversed_dict_matches_old_literal():
+    with open(LITERAL, encoding='utf-8') as f:
+        literal = json.load(f)
+    assert list(dct.reversed_dict.items()) == list(literal.items())
+
+
+def test_registry_labels():
+    for code, label in dct.reversed_dict.items():
+        assert codes.labels_of([codes.code_id(code)])[0] == label
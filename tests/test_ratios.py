@@ -0,0 +1,46 @@
+"""
+Tests of ratios.filing_ratios, the single-filing path of fetch_fin_data,
+against ratios.compute_ratios on the same rows.
+"""
+
+import pandas as pd
+import pytest
+
+import CompanyData as cd
+import ratios
+from test_fin_data import make_filing
+
+# (start date, end date, activity code)
+EXERCISES = [('2022-01-01', '2022-12-31', '43210'),
+             ('2022-01-01', '2022-12-31', '62010'),
+             ('2022-07-01', '2022-12-31', None),
+             (None, '2022-12-31', '41100')]
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('exercise', EXERCISES)
+def test_filing_ratios_equal_compute_ratios(seed, exercise):
+    start, end, activity = exercise
+    filing = cd.Filing(make_filing(seed))
+    rows, _ = filing._rubrics_by_period(['N', 'NM1'])
+    rows = list(rows.values())
+
+    columns = ratios.filing_ratios(rows, start, end, filing.modelType,
+                                   activity)
+    panel = pd.DataFrame(rows).assign(StartDate=start, EndDate=end)
+    expected = ratios.compute_ratios(panel, filing.modelType, activity)
+    assert list(columns) == list(expected.columns)
+    for column, values in columns.items():
+        assert list(values) == pytest.approx(
+            expected[column].tolist(), nan_ok=True), column
+
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('periods', [['N', 'NM1'], ['NM1', 'N']])
+def test_fetch_fin_data_equals_add_ratios(seed, periods):
+    filing = cd.Filing(make_filing(seed))
+    frame = filing.fetch_fin_data(periods)
+    expected = ratios.add_ratios(
+        filing.fetch_fin_data(periods, metrics=False),
+        filing.modelType, filing.activityCode)
+    pd.testing.assert_frame_equal(frame, expected)
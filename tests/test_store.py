@@ -0,0 +1,33 @@
+"""
+Tests of store.filing_to_long, the long format written by ParquetStore and
+Warehouse.
+"""
+
+import CompanyData as cd
+import store
+from test_fin_data import make_filing
+
+
+def test_repeated_code_keeps_last_value():
+    dictionary = make_filing(1)
+    dictionary['Rubrics'].append({'Code': '70', 'Period': 'NM1',
+                                  'Value': '3.5'})
+    long = store.filing_to_long(cd.Filing(dictionary), '0403170701')
+
+    assert not long.duplicated(['Period', 'Code']).any()
+    assert list(long.index) == list(range(len(long)))
+    value = long.loc[(long['Period'] == 'NM1') & (long['Code'] == '70'),
+                     'Value']
+    assert value.tolist() == [3.5]
+
+
+def test_one_row_per_rubric():
+    filing = cd.Filing(make_filing(2))
+    long = store.filing_to_long(filing, '0403170701')
+    rubrics = {(r['Period'], r['Code']): float(r['Value'])
+               for r in filing.dictionary['Rubrics']}
+
+    assert len(long) == len(rubrics)
+    assert dict(zip(zip(long['Period'], long['Code']), long['Value'])) == \
+        rubrics
+    assert set(long['FiscalYear']) == {2022}
@@ -0,0 +1,94 @@
+"""
+Tests of streaming.iter_sections against json.loads, with the document cut
+into chunks at every possible place.
+"""
+
+import json
+import random
+
+import pytest
+
+import streaming
+
+DOCUMENT = json.dumps({
+    'ReferenceNumber': '2022-00012345',
+    'EnterpriseName': 'Bäckerei "Zoë" {NV} [é]',
+    'Rubrics': [{'Code': '70', 'Period': 'N', 'Value': '1234.56'},
+                {'Code': '9087', 'Period': 'NM1', 'Value': '-3.5e2'}],
+    'Administrators': {'LegalPersons': [], 'NaturalPersons': [
+        {'Person': {'FirstName': 'Ælfrīc \\ "Al"', 'LastName': '}]},{['},
+         'Note': 'one " quote}] \\',
+         'Mandates': [{}]}]},
+    'Escapes': 'tab\there\nnew line € é 😀 \\u0041',
+    'Literals': [True, False, None, 0, -1.25, 1e-7, {'a': [[], [{}]]}],
+    'Empty': {},
+    }, ensure_ascii=False, indent=1).encode('utf-8')
+SECTIONS = [None, ['Rubrics'], ['Administrators', 'Literals'], ['Missing'],
+            ['Escapes', 'Empty']]
+
+
+def expected(sections) -> dict:
+    document = json.loads(DOCUMENT)
+    if sections is None:
+        return document
+    wanted = set(sections) | set(streaming.REQUIRED)
+    return {key: value for key, value in document.items() if key in wanted}
+
+
+def split(data: bytes, cuts) -> list:
+    cuts = sorted(set(cuts))
+    return [data[a:b] for a, b in zip([0] + cuts, cuts + [len(data)])]
+
+
+@pytest.mark.parametrize('sections', SECTIONS)
+def test_every_split_in_two(sections):
+    for cut in range(len(DOCUMENT) + 1):
+        chunks = split(DOCUMENT, [cut])
+        assert streaming.load_sections(chunks, sections) == \
+            expected(sections), cut
+
+
+@pytest.mark.parametrize('sections', SECTIONS)
+def test_one_byte_chunks(sections):
+    chunks = [DOCUMENT[i:i + 1] for i in range(len(DOCUMENT))]
+    assert streaming.load_sections(chunks, sections) == expected(sections)
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_random_splits(seed):
+    rnd = random.Random(seed)
+    cuts = rnd.sample(range(1, len(DOCUMENT)), rnd.randint(1, 40))
+    sections = SECTIONS[seed % len(SECTIONS)]
+    assert streaming.load_sections(split(DOCUMENT, cuts), sections) == \
+        expected(sections)
+
+
+def test_keys_in_document_order():
+    keys = [key for key, _ in streaming.iter_sections([DOCUMENT])]
+    assert keys == list(json.loads(DOCUMENT))
+
+
+@pytest.mark.parametrize('indent', [None, 1])
+def test_sections_arrive_before_the_end(indent):
+    document = json.loads(DOCUMENT)
+    document['Rubrics'] *= 100
+    document['Appendix'] = document['Rubrics'] * 10
+    data = json.dumps(document, indent=indent).encode('utf-8')
+    chunks = [data[i:i + 64] for i in range(0, len(data), 64)]
+    read = []
+
+    def counted():
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+
+    sections = streaming.iter_sections(counted(), ['Rubrics'])
+    assert next(sections)[0] == 'ReferenceNumber'
+    assert len(read) == 1
+    assert next(sections)[0] == 'EnterpriseName'
+    assert next(sections)[0] == 'Rubrics'
+    # Decoding is retried each time the text doubles, at most twice the
+    # text up to the end of the section is read.
+    assert len(read) * 64 <= 2 * data.index(b'"Administrators"') + 64
+    assert list(sections) == []
+    assert len(read) == len(chunks)
@@ -0,0 +1,160 @@
+"""
+This module offers a local SQL warehouse of fetched filings in one SQLite
+file, for ad-hoc screening without exporting to spreadsheets.
+
+Tables:
+    companies  one row per enterprise number, info of the latest filing.
+    filings    one row per ReferenceNumber, info from the reference table.
+    rubrics    one row per rubric value (long format), indexed on
+               (enterprise_number, end_date), (code, end_date) and
+               (reference_number, period, code).
+
+Example:
+    wh = Warehouse('nbb.sqlite')
+    wh.persist_company(company)
+    wh.growth('70', 0.20, model_type='m02-f')
+    wh.query('SELECT * FROM filings WHERE activity_code LIKE ?', ['43%'])
+"""
+
+import sqlite3
+import threading
+
+import pandas as pd
+
+from store import filing_to_long
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    enterprise_number TEXT PRIMARY KEY,
+    name TEXT,
+    legal_form TEXT,
+    address TEXT,
+    last_reference TEXT
+);
+CREATE TABLE IF NOT EXISTS filings (
+    reference_number TEXT PRIMARY KEY,
+    enterprise_number TEXT NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    model_type TEXT,
+    deposit_type TEXT,
+    activity_code TEXT,
+    legal_form TEXT
+);
+CREATE TABLE IF NOT EXISTS rubrics (
+    enterprise_number TEXT NOT NULL,
+    reference_number TEXT NOT NULL,
+    period TEXT NOT NULL,
+    code TEXT NOT NULL,
+    value REAL,
+    end_date TEXT,
+    model_type TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_filings_enterprise
+    ON filings (enterprise_number, end_date);
+CREATE INDEX IF NOT EXISTS ix_rubrics_enterprise
+    ON rubrics (enterprise_number, end_date);
+CREATE INDEX IF NOT EXISTS ix_rubrics_code
+    ON rubrics (code, end_date);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_rubrics_reference
+    ON rubrics (reference_number, period, code);
+"""
+
+
+class Warehouse:
+    """Represent a SQLite file with the filings of many companies."""
+    def __init__(self, path='nbb.sqlite'):
+        """Initialise the class' attributes and create missing tables."""
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def persist_filing(self, filing, company_id: str):
+        """
+        Insert or replace one Filing, its info and all its rubrics.
+        """
+        long = filing_to_long(filing, company_id)
+        rows = list(zip(
+            long['EnterpriseNumber'], long['ReferenceNumber'],
+            long['Period'], long['Code'],
+            long['Value'].astype(object).where(long['Value'].notna(), None),
+            long['EndDate'], long['ModelType']))
+
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (filing.filing_reference, company_id, filing.startDate,
+                 filing.endDate, filing.modelType, filing.depositType,
+                 filing.activityCode, filing.legalForm))
+            self.connection.execute(
+                'DELETE FROM rubrics WHERE reference_number = ?',
+                (filing.filing_reference,))
+            self.connection.executemany(
+                'INSERT INTO rubrics VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def persist_company(self, company) -> int:
+        """
+        Insert or replace a CompanyData object and all filings in its
+        'data'. Return the amount of filings written.
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO companies VALUES (?, ?, ?, ?, ?)',
+                (company.id, company.enterpriseName, company.legalForm,
+                 company._fetch_address(company.address),
+                 company.last_reference))
+        filings = list(company.data.values())
+        for filing in filings:
+            self.persist_filing(filing, company.id)
+        return len(filings)
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        """Return the result of a SQL query as DataFrame."""
+        with self._lock:
+            return pd.read_sql_query(sql, self.connection, params=params)
+
+    def rubric(self, code: str, period='N', model_type=None) -> pd.DataFrame:
+        """
+        Return DataFrame with the value of one rubric code for every filing.
+        """
+        sql = """
+            SELECT r.enterprise_number, r.reference_number, r.end_date,
+                   r.model_type, r.value
+            FROM rubrics r
+            WHERE r.code = ? AND r.period = ?
+        """
+        params = [code, period]
+        if model_type is not None:
+            sql += ' AND r.model_type = ?'
+            params.append(model_type)
+        return self.query(sql + ' ORDER BY r.enterprise_number, r.end_date',
+                          params)
+
+    def growth(self, code: str, minimum: float, model_type=None) -> pd.DataFrame:
+        """
+        Return filings where a rubric grew more than 'minimum' (0.2 = 20%)
+        compared to the previous year (N against NM1 of the same filing).
+        """
+        sql = """
+            SELECT n.enterprise_number, n.reference_number, n.end_date,
+                   n.model_type, p.value AS previous, n.value AS current,
+                   n.value / p.value - 1 AS growth
+            FROM rubrics n
+            JOIN rubrics p
+              ON p.reference_number = n.reference_number
+             AND p.code = n.code AND p.period = 'NM1'
+            WHERE n.code = ? AND n.period = 'N' AND p.value > 0
+              AND n.value / p.value - 1 > ?
+        """
+        params = [code, minimum]
+        if model_type is not None:
+            sql += ' AND n.model_type = ?'
+            params.append(model_type)
+        return self.query(sql + ' ORDER BY growth DESC', params)
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
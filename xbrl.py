@@ -0,0 +1,157 @@
+"""
+This module offers a streaming decoder for XBRL instance documents.
+
+Filings deposited before JSONXBRL existed, and some current ones, are only
+available as XBRL (XML). 'load_instance' reads such a filing chunk by chunk
+with an incremental parser and returns a dictionary shaped like a JSONXBRL,
+so Filing and CompactFiling read it as usual:
+    {'ReferenceNumber': ..., 'EnterpriseName': ..., 'EnterpriseNumber': ...,
+     'Rubrics': [{'Code': '70', 'Period': 'N', 'Value': '1234.56'}, ...]}
+
+Every element is dropped from the tree as soon as it is read, so memory stays
+flat however large the document is: only the contexts and the facts of known
+concepts are kept.
+
+XBRL facts are named after taxonomy concepts, not rubric codes. The mapping
+{concept: code} comes from the NBB taxonomy, e.g. exported to a CSV file with
+the columns 'concept' and 'code' and read with 'read_concepts'. Concepts are
+matched on their name without prefix or namespace, e.g. 'Turnover'.
+
+Contexts with dimensions (segment or scenario) are left out, like the
+JSONXBRL only has the totals. The periods of the facts are named after their
+end date, the latest is 'N', the one before 'NM1', and so on.
+
+Example:
+    concepts = read_concepts('pfs-concepts.csv')
+    response = requests.get(url, headers=hdr, stream=True)
+    filing = load_instance(response.iter_content(65536), concepts,
+                           reference='2015-00012345')
+"""
+
+import csv
+import xml.etree.ElementTree as ET
+
+XBRL_TYPE = 'application/x.xbrl'
+
+XBRLI = '{http://www.xbrl.org/2003/instance}'
+XSI_NIL = '{http://www.w3.org/2001/XMLSchema-instance}nil'
+
+_CONTEXT = XBRLI + 'context'
+_IDENTIFIER = XBRLI + 'identifier'
+_INSTANT = XBRLI + 'instant'
+_START = XBRLI + 'startDate'
+_END = XBRLI + 'endDate'
+_DIMENSIONS = (XBRLI + 'segment', XBRLI + 'scenario')
+
+
+def read_concepts(path: str) -> dict:
+    """Return {concept: code} of a CSV file with 'concept' and 'code'."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return {row['concept'].strip(): row['code'].strip()
+                for row in csv.DictReader(f)
+                if row.get('concept') and row.get('code')}
+
+
+def local_name(name: str) -> str:
+    """Return a concept name without namespace or prefix."""
+    return name.rpartition('}')[2].rpartition(':')[2]
+
+
+def iter_elements(chunks):
+    """
+    Yield the children of the root element one at a time, complete with
+    their own children. Each is removed from the tree once the consumer moves
+    on, so the tree never holds more than one of them.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+    depth = 0
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                yield element
+                root.remove(element)
+    parser.close()
+
+
+def _context(element) -> tuple:
+    """Return (entity identifier, end date, start date) of a context."""
+    if any(element.find(f'.//{tag}') is not None for tag in _DIMENSIONS):
+        return None
+    identifier = element.findtext(f'.//{_IDENTIFIER}')
+    instant = element.findtext(f'.//{_INSTANT}')
+    if instant is not None:
+        return identifier, instant.strip(), None
+    start = element.findtext(f'.//{_START}')
+    end = element.findtext(f'.//{_END}')
+    if end is None:
+        return None # 'forever'
+    return identifier, end.strip(), start and start.strip()
+
+
+def load_instance(chunks, concepts: dict, reference=None,
+                  enterprise_name=None) -> dict:
+    """
+    Return a JSONXBRL-like dictionary of an XBRL instance.
+
+    chunks: bytes or an iterable of bytes, e.g. a streamed response.
+    concepts: {concept: rubric code}, facts of other concepts are dropped.
+    reference, enterprise_name: are not part of the instance, the reference
+        table has them.
+    """
+    if isinstance(chunks, (bytes, bytearray)):
+        chunks = [chunks]
+    codes = {local_name(concept): code for concept, code in concepts.items()}
+
+    contexts = {}
+    facts = []
+    for element in iter_elements(chunks):
+        tag = element.tag
+        if tag == _CONTEXT:
+            contexts[element.get('id')] = _context(element)
+            continue
+        context = element.get('contextRef')
+        if context is None or element.get(XSI_NIL) == 'true':
+            continue
+        code = codes.get(local_name(tag))
+        if code is None:
+            continue
+        value = (element.text or '').strip()
+        try:
+            float(value)
+        except ValueError:
+            continue
+        facts.append((code, context, value))
+
+    # Contexts may follow the facts, so periods are only known at the end.
+    # Only the contexts of kept facts count, others may have any date.
+    used = [contexts.get(context) for context in {f[1] for f in facts}]
+    ends = sorted({c[1] for c in used if c is not None}, reverse=True)
+    symbols = {end: 'N' if i == 0 else f'NM{i}' for i, end in enumerate(ends)}
+
+    # A fact repeated for a code and period keeps its last value, like
+    # Filing does for the rubrics of a JSONXBRL.
+    values = {}
+    for code, context, value in facts:
+        found = contexts.get(context)
+        if found is None:
+            continue
+        values[code, symbols[found[1]]] = value
+    rubrics = [{'Code': code, 'Period': period, 'Value': value}
+               for (code, period), value in values.items()]
+
+    identifiers = [c[0] for c in contexts.values() if c and c[0]]
+    return {
+        'ReferenceNumber': reference,
+        'EnterpriseName': enterprise_name,
+        'EnterpriseNumber': identifiers[0].strip() if identifiers else None,
+        'Rubrics': rubrics,
+        }